@@ -1,16 +1,22 @@
 """
-Login page con persistencia en GitHub 🔐🎲
-------------------------------------------
-• Este archivo reemplaza al antiguo Login.py y se conecta con GitHub.
-• El archivo `users.json` vive en el repositorio remoto (no en disco local).
-• Usa los secrets: GITHUB_TOKEN y REPO_NAME en Streamlit Cloud.
+Login page con la capa de almacenamiento compartida 🔐🎲
+-------------------------------------------------------
+• Los usuarios se leen y guardan a través de `storage` (SQLite por defecto).
+• Con `STORAGE_BACKEND = "github"` vuelven a vivir en el repositorio remoto
+  (secrets GITHUB_TOKEN y REPO_NAME en Streamlit Cloud).
+• Al entrar se emite una sesión firmada en cookie (`auth.py`); las demás páginas
+  la validan sin volver a leer `users.json`. Define también el secret
+  SESSION_SECRET (el mismo en todas las réplicas) o cada reinicio cerrará las sesiones.
+• Las contraseñas se guardan con bcrypt (`passwords.py`).
 
 """
 
-from bots.event_creator import sendMessage
+from helpers import sendMessage
 import streamlit as st
-from github import Github
-import json
+from auth import cookie_manager, end_session, restore_session, start_session
+from passwords import hash_password, needs_rehash, verify_async
+from storage import load_json, save_json, adjust_points, cached_balance, USERS_PATH
+from storage.metrics import page_rerun
 
 # ────────────────────────────────
 # Config
@@ -20,46 +26,12 @@ st.set_page_config(
     page_icon="🔐",
     layout="centered",
 )
+page_rerun("Login")
 
-USERS_FILE = "users.json"  # Ahora es solo el path dentro del repo
+USERS_FILE = USERS_PATH  # documento de la capa de almacenamiento
+START_POINTS = 1000  # saldo de bienvenida (movimiento `admin_adjust` en el libro)
 
-
-# ────────────────────────────────
-# GitHub Helpers
-# ────────────────────────────────
-
-@st.cache_resource
-def get_repo():
-    token = st.secrets["GITHUB_TOKEN"]
-    repo_name = st.secrets["REPO_NAME"]
-    return Github(token).get_repo(repo_name)
-
-
-def load_json(path, default={}):
-    repo = get_repo()
-    try:
-        contents = repo.get_contents(path)
-        return json.loads(contents.decoded_content.decode("utf-8"))
-    except Exception:
-        return default
-
-
-def save_json(path, data):
-    repo = get_repo()
-    try:
-        contents = repo.get_contents(path)
-        repo.update_file(
-            path,
-            f"Update {path}",
-            json.dumps(data, indent=4, ensure_ascii=False),
-            contents.sha
-        )
-    except Exception:
-        repo.create_file(
-            path,
-            f"Create {path}",
-            json.dumps(data, indent=4, ensure_ascii=False)
-        )
+cookies = cookie_manager()  # un solo componente de cookies por ejecución
 
 
 # ────────────────────────────────
@@ -74,16 +46,20 @@ def save_users(users: dict):
     save_json(USERS_FILE, users)
 
 
-def check_credentials(username: str, password: str) -> bool:
+def check_credentials(username: str, password: str):
+    """Datos del usuario si la contraseña es correcta, si no `None`."""
     users = load_users()
-    return username in users and users[username]["password"] == password
+    if username not in users or not verify_async(password, users[username]["password"]).result():
+        return None
+    if needs_rehash(users[username]["password"]):  # texto plano o coste antiguo
+        users[username]["password"] = hash_password(password)
+        save_users(users)
+    return users[username]
 
 
-def init_session(username: str):
-    users = load_users()
-    user = users.get(username, {})
-    st.session_state.user = username
-    st.session_state.points = user.get("points", 1000)
+def init_session(username: str, user_data: dict):
+    start_session(cookies, username, user_data)
+    st.session_state.points = cached_balance(username)
 
 
 # ────────────────────────────────
@@ -92,11 +68,11 @@ def init_session(username: str):
 
 st.title("Bienvenido a la casa de apuestas 🎲")
 
-if "user" in st.session_state:
+if restore_session(cookies):
     st.success(f"Ya estás logueado como **{st.session_state.user}** ✅")
     st.write("Puedes navegar a la barra lateral y elegir tu deporte.")
     if st.button("Cerrar sesión"):
-        st.session_state.clear()
+        end_session(cookies)
         st.rerun()
 else:
     with st.form("login_form"):
@@ -104,8 +80,9 @@ else:
         password = st.text_input("Contraseña", type="password")
         submitted = st.form_submit_button("Entrar")
         if submitted:
-            if check_credentials(username, password):
-                init_session(username)
+            user_data = check_credentials(username, password)
+            if user_data is not None:
+                init_session(username, user_data)
                 st.success("Login correcto, redirigiendo…")
                 st.rerun()
             else:
@@ -131,12 +108,13 @@ with st.expander(" ¿No tienes cuenta? Pincha aquí ✍️"):
                 st.error("❌ El usuario y la contraseña son obligatorios.")
             else:
                 users[new_user.strip()] = {
-                    "password": new_pass,
-                    "points": 1000,
+                    "password": hash_password(new_pass),
                     "color": new_color,
                     "discord": new_discord
                 }
                 save_users(users)
+                adjust_points({new_user.strip(): START_POINTS}, "admin_adjust")
                 st.success("✅ Cuenta creada correctamente. ¡Ya puedes iniciar sesión!")
-                sendMessage(f"{new_discord} acaba de crearse una cuenta en La Casa de Apuestas 👀")
+                sendMessage(f"{new_discord} acaba de crearse una cuenta en La Casa de Apuestas 👀",
+                            kind="account")
                 st.rerun()
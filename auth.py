@@ -0,0 +1,100 @@
+"""
+Sesiones firmadas 🎟️
+-------------------
+• Al entrar, `start_session` emite un JWT corto (HS256, `SESSION_SECRET`) con el
+  usuario y una copia de su perfil (color y Discord) y lo guarda en una cookie.
+• Las páginas llaman a `require_user()`: el token se valida en local, sin leer
+  `users.json`; al recargar el navegador la sesión se recupera de la cookie.
+• Al caducar (`SESSION_TTL_MIN`) hay que volver a entrar.
+• `SESSION_SECRET` (*Secrets* o variable de entorno) es obligatorio en
+  producción y debe ser el mismo en todas las réplicas. Sin él se genera uno
+  al azar por proceso (con aviso): reiniciar cierra todas las sesiones.
+"""
+
+import secrets
+from datetime import datetime, timedelta, timezone
+
+import extra_streamlit_components as stx
+import jwt
+import streamlit as st
+
+from storage.config import setting, setting_int
+
+COOKIE_NAME = "lalonch_session"
+ALGORITHM = "HS256"
+PROFILE_FIELDS = ("color", "discord")
+
+SECRET = setting("SESSION_SECRET")
+if not SECRET:
+    # los tokens solo valen mientras viva el proceso y solo en esta réplica
+    print("⚠️ Falta SESSION_SECRET: cada reinicio cerrará todas las sesiones y las demás "
+          "réplicas no aceptarán estas cookies.")
+    SECRET = secrets.token_hex(32)
+TTL = timedelta(minutes=setting_int("SESSION_TTL_MIN", 12 * 60))
+
+
+def cookie_manager() -> stx.CookieManager:
+    """Componente de cookies; crear uno solo por ejecución de la página."""
+    return stx.CookieManager(key="lalonch_cookies")
+
+
+def issue_token(username: str, user_data: dict) -> str:
+    now = datetime.now(timezone.utc)
+    claims = {
+        "sub": username,
+        "profile": {k: user_data.get(k) for k in PROFILE_FIELDS},
+        "iat": now,
+        "exp": now + TTL,
+    }
+    return jwt.encode(claims, SECRET, algorithm=ALGORITHM)
+
+
+def decode_token(token: str):
+    """Claims del token o `None` si falta, está manipulado o ha caducado."""
+    if not token:
+        return None
+    try:
+        return jwt.decode(token, SECRET, algorithms=[ALGORITHM])
+    except jwt.InvalidTokenError:
+        return None
+
+
+def start_session(cookies: stx.CookieManager, username: str, user_data: dict):
+    token = issue_token(username, user_data)
+    cookies.set(COOKIE_NAME, token, expires_at=datetime.now() + TTL)
+    _apply(token, decode_token(token))
+
+
+def restore_session(cookies: stx.CookieManager = None):
+    """Usuario de la sesión actual (de `session_state` o de la cookie) o `None`."""
+    token = st.session_state.get("session_token")
+    claims = decode_token(token)
+    if claims is None:
+        token = (cookies or cookie_manager()).get(COOKIE_NAME)
+        claims = decode_token(token)
+        if claims is None:
+            for key in ("session_token", "user", "profile"):
+                st.session_state.pop(key, None)
+            return None
+    _apply(token, claims)
+    return claims["sub"]
+
+
+def end_session(cookies: stx.CookieManager):
+    if cookies.get(COOKIE_NAME):
+        cookies.delete(COOKIE_NAME)
+    st.session_state.clear()
+
+
+def require_user() -> str:
+    """Para las páginas: devuelve el usuario o manda al login."""
+    user = restore_session()
+    if user is None:
+        st.switch_page("Login.py")
+    return user
+
+
+def _apply(token: str, claims: dict):
+    st.session_state.session_token = token
+    st.session_state.user = claims["sub"]
+    st.session_state.profile = claims.get("profile", {})
@@ -0,0 +1,40 @@
+"""
+Logins por segundo según el coste de bcrypt ⏱️
+---------------------------------------------
+Mide cuántas verificaciones (un login correcto) aguanta el pool de `passwords.py`
+con cada coste, para elegir `BCRYPT_COST` según la máquina:
+
+    python -m benchmarks.bench_logins                 # costes 10–13, 2 s cada uno
+    python -m benchmarks.bench_logins 10 12 14 --seconds 5
+"""
+
+import argparse
+import time
+
+import passwords
+
+
+def logins_per_second(cost: int, seconds: float) -> float:
+    stored = passwords.hash_password("contraseña-de-prueba", cost)
+    done, start = 0, time.perf_counter()
+    batch = passwords.WORKERS * 2  # mantener el pool siempre ocupado
+    while time.perf_counter() - start < seconds:
+        futures = [passwords.verify_async("contraseña-de-prueba", stored) for _ in range(batch)]
+        done += sum(f.result() for f in futures)
+    return done / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("costs", nargs="*", type=int, default=[10, 11, 12, 13])
+    parser.add_argument("--seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    print(f"workers={passwords.WORKERS}  coste actual={passwords.COST}")
+    for cost in args.costs:
+        rate = logins_per_second(cost, args.seconds)
+        print(f"coste {cost:>2}: {rate:8.1f} logins/s  ({1000 / rate:6.1f} ms por login)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,144 @@
+"""
+Benchmarks a escala sintética 📏
+-------------------------------
+Genera datos con `benchmarks.datagen`, los carga en `MemoryBackend` y mide de
+principio a fin los caminos calientes:
+
+• `settlement_cold` / `settlement_warm` → `SettlementEngine.run()` sin y con los
+  documentos derivados (índice de apuestas abiertas, rachas, estadísticas) ya creados.
+• `streaks_recompute` → el cálculo antiguo de la barra lateral de UFC (todo el historial).
+• `streaks_read`      → lo que hace ahora la página (`leaderboard.load_board().top`).
+• `profile_stats`     → registro de estadísticas del usuario con más apuestas.
+• `profile_history`   → su historial → tabla → filtro → HTML de una página (necesita pandas).
+
+El resultado es JSON para poder comparar entre commits:
+
+    python -m benchmarks.bench_scale --users 10000 --bets 1000000 --out bench.json
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+from benchmarks.datagen import generate
+from leaderboard import StreakBoard, load_board
+from settlement import SPORT, SettlementEngine
+from storage import STREAKS_PATH
+from storage.base import OPEN_BETS_PATH
+from storage.bet_log import BetLog
+from storage.memory_backend import MemoryBackend
+from user_stats import build_stats, load_stats, stats_path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+
+def timed(fn, repeat: int, setup=None) -> dict:
+    runs = []
+    for _ in range(repeat):
+        arg = setup() if setup else None
+        start = time.perf_counter()
+        fn(arg) if setup else fn()
+        runs.append(time.perf_counter() - start)
+    return {"best_s": min(runs), "mean_s": statistics.fmean(runs), "runs": runs}
+
+
+def old_streaks(backend) -> tuple:
+    """Ranking de rachas tal como lo recalculaba la página de UFC en cada recarga."""
+    max_streaks = {}
+    for user, ub in backend.iter_bets():
+        cur = 0
+        for bet in sorted(ub, key=lambda x: x["timestamp"]):
+            if bet.get("sport") != SPORT:
+                continue
+            if bet.get("resolved") and bet.get("won"):
+                cur += 1
+                max_streaks[user] = max(max_streaks.get(user, 0), cur)
+            elif bet.get("resolved"):
+                cur = 0
+    return max(max_streaks.items(), key=lambda x: x[1], default=("Nadie", 0))
+
+
+def warm_up(backend: MemoryBackend):
+    """Crea los documentos derivados que mantiene la liquidación."""
+    log = BetLog(backend)
+    manifest = log.migrate()
+    docs = {OPEN_BETS_PATH: backend._open_index(log, manifest),
+            STREAKS_PATH: StreakBoard.from_history(log.iter_users(manifest)).data}
+    for user, bets in log.iter_users(manifest):
+        docs[stats_path(user)] = build_stats(bets)
+    backend.save_many(docs)
+
+
+def profile_history(backend, user: str):
+    from helpers.profile import PAGE_SIZE, build_history, to_html_page
+    df = build_history(backend.user_bets(user))
+    page = df[df["Estado"] != "En progreso"].iloc[:PAGE_SIZE]
+    return to_html_page(page)
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--bets", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=200)
+    parser.add_argument("--fights", type=int, default=10)
+    parser.add_argument("--pending-events", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--out", help="fichero JSON de salida (por defecto, stdout)")
+    args = parser.parse_args()
+    params = {k: v for k, v in vars(args).items() if k not in ("repeat", "out")}
+
+    print(f"⚙️ Generando datos {params}…", file=sys.stderr)
+    start = time.perf_counter()
+    docs = generate(args.users, args.bets, args.events, args.fights, args.pending_events, args.seed)
+    heaviest = max(docs["pages/bets_history.json"].items(), key=lambda kv: len(kv[1]))[0]
+    cold = MemoryBackend(docs)
+    del docs
+    results = {"migrate_history": timed(lambda b: BetLog(b).migrate(), 1, cold.clone)}
+    BetLog(cold).migrate()
+    warm = cold.clone()
+    warm_up(warm)
+    print(f"⚙️ Datos listos en {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    results["settlement_cold"] = timed(lambda b: SettlementEngine(b).run(), args.repeat, cold.clone)
+    results["settlement_warm"] = timed(lambda b: SettlementEngine(b).run(), args.repeat, warm.clone)
+    results["streaks_recompute"] = timed(lambda: old_streaks(warm), args.repeat)
+    results["streaks_read"] = timed(lambda: load_board(warm).top(SPORT, 1), args.repeat)
+    results["profile_stats"] = timed(lambda: load_stats(heaviest, warm), args.repeat)
+    try:
+        import pandas  # noqa: F401
+    except ImportError:
+        print("ℹ️ pandas no está instalado: se omite profile_history", file=sys.stderr)
+    else:
+        results["profile_history"] = timed(lambda: profile_history(warm, heaviest), args.repeat)
+
+    report = {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "params": params,
+        "heaviest_user_bets": len(warm.user_bets(heaviest)),
+        "results": results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.out:
+        Path(args.out).write_text(text + "\n")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+"""
+Tiempo de importación al arrancar ⏱️
+-----------------------------------
+Importa cada módulo que usan las páginas en un intérprete limpio con
+`python -X importtime` y falla (código 1) si:
+
+• alguno arrastra dependencias pesadas que deben cargarse tarde (`HEAVY`), o
+• el tiempo acumulado supera la referencia guardada en `importtime_baseline.json`
+  en más de `--tolerance` (+ `--slack-ms` para el ruido de máquinas rápidas).
+
+    python -m benchmarks.bench_startup             # comparar
+    python -m benchmarks.bench_startup --update    # fijar la referencia en esta máquina
+
+Sin referencia (o sin la de algún módulo) también falla, salvo con `--update`.
+"""
+
+import argparse
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+BASELINE = Path(__file__).with_name("importtime_baseline.json")
+
+TARGETS = ("storage", "helpers", "auth", "passwords", "settlement", "leaderboard",
+           "user_stats", "quiz_bank")
+HEAVY = ("discord", "pandas", "github", "numpy")
+
+
+def import_profile(module: str):
+    """`(microsegundos acumulados, módulos importados)` de `import module`."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=REPO_ROOT, capture_output=True, text=True)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1])
+    total, imported = None, set()
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        imported.add(name)
+        if name == module:
+            total = int(cumulative)
+    return total, imported
+
+
+def measure(modules, repeat: int) -> dict:
+    """`{módulo: (mejor tiempo, importados) o RuntimeError}`. Las ejecuciones se
+    alternan entre módulos: una racha de ruido no se lleva todas las de uno."""
+    runs = {module: [] for module in modules}
+    for _ in range(repeat):
+        for module, profiles in runs.items():
+            if isinstance(profiles, RuntimeError):
+                continue
+            try:
+                profiles.append(import_profile(module))
+            except RuntimeError as e:
+                runs[module] = e
+    return {module: profiles if isinstance(profiles, RuntimeError)
+            else (min(total for total, _ in profiles), profiles[0][1])
+            for module, profiles in runs.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=5, help="ejecuciones por módulo (se usa la mejor)")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    parser.add_argument("--slack-ms", type=float, default=5.0)
+    parser.add_argument("--update", action="store_true", help="guardar los tiempos como referencia")
+    args = parser.parse_args()
+
+    baseline = json.loads(BASELINE.read_text()) if BASELINE.exists() else {}
+    results, failures = {}, []
+    for module, measured in measure(TARGETS, args.repeat).items():
+        if isinstance(measured, RuntimeError):
+            failures.append(f"{module}: no se pudo importar ({measured})")
+            continue
+        total, imported = measured
+        results[module] = total
+        heavy = sorted(h for h in HEAVY if h in imported)
+        limit = baseline.get(module)
+        line = f"{module:<12} {total / 1000:8.1f} ms"
+        if limit is not None:
+            line += f"   (referencia {limit / 1000:.1f} ms)"
+            if not args.update and total > limit * (1 + args.tolerance) + args.slack_ms * 1000:
+                failures.append(f"{module}: {total / 1000:.1f} ms > {limit / 1000:.1f} ms de referencia")
+        elif baseline and not args.update:
+            failures.append(f"{module}: sin referencia (ejecuta con --update)")
+        if heavy:
+            failures.append(f"{module}: importa {', '.join(heavy)} al arrancar")
+        print(line)
+
+    if args.update:
+        BASELINE.write_text(json.dumps({**baseline, **results}, indent=4) + "\n")
+        print(f"📌 Referencia guardada en {BASELINE.name}")
+    elif not baseline:
+        failures.append(f"sin referencia en {BASELINE.name}: ejecuta con --update para fijarla")
+
+    for failure in failures:
+        print(f"❌ {failure}")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Generador de datos sintéticos 🧬
+-------------------------------
+Produce documentos con la misma forma que los reales, a la escala que se pida:
+
+• `users.json`              → `{usuario: {"password", "points", "color", "discord"}}`
+• `pages/events.json`       → `{"ufc": [{"date", "event", "location", "time", "fights"}]}`
+• `pages/bets_history.json` → `{usuario: [apuesta, ...]}`
+• `pages/results.json`      → `{evento: {combate: resultado}}`
+
+Los eventos antiguos ya están liquidados (apuestas resueltas, resultados con
+`settled` y evento `checked`); los `pending_events` más recientes tienen
+resultados nuevos y sus apuestas siguen abiertas, listas para `SettlementEngine`.
+Las apuestas se reparten con una ley de Zipf: unos pocos usuarios concentran
+muchas, como en la realidad.
+"""
+
+import random
+from datetime import datetime, timedelta
+
+from settlement import SPORT, evaluate_bet
+from storage import USERS_PATH, HISTORY_PATH, EVENTS_PATH, RESULTS_PATH
+
+METHODS = ["KO", "TKO", "Decisión", "Sumisión"]
+ROUNDS = ["R1", "R2", "R3", "R4", "R5"]
+
+
+def generate(users: int = 1000, bets: int = 100_000, events: int = 200, fights: int = 10,
+             pending_events: int = 5, seed: int = 1) -> dict:
+    """`{ruta: documento}` listo para `backend.save_many`."""
+    rng = random.Random(seed)
+    names = [f"user{i:06d}" for i in range(users)]
+    start = datetime(2020, 1, 4)
+
+    event_docs, results = [], {}
+    for e in range(events):
+        day = start + timedelta(days=7 * e)
+        name = f"UFC {e + 1}"
+        card = [f"Fighter {e}-{f}A vs Fighter {e}-{f}B" for f in range(fights)]
+        event_docs.append({"date": day.strftime("%Y-%m-%d"), "event": name,
+                           "location": "Las Vegas, NV, USA", "time": "22:00 ET", "fights": card})
+        settled = e < events - pending_events
+        results[name] = {}
+        for fight in card:
+            corner = rng.choice(("red", "blue"))
+            red, blue = map(str.strip, fight.split("vs"))
+            results[name][fight] = {
+                "winner_corner": corner, "winner_name": red if corner == "red" else blue,
+                "round": rng.choice(ROUNDS), "method": rng.choice(METHODS), "resolved": True,
+            }
+            if settled:
+                results[name][fight]["settled"] = True
+        if settled:
+            results[name]["checked"] = True
+
+    weights = [1 / (i + 1) for i in range(users)]
+    history = {name: [] for name in names}
+    for user in rng.choices(names, weights=weights, k=bets):
+        e = rng.randrange(events)
+        event = event_docs[e]
+        fight = rng.choice(event["fights"])
+        corner = rng.choice(("red", "blue"))
+        red, blue = map(str.strip, fight.split("vs"))
+        bet = {
+            "timestamp": (datetime.fromisoformat(event["date"]) - timedelta(minutes=rng.randrange(10_000))).isoformat(),
+            "sport": SPORT, "fight": fight, "corner": corner,
+            "fighter": red if corner == "red" else blue,
+            "amount": rng.randrange(10, 500, 10), "odds": 1.9,
+            "round": rng.choice([None] + ROUNDS), "method": rng.choice([None] + METHODS),
+            "resolved": False, "won": None,
+        }
+        if "settled" in results[event["event"]][fight]:
+            bet.update(evaluate_bet(bet, results[event["event"]][fight]))
+        history[user].append(bet)
+    for user_bets in history.values():
+        user_bets.sort(key=lambda b: b["timestamp"])
+
+    return {
+        USERS_PATH: {n: {"password": "x", "points": 1000, "color": f"#{rng.randrange(0xFFFFFF):06x}",
+                         "discord": n} for n in names},
+        EVENTS_PATH: {SPORT: event_docs},
+        HISTORY_PATH: {n: b for n, b in history.items() if b},
+        RESULTS_PATH: results,
+    }
@@ -1,38 +1,13 @@
 import discord
 import asyncio
-import json
 from datetime import datetime, timedelta, timezone
 from pathlib import Path
-import streamlit as st
-from github import Github
-import nest_asyncio
-
-nest_asyncio.apply()  # ← Para evitar conflictos con bucles ya activos
+from helpers.notify import sendMessage  # noqa: F401  (antes vivía aquí)
+from storage.config import setting
 
 
 # ────────────────────────────── SECRETS ───────────────────────────── #
-TOKEN = st.secrets["DOKEN"]
 GUILD_ID = 1389213421144248473
-CHANNEL_ID = 1389213421144248476
-
-
-# ────────────────────────────── GITHUB I/O ────────────────────────── #
-@st.cache_resource
-def get_repo():
-    token = st.secrets["GITHUB_TOKEN"]
-    repo_name = st.secrets["REPO_NAME"]
-    return Github(token).get_repo(repo_name)
-
-
-def load_json(path: str, default: dict = {}):
-    try:
-        contents = get_repo().get_contents(path)
-        return json.loads(contents.decoded_content.decode())
-    except Exception:
-        return default
-
-
-USERS_PATH = "users.json"  # ← ahora se lee del repo remoto
 
 
 # ──────────────────────── CREAR EVENTOS DISCORD ───────────────────── #
@@ -88,45 +63,7 @@ class DiscordEventCreator(discord.Client):
         await self.close()
 
 
-# ──────────────────────── ENVIAR MENSAJES DISCORD ─────────────────── #
-class DiscordMessenger(discord.Client):
-    def __init__(self, message):
-        super().__init__(intents=discord.Intents.default())
-        self.message = message
-
-    async def on_ready(self):
-        print(f"📬 Bot conectado como {self.user}")
-        channel = self.get_channel(CHANNEL_ID)
-        if not channel:
-            print("❌ Canal no encontrado.");
-            await self.close();
-            return
-
-        users = load_json(USERS_PATH, {})
-        detected_user = next((u for u in users if u.lower() in self.message.lower()), None)
-        color_hex = users.get(detected_user, {}).get("color", "#808080")
-        color_int = int(color_hex.lstrip("#"), 16)
-
-        embed = discord.Embed(title="📢 Nuevo mensaje", description=self.message, color=color_int)
-        if detected_user:
-            embed.set_footer(text=f"Mensaje detectado de {detected_user}")
-
-        try:
-            await channel.send(embed=embed)
-            print("✅ Mensaje enviado correctamente.")
-        except Exception as e:
-            print(f"❌ Error al enviar mensaje: {e}")
-
-        await self.close()
-
-
 # ─────────────────────────── FUNCIONES PÚBLICAS ───────────────────── #
 def createEvent(title, description, image_path, date, time, url):
     client = DiscordEventCreator(title, description, image_path, date, time, url)
-    asyncio.run(client.start(TOKEN))
-
-
-def sendMessage(message):
-    client = DiscordMessenger(message)
-    loop = asyncio.get_event_loop()
-    loop.run_until_complete(client.start(TOKEN))
+    asyncio.run(client.start(setting("DOKEN")))
@@ -0,0 +1,324 @@
+"""
+Notificador de Discord en segundo plano 📣
+-----------------------------------------
+Sustituye al antiguo `DiscordMessenger`, que abría una conexión nueva al gateway
+por cada mensaje y bloqueaba el hilo de la página hasta enviarlo.
+
+• Un único hilo con su propio bucle asyncio, creado en el primer uso.
+• `enqueue(message)` no bloquea: mete el mensaje en una cola acotada y devuelve
+  `False` si está llena (el mensaje se descarta antes que frenar la página).
+• `DiscordTransport` usa la API REST con una sola `aiohttp.ClientSession`
+  reutilizada y respeta las cabeceras de rate limit de Discord (y los 429).
+• `StubTransport` guarda los mensajes en memoria (pruebas y desarrollo local,
+  `DISCORD_TRANSPORT = "stub"`).
+• El color del embed sale de una copia de `users.json` cacheada unos segundos;
+  con ella se compila una vez `UserMatcher`, que encuentra al usuario citado.
+• Cada envío HTTP se mide en `storage.metrics` (`discord.http`) junto con las
+  peticiones que quedan en la ventana de rate limit.
+• Modo resumen (opcional, `DISCORD_DIGEST_WINDOW_S`, p. ej. 30; por defecto 0 =
+  desactivado): los avisos del mismo tipo y tema (p. ej. apuestas a UFC 300) se
+  juntan durante `digest_window` segundos y salen en un solo embed
+  ("5 apuestas por 1.200 pts en UFC 300 en los últimos 30 s"). Los tipos de
+  `PRIORITY_KINDS` se envían siempre al momento.
+"""
+
+import asyncio
+import json
+import re
+import threading
+import time
+
+from storage import load_json, USERS_PATH
+from storage.metrics import REGISTRY
+from storage.config import setting, setting_float, setting_int
+
+API_BASE = "https://discord.com/api/v10"
+JSON_HEADERS = {"Content-Type": "application/json"}
+DEFAULT_CHANNEL_ID = 1389213421144248476
+DEFAULT_COLOR = "#808080"
+PRIORITY_KINDS = ("account",)
+DIGEST_TITLES = {
+    "bet": "🎰 {n} apuestas por {amount} pts{topic} en los últimos {window} s",
+    "quiz": "❔ {n} quizzes completados, {amount} pts repartidos en los últimos {window} s",
+}
+MAX_DESCRIPTION = 4000  # Discord corta en 4096
+_STOP = object()
+
+
+def _pts(amount: int) -> str:
+    return f"{amount:,}".replace(",", ".")
+
+
+def _trie_pattern(node: dict) -> str:
+    """Regex de un trie: los prefijos comunes se comparten y no se prueba usuario a usuario."""
+    branches = [re.escape(ch) + _trie_pattern(child) for ch, child in sorted(node.items()) if ch]
+    if not branches:
+        return ""
+    body = branches[0] if len(branches) == 1 else "(?:" + "|".join(branches) + ")"
+    if "" in node:  # aquí termina un nombre: el resto es opcional (voraz → el más largo)
+        body = f"(?:{body})?" if len(branches) == 1 else body + "?"
+    return body
+
+
+class UserMatcher:
+    """Detecta qué usuario aparece en un mensaje como palabra completa.
+
+    Se compila una vez por copia de `users.json`. Se prueba desde cada inicio de
+    palabra (con lookahead, así las coincidencias solapadas también cuentan) y se
+    devuelve la más larga: en "ana maria lopez", "Maria Lopez" antes que "Ana Maria".
+    """
+
+    def __init__(self, usernames):
+        self._names = {}
+        trie = {}
+        for name in usernames:
+            lowered = name.lower()
+            if not lowered or lowered in self._names:
+                continue
+            self._names[lowered] = name
+            node = trie
+            for ch in lowered:
+                node = node.setdefault(ch, {})
+            node[""] = {}
+        self._regex = re.compile(rf"(?<!\w)(?=({_trie_pattern(trie)})(?!\w))") if trie else None
+
+    def find(self, message: str):
+        if self._regex is None:
+            return None
+        best = max((m.group(1) for m in self._regex.finditer(message.lower())), key=len, default=None)
+        return self._names[best] if best else None
+
+
+class Notice:
+    __slots__ = ("message", "kind", "amount", "topic")
+
+    def __init__(self, message: str, kind: str, amount: int, topic: str):
+        self.message = message
+        self.kind = kind
+        self.amount = amount
+        self.topic = topic
+
+
+# ──────────────────────────── TRANSPORTES ─────────────────────────── #
+class DiscordTransport:
+    """Envía mensajes por REST con una sesión HTTP persistente."""
+
+    def __init__(self, token: str, max_retries: int = 5):
+        self.token = token
+        self.max_retries = max_retries
+        self._session = None
+        self._remaining = None  # peticiones que quedan en la ventana actual
+        self._reset_at = 0.0  # time.monotonic() en que se renueva la ventana
+
+    async def open(self):
+        import aiohttp
+        self._session = aiohttp.ClientSession(
+            headers={"Authorization": f"Bot {self.token}"},
+            timeout=aiohttp.ClientTimeout(total=15),
+        )
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+
+    async def _pace(self):
+        if self._remaining == 0:
+            await asyncio.sleep(max(0.0, self._reset_at - time.monotonic()))
+
+    def _update_limits(self, headers):
+        if "X-RateLimit-Remaining" in headers:
+            self._remaining = int(headers["X-RateLimit-Remaining"])
+            REGISTRY.rate_limit("discord", self._remaining, headers.get("X-RateLimit-Limit"))
+        if "X-RateLimit-Reset-After" in headers:
+            self._reset_at = time.monotonic() + float(headers["X-RateLimit-Reset-After"])
+
+    async def send(self, channel_id: int, payload: dict):
+        url = f"{API_BASE}/channels/{channel_id}/messages"
+        body = json.dumps(payload)
+        for _ in range(self.max_retries):
+            await self._pace()
+            with REGISTRY.timer("discord.http") as info:
+                info["bytes"] = len(body)
+                async with self._session.post(url, data=body, headers=JSON_HEADERS) as resp:
+                    self._update_limits(resp.headers)
+                    retry_after = (await resp.json()).get("retry_after", 1.0) if resp.status == 429 else None
+                    if retry_after is None:
+                        resp.raise_for_status()
+            if retry_after is not None:
+                await asyncio.sleep(float(retry_after))
+                continue
+            return
+        raise RuntimeError("Discord sigue limitando el canal; mensaje descartado")
+
+
+class StubTransport:
+    """Transporte local: no sale a la red y guarda lo enviado en `sent`."""
+
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.sent = []
+
+    async def open(self):
+        pass
+
+    async def close(self):
+        pass
+
+    async def send(self, channel_id: int, payload: dict):
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        self.sent.append((channel_id, payload))
+
+
+# ──────────────────────────── NOTIFICADOR ─────────────────────────── #
+class Notifier:
+    def __init__(self, transport, channel_id: int, max_queue: int = 100, users_ttl: float = 60.0,
+                 digest_window: float = 0.0):
+        self.transport = transport
+        self.channel_id = channel_id
+        self.max_queue = max_queue
+        self.users_ttl = users_ttl
+        self.digest_window = digest_window
+        self.dropped = 0
+        self._digests = {}  # (tipo, tema) → (hora límite, [avisos])
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._users, self._users_at = {}, 0.0
+        self._matcher = UserMatcher(())
+        self._ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="discord-notifier", daemon=True)
+        self._thread.start()
+        self._ready.wait()
+
+    # ─────────── API ───────────
+
+    def enqueue(self, message: str, kind: str = "message", amount: int = 0, topic: str = None) -> bool:
+        """Encola un mensaje sin esperar a que se envíe. `False` si la cola está llena.
+
+        `kind`, `amount` y `topic` sirven para agrupar y resumir en modo digest.
+        """
+        with self._lock:
+            if self._pending >= self.max_queue or not self._thread.is_alive():
+                self.dropped += 1
+                return False
+            self._pending += 1
+        notice = Notice(message, kind, amount, topic)
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, notice)
+        return True
+
+    def close(self, timeout: float = 10.0):
+        """Envía lo pendiente y para el hilo."""
+        if not self._thread.is_alive():
+            return
+        self._loop.call_soon_threadsafe(self._queue.put_nowait, _STOP)
+        self._thread.join(timeout)
+
+    # ─────────── hilo del bucle ───────────
+
+    def _run(self):
+        self._loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self._loop)
+        self._queue = asyncio.Queue()
+        self._ready.set()
+        self._loop.run_until_complete(self._consume())
+        self._loop.close()
+
+    async def _consume(self):
+        await self.transport.open()
+        try:
+            while True:
+                try:
+                    notice = await asyncio.wait_for(self._queue.get(), self._next_deadline())
+                except asyncio.TimeoutError:
+                    notice = None
+                if notice is _STOP:
+                    break
+                if notice is not None:
+                    with self._lock:
+                        self._pending -= 1
+                    if self.digest_window and notice.kind not in PRIORITY_KINDS:
+                        self._collect(notice)
+                    else:
+                        await self._deliver([notice])
+                now = time.monotonic()
+                for key in [k for k, (deadline, _) in self._digests.items() if deadline <= now]:
+                    await self._deliver(self._digests.pop(key)[1])
+            for _, notices in self._digests.values():  # al cerrar no se pierde nada
+                await self._deliver(notices)
+        finally:
+            await self.transport.close()
+
+    def _next_deadline(self):
+        if not self._digests:
+            return None
+        return max(0.0, min(d for d, _ in self._digests.values()) - time.monotonic())
+
+    def _collect(self, notice: Notice):
+        key = (notice.kind, notice.topic)
+        if key not in self._digests:
+            self._digests[key] = (time.monotonic() + self.digest_window, [])
+        self._digests[key][1].append(notice)
+
+    async def _deliver(self, notices: list):
+        try:
+            if len(notices) == 1:
+                payload = await self._payload(notices[0].message)
+            else:
+                payload = self._digest_payload(notices)
+            await self.transport.send(self.channel_id, payload)
+        except Exception as e:
+            print(f"❌ Error al enviar mensaje: {e}")
+
+    async def _users_snapshot(self) -> dict:
+        if time.monotonic() - self._users_at > self.users_ttl:
+            self._users = await asyncio.to_thread(load_json, USERS_PATH, {})
+            self._matcher = UserMatcher(self._users)
+            self._users_at = time.monotonic()
+        return self._users
+
+    async def _payload(self, message: str) -> dict:
+        users = await self._users_snapshot()
+        detected_user = self._matcher.find(message)
+        color_hex = users.get(detected_user, {}).get("color") or DEFAULT_COLOR
+        embed = {"title": "📢 Nuevo mensaje", "description": message,
+                 "color": int(color_hex.lstrip("#"), 16)}
+        if detected_user:
+            embed["footer"] = {"text": f"Mensaje detectado de {detected_user}"}
+        return {"embeds": [embed]}
+
+    def _digest_payload(self, notices: list) -> dict:
+        first = notices[0]
+        title = DIGEST_TITLES.get(first.kind, "📢 {n} mensajes en los últimos {window} s").format(
+            n=len(notices), amount=_pts(sum(n.amount for n in notices)),
+            topic=f" en {first.topic}" if first.topic else "", window=f"{self.digest_window:g}",
+        )
+        description = "\n".join(f"• {n.message}" for n in notices)
+        if len(description) > MAX_DESCRIPTION:
+            description = description[:MAX_DESCRIPTION - 1] + "…"
+        return {"embeds": [{"title": title, "description": description,
+                            "color": int(DEFAULT_COLOR.lstrip("#"), 16)}]}
+
+
+_notifier = None
+_notifier_lock = threading.Lock()
+
+
+def get_notifier() -> Notifier:
+    """Notificador compartido por todas las sesiones del proceso."""
+    global _notifier
+    if _notifier is None:
+        with _notifier_lock:
+            if _notifier is None:
+                import atexit
+                if setting("DISCORD_TRANSPORT", "discord") == "stub":
+                    transport = StubTransport()
+                else:
+                    transport = DiscordTransport(setting("DOKEN"))
+                _notifier = Notifier(
+                    transport,
+                    setting_int("DISCORD_CHANNEL_ID", DEFAULT_CHANNEL_ID),
+                    max_queue=setting_int("NOTIFIER_QUEUE_SIZE", 100),
+                    digest_window=setting_float("DISCORD_DIGEST_WINDOW_S", 0),  # 0: sin resumen
+                )
+                atexit.register(_notifier.close)
+    return _notifier
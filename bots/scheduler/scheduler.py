@@ -1,15 +1,304 @@
-from apscheduler.schedulers.blocking import BlockingScheduler
-import json, subprocess, pathlib
-from datetime import datetime
+"""
+Planificador de fases de eventos ⏰
+----------------------------------
+Sustituye al antiguo APScheduler que lanzaba un intérprete nuevo
+(`mi_script_accion.py`) por cada fase y perdía los trabajos al reiniciar.
 
-sched = BlockingScheduler()
-events = json.load(open("events.json", encoding="utf-8"))["events"]
+• Un solo proceso con un bucle asyncio: `python -m bots.scheduler.scheduler`.
+• Por cada evento de `pages/events.json` se planifican las fases:
+    - `open`   → abre las apuestas (`pages/betting.json`),
+    - `lock`   → las cierra (la página de UFC deja de aceptar combinadas),
+    - `settle` → liquida los resultados (`resolver.evaluar_apuestas`).
+• Los trabajos viven en SQLite (`SCHEDULER_DB`), así sobreviven a un reinicio.
+• Si el proceso estuvo parado (misfire):
+    - `catch_up` → se ejecuta igualmente (liquidar nunca debe perderse),
+    - `coalesce` → de las fases atrasadas de un evento solo se ejecuta la última
+      (no tiene sentido abrir y cerrar seguido una cartelera ya empezada).
+• Las acciones se ejecutan en un pool acotado de hilos (`SCHEDULER_WORKERS`);
+  las fases de un mismo evento van siempre en orden.
+• Cada `SCHEDULER_POLL_S` segundos se relee `pages/events.json` y, si cambió,
+  se replanifica sin tocar los trabajos ya ejecutados.
+• En la misma vuelta se relee `pages/results.json`: si cambió y tiene resultados
+  sin liquidar (p. ej. combates añadidos después de la fase `settle`), se
+  liquidan en ese momento en vez de esperar a la fase de otro evento.
+• Las lecturas de los sondeos van al pool de hilos, nunca al bucle asyncio.
+"""
 
-def job(event):
-    subprocess.Popen(["python", "mi_script_accion.py", json.dumps(event)])
+import asyncio
+import hashlib
+import json
+import sqlite3
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from pathlib import Path
 
-for ev in events:
-    run_date = datetime.fromisoformat(ev["datetime"])
-    sched.add_job(job, 'date', run_date=run_date, args=[ev], id=ev["phase"])
+from storage import get_backend, BETTING_PATH, EVENTS_PATH, RESULTS_PATH
+from storage.budget import request_lane
+from storage.config import setting, setting_int
 
-sched.start()
\ No newline at end of file
+DEFAULT_DB = "data/scheduler.db"
+MAX_ATTEMPTS = 3
+RETRY_DELAY = timedelta(minutes=5)
+
+Phase = namedtuple("Phase", "name hours misfire")  # horas desde las 00:00 del día del evento
+
+PHASES = (
+    Phase("open", setting_int("SCHEDULER_OPEN_HOURS", -7 * 24), "coalesce"),
+    Phase("lock", setting_int("SCHEDULER_LOCK_HOURS", 18), "coalesce"),
+    Phase("settle", setting_int("SCHEDULER_SETTLE_HOURS", 36), "catch_up"),
+)
+MISFIRES = {p.name: p.misfire for p in PHASES}
+PHASE_ORDER = {p.name: i for i, p in enumerate(PHASES)}
+
+Job = namedtuple("Job", "id phase sport event run_at")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id       TEXT PRIMARY KEY,
+    phase    TEXT NOT NULL,
+    sport    TEXT NOT NULL,
+    event    TEXT NOT NULL,
+    run_at   TEXT NOT NULL,
+    status   TEXT NOT NULL DEFAULT 'pending',  -- pending | running | done | failed | missed
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_run TEXT,
+    error    TEXT
+);
+CREATE INDEX IF NOT EXISTS jobs_pending ON jobs (run_at) WHERE status = 'pending';
+"""
+
+
+# ─────────────────────────── ACCIONES ─────────────────────────── #
+def set_betting(sport: str, event: str, state: str):
+    backend = get_backend()
+    betting = backend.load_fresh(BETTING_PATH, {})
+    betting.setdefault(sport, {})[event] = state
+    backend.save(BETTING_PATH, betting, f"Apuestas {state}: {event}")
+
+
+def settle(sport: str, event: str):
+    from resolver import evaluar_apuestas  # importa el motor solo si hace falta
+    evaluar_apuestas()
+
+
+ACTIONS = {
+    "open": lambda sport, event: set_betting(sport, event, "open"),
+    "lock": lambda sport, event: set_betting(sport, event, "locked"),
+    "settle": settle,
+}
+
+
+def digest(data) -> str:
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def event_name(event: dict) -> str:
+    return event.get("event") or event.get("match") or event["date"]
+
+
+def plan_jobs(events: dict) -> list:
+    """Trabajos de todas las fases de todos los eventos de `events.json`."""
+    from settlement import SPORT as SETTLED_SPORT
+    jobs = []
+    for sport, sport_events in events.items():
+        for event in sport_events:
+            try:
+                day = datetime.strptime(event["date"], "%Y-%m-%d")
+            except (KeyError, ValueError):
+                continue
+            name = event_name(event)
+            for phase in PHASES:
+                if phase.name == "settle" and sport != SETTLED_SPORT:
+                    continue
+                jobs.append(Job(f"{sport}:{name}:{phase.name}", phase.name, sport, name,
+                                day + timedelta(hours=phase.hours)))
+    return jobs
+
+
+# ─────────────────────────── ALMACÉN ─────────────────────────── #
+class JobStore:
+    def __init__(self, path: str):
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(path, isolation_level=None)
+        self.conn.executescript(SCHEMA)
+        # un trabajo que quedó a medias al morir el proceso se repite (las acciones son idempotentes)
+        self.conn.execute("UPDATE jobs SET status = 'pending' WHERE status = 'running'")
+
+    def sync(self, jobs: list):
+        """Alta/actualización de los trabajos pendientes; los ya ejecutados no se tocan."""
+        with self.conn:
+            self.conn.execute("BEGIN")
+            for job in jobs:
+                self.conn.execute(
+                    "INSERT INTO jobs (id, phase, sport, event, run_at) VALUES (?, ?, ?, ?, ?) "
+                    "ON CONFLICT (id) DO UPDATE SET run_at = excluded.run_at WHERE status = 'pending'",
+                    (job.id, job.phase, job.sport, job.event, job.run_at.isoformat()),
+                )
+            ids = [job.id for job in jobs]
+            self.conn.execute(
+                f"DELETE FROM jobs WHERE status = 'pending' AND id NOT IN ({','.join('?' * len(ids))})", ids
+            )
+
+    def due(self, now: datetime) -> list:
+        rows = self.conn.execute(
+            "SELECT id, phase, sport, event, run_at FROM jobs "
+            "WHERE status = 'pending' AND run_at <= ?", (now.isoformat(),)
+        )
+        jobs = [Job(i, p, s, e, datetime.fromisoformat(r)) for i, p, s, e, r in rows]
+        return sorted(jobs, key=lambda job: (job.run_at, PHASE_ORDER[job.phase]))
+
+    def next_run_at(self):
+        row = self.conn.execute("SELECT MIN(run_at) FROM jobs WHERE status = 'pending'").fetchone()
+        return datetime.fromisoformat(row[0]) if row[0] else None
+
+    def mark(self, job_id: str, status: str, error: str = None):
+        self.conn.execute("UPDATE jobs SET status = ?, error = ?, last_run = ? WHERE id = ?",
+                          (status, error, datetime.now().isoformat(), job_id))
+
+    def release(self, job_ids: list, not_before: datetime = None):
+        """Devuelve a `pending` trabajos marcados `running` que no llegaron a empezar,
+        sin adelantarlos a `not_before` (el reintento de la fase anterior)."""
+        floor = (not_before or datetime.min).isoformat()
+        self.conn.executemany("UPDATE jobs SET status = 'pending', run_at = MAX(run_at, ?) "
+                              "WHERE id = ? AND status = 'running'", [(floor, job_id) for job_id in job_ids])
+
+    def retry_or_fail(self, job_id: str, error: str):
+        """Vuelve a planificar el trabajo o lo da por fallido; devuelve la hora del reintento."""
+        attempts = self.conn.execute("SELECT attempts FROM jobs WHERE id = ?", (job_id,)).fetchone()[0] + 1
+        if attempts >= MAX_ATTEMPTS:
+            self.conn.execute("UPDATE jobs SET status = 'failed', attempts = ?, error = ?, last_run = ? "
+                              "WHERE id = ?", (attempts, error, datetime.now().isoformat(), job_id))
+            return None
+        retry_at = datetime.now() + RETRY_DELAY * attempts
+        self.conn.execute("UPDATE jobs SET status = 'pending', attempts = ?, error = ?, run_at = ? "
+                          "WHERE id = ?", (attempts, error, retry_at.isoformat(), job_id))
+        return retry_at
+
+
+# ─────────────────────────── PLANIFICADOR ─────────────────────────── #
+class Scheduler:
+    def __init__(self, store: JobStore, actions: dict = None, workers: int = 2,
+                 poll: float = 30.0, grace: float = 300.0):
+        self.store = store
+        self.actions = actions or ACTIONS
+        self.poll = poll
+        self.grace = timedelta(seconds=grace)
+        self._pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="scheduler")
+        self._events_hash = None
+        self._results_hash = None
+        self._running = set()  # tareas en curso (una por evento)
+
+    @staticmethod
+    def load_events() -> dict:
+        with request_lane("background"):  # sondeo periódico: nunca antes que una apuesta
+            return get_backend().load_fresh(EVENTS_PATH, {})
+
+    def reload_if_changed(self, events: dict = None) -> bool:
+        events = self.load_events() if events is None else events
+        events_hash = digest(events)
+        if events_hash == self._events_hash:
+            return False
+        self.store.sync(plan_jobs(events))
+        self._events_hash = events_hash
+        print("🔄 Eventos recargados")
+        return True
+
+    def settle_new_results(self) -> bool:
+        """Liquida si `results.json` cambió y le quedan resultados sin liquidar."""
+        from settlement import SPORT as SETTLED_SPORT, pending_results
+        with request_lane("background"):
+            results = get_backend().load_fresh(RESULTS_PATH, {})
+        results_hash = digest(results)
+        if results_hash == self._results_hash:
+            return False
+        settle = bool(pending_results(results))
+        if settle:
+            self.actions["settle"](SETTLED_SPORT, RESULTS_PATH)
+            print("✅ Resultados nuevos liquidados")
+        self._results_hash = results_hash  # tras liquidar: si falla, se reintenta en la siguiente vuelta
+        return settle
+
+    def _apply_misfires(self, due: list, now: datetime) -> list:
+        """Descarta (`missed`) las fases atrasadas que otra más reciente deja sin sentido."""
+        latest = {}
+        for job in due:  # `due` viene ordenado por run_at
+            if MISFIRES[job.phase] == "coalesce" and now - job.run_at > self.grace:
+                latest[(job.sport, job.event)] = job.id
+        runnable = []
+        for job in due:
+            late = now - job.run_at > self.grace
+            if late and MISFIRES[job.phase] == "coalesce" and latest[(job.sport, job.event)] != job.id:
+                self.store.mark(job.id, "missed")
+                print(f"⏭️ {job.id} atrasado: lo sustituye una fase posterior")
+            else:
+                runnable.append(job)
+        return runnable
+
+    async def _run_event(self, jobs: list):
+        loop = asyncio.get_running_loop()
+        for i, job in enumerate(jobs):  # en orden: open → lock → settle
+            try:
+                await loop.run_in_executor(self._pool, self.actions[job.phase], job.sport, job.event)
+            except Exception as e:
+                retry_at = self.store.retry_or_fail(job.id, repr(e))
+                # las fases siguientes vuelven a la cola y esperan al reintento de esta
+                self.store.release([later.id for later in jobs[i + 1:]], retry_at)
+                print(f"❌ {job.id}: {e}")
+                break
+            self.store.mark(job.id, "done")
+            print(f"✅ {job.id}")
+
+    def dispatch_due(self, now: datetime = None) -> list:
+        now = now or datetime.now()
+        by_event = {}
+        for job in self._apply_misfires(self.store.due(now), now):
+            by_event.setdefault((job.sport, job.event), []).append(job)
+        tasks = []
+        for jobs in by_event.values():
+            for job in jobs:
+                self.store.mark(job.id, "running")
+            task = asyncio.ensure_future(self._run_event(jobs))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+            tasks.append(task)
+        return tasks
+
+    async def run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            try:
+                # la lectura en el pool; el almacén SQLite, en el hilo del bucle
+                self.reload_if_changed(await loop.run_in_executor(self._pool, self.load_events))
+            except Exception as e:  # sin conexión: se reintenta en la siguiente vuelta
+                print(f"⚠️ No se pudo leer {EVENTS_PATH}: {e}")
+            try:
+                await loop.run_in_executor(self._pool, self.settle_new_results)
+            except Exception as e:
+                print(f"⚠️ No se pudieron liquidar los resultados nuevos: {e}")
+            self.dispatch_due()
+            next_run = self.store.next_run_at()
+            wait = self.poll
+            if next_run is not None:
+                wait = min(wait, max(0.0, (next_run - datetime.now()).total_seconds()))
+            await asyncio.sleep(wait)
+
+    def close(self):
+        self._pool.shutdown(wait=True)
+
+
+def main():
+    scheduler = Scheduler(
+        JobStore(setting("SCHEDULER_DB", DEFAULT_DB)),
+        workers=setting_int("SCHEDULER_WORKERS", 2),
+        poll=setting_int("SCHEDULER_POLL_S", 30),
+        grace=setting_int("SCHEDULER_MISFIRE_GRACE_S", 300),
+    )
+    try:
+        asyncio.run(scheduler.run())
+    finally:
+        scheduler.close()
+
+
+if __name__ == "__main__":
+    main()
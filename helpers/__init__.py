@@ -0,0 +1,16 @@
+"""
+Utilidades compartidas por las páginas 🧰
+----------------------------------------
+• `sendMessage` / `createEvent` → Discord (`helpers.notify`); `discord` solo se
+  importa al crear un evento, nunca al enviar un mensaje.
+• `lazy_import("pandas")` → módulo que se carga de verdad en el primer uso.
+
+Importar `helpers` no carga discord, pandas ni PyGithub
+(lo comprueba `python -m benchmarks.bench_startup`).
+"""
+
+from helpers.lazy import lazy_import
+from helpers.notify import createEvent, sendMessage
+from storage import append_bets as append_bet_to_history_github  # noqa: F401  (antiguo `scripts.py`)
+
+__all__ = ["lazy_import", "createEvent", "sendMessage", "append_bet_to_history_github"]
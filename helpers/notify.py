@@ -0,0 +1,21 @@
+"""Avisos de Discord para las páginas (ver `bots/notifier.py` y `bots/event_creator.py`)."""
+
+from storage.metrics import timed
+
+
+@timed("discord.send_message")
+def sendMessage(message, kind="message", amount=0, topic=None):
+    """Encola el mensaje en el notificador de fondo y vuelve enseguida.
+
+    `kind` / `amount` / `topic` permiten agruparlo con otros en el resumen periódico.
+    """
+    from bots.notifier import get_notifier
+    if not get_notifier().enqueue(message, kind=kind, amount=amount, topic=topic):
+        print("⚠️ Cola de Discord llena: mensaje descartado.")
+
+
+@timed("discord.create_event")
+def createEvent(title, description, image_path, date, time, url):
+    """Crea un evento programado en el servidor (importa `discord` solo aquí)."""
+    from bots.event_creator import createEvent as create
+    create(title, description, image_path, date, time, url)
@@ -0,0 +1,48 @@
+"""Tabla del historial de la página de perfil, construida por columnas (sin bucles por fila)."""
+
+import numpy as np
+import pandas as pd
+
+PAGE_SIZE = 25  # apuestas por página del historial
+ESTADOS = ["En progreso", "Ganado", "Perdido"]
+COLOR_ESTADO = {"En progreso": "gray", "Ganado": "green", "Perdido": "red"}
+
+
+def build_history(bets: list) -> pd.DataFrame:
+    """Tabla del historial (más nuevas primero) con columnas calculadas en bloque."""
+    df = pd.DataFrame(bets[::-1]).reindex(
+        columns=["timestamp", "sport", "description", "amount", "odds", "resolved", "won", "reward"]
+    )
+    resolved = df["resolved"].fillna(False).astype(bool)
+    won = resolved & df["won"].fillna(False).astype(bool)
+    lost = resolved & ~won
+    amount = df["amount"].fillna(0).astype(int)
+    reward = df["reward"].fillna(0).astype(int)
+
+    out = pd.DataFrame({
+        "fecha": pd.to_datetime(df["timestamp"], errors="coerce", format="ISO8601"),
+        "Deporte": df["sport"].fillna("-"),
+        "Apuesta": df["description"].fillna("-"),
+        "Cantidad": amount,
+        "Cuota": df["odds"].fillna(0),
+    })
+    out["Estado"] = pd.Categorical(
+        np.select([won, lost], ["Ganado", "Perdido"], "En progreso"), categories=ESTADOS
+    )
+    cobrado = reward > 0
+    out["color_res"] = np.select([cobrado, lost], ["green", "red"], "gray")
+    out["texto_res"] = np.select(
+        [cobrado, lost], ["+" + reward.astype(str), "-" + amount.astype(str)], "0"
+    )
+    out["Fecha"] = out["fecha"].dt.strftime("%d %b %Y").fillna(df["timestamp"].fillna("-"))
+    return out
+
+
+def to_html_page(page: pd.DataFrame) -> str:
+    page = page.assign(
+        Estado="<span style='color:" + page["Estado"].map(COLOR_ESTADO).astype(str)
+               + "; font-weight:bold'>" + page["Estado"].astype(str) + "</span>",
+        Resultado="<span style='color:" + page["color_res"] + "'>" + page["texto_res"] + "</span>",
+    )
+    return page[["Fecha", "Deporte", "Apuesta", "Cantidad", "Cuota", "Estado", "Resultado"]] \
+        .to_html(escape=False, index=False)
@@ -0,0 +1,86 @@
+"""
+Clasificación de rachas 🏆
+-------------------------
+• `pages/streaks.json` guarda, por deporte, la racha actual y la máxima de cada
+  usuario y el top `TOP_K` ya ordenado:
+
+    {"sports": {"ufc": {"users": {"thony": {"current": 2, "max": 5}},
+                        "top": [["thony", 5], ...]}}}
+
+• El motor de liquidación la actualiza con cada apuesta resuelta (en orden de
+  alta dentro de cada lote), así las páginas solo leen este documento pequeño en
+  vez de recorrer el historial de todos en cada recarga.
+• Si aún no existe se reconstruye una vez por proceso a partir del historial y
+  se guarda en memoria (las lecturas no escriben). Sigue valiendo hasta la primera
+  liquidación, que es la que resuelve apuestas y crea el documento.
+"""
+
+import copy
+import heapq
+import threading
+import weakref
+
+from storage import get_backend, StorageBackend, STREAKS_PATH
+from storage.budget import request_lane
+
+TOP_K = 10
+
+_rebuilt = weakref.WeakKeyDictionary()  # backend → clasificación reconstruida del historial
+_rebuild_lock = threading.Lock()
+
+
+class StreakBoard:
+    def __init__(self, data: dict = None):
+        self.data = data or {"sports": {}}
+
+    @classmethod
+    def from_history(cls, history) -> "StreakBoard":
+        """Construye la clasificación desde `(usuario, apuestas)` (p. ej. `iter_bets()`)."""
+        board = cls()
+        for user, bets in history:
+            for bet in sorted(bets, key=lambda b: b.get("timestamp", "")):
+                if bet.get("resolved"):
+                    board.record(user, bet.get("sport"), bool(bet.get("won")))
+        return board.refresh()
+
+    def record(self, user: str, sport: str, won: bool):
+        """Anota una apuesta resuelta de `user` (llamar en orden cronológico)."""
+        users = self.data["sports"].setdefault(sport, {"users": {}, "top": []})["users"]
+        stats = users.setdefault(user, {"current": 0, "max": 0})
+        if won:
+            stats["current"] += 1
+            stats["max"] = max(stats["max"], stats["current"])
+        else:
+            stats["current"] = 0
+
+    def refresh(self) -> "StreakBoard":
+        """Recalcula el top de cada deporte: O(usuarios · log TOP_K)."""
+        for sport_data in self.data["sports"].values():
+            best = heapq.nlargest(TOP_K, sport_data["users"].items(), key=lambda kv: kv[1]["max"])
+            sport_data["top"] = [[user, stats["max"]] for user, stats in best if stats["max"]]
+        return self
+
+    def top(self, sport: str, k: int = 1) -> list:
+        """`[(usuario, racha_máxima)]` de los `k` primeros de `sport`."""
+        return [tuple(row) for row in self.data["sports"].get(sport, {}).get("top", [])[:k]]
+
+
+def load_board(backend: StorageBackend = None, fresh: bool = False) -> StreakBoard:
+    backend = backend or get_backend()
+    with request_lane("background"):  # cede la cuota de GitHub a las apuestas
+        data = backend.load_fresh(STREAKS_PATH) if fresh else backend.load(STREAKS_PATH)
+        if data is None:
+            data = _rebuild(backend, fresh)
+    return StreakBoard(data)
+
+
+def _rebuild(backend: StorageBackend, fresh: bool) -> dict:
+    with _rebuild_lock:  # una sola reconstrucción aunque lleguen varias sesiones a la vez
+        if fresh or backend not in _rebuilt:
+            _rebuilt[backend] = StreakBoard.from_history(backend.iter_bets()).data
+        return copy.deepcopy(_rebuilt[backend])  # el motor de liquidación la modifica
+
+
+def top_streaks(sport: str, k: int = 1) -> list:
+    """Lectura para las páginas: los `k` usuarios con la racha más larga en `sport`."""
+    return load_board().top(sport, k)
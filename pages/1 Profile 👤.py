@@ -1,17 +1,19 @@
 """
 Página de estadísticas del usuario 📊
 -------------------------------------
-Versión B: con lectura de users.json y bets_history.json desde GitHub.
-
-Requiere que los archivos estén en la raíz del repo o en la ruta correcta dentro del repo.
-Asegúrate de definir correctamente GITHUB_TOKEN y REPO_NAME en tus secrets.
+Versión B: el usuario sale de la sesión firmada (`auth.py`) y su historial de la
+capa `storage`.
+Los totales, el ROI y la evolución salen del registro precalculado al liquidar
+(`user_stats.py`), no del historial.
 """
 
 import streamlit as st
 import pandas as pd
-import json
-from github import Github
-from datetime import datetime
+from auth import require_user
+from helpers.profile import ESTADOS, PAGE_SIZE, build_history, to_html_page
+from storage import cached_balance, user_bets as load_user_bets
+from storage.metrics import page_rerun
+from user_stats import load_stats
 
 # ────────────────────────────────
 # Config
@@ -20,105 +22,85 @@ st.set_page_config(
     page_title="Mis estadísticas",
     page_icon="📊"
 )
-
-USERS_FILE = "users.json"
-HISTORY_FILE = "pages/bets_history.json"
-
-
-# ────────────────────────────────
-# GitHub Helpers
-# ────────────────────────────────
-
-@st.cache_resource
-def get_repo():
-    token = st.secrets["GITHUB_TOKEN"]
-    repo_name = st.secrets["REPO_NAME"]
-    return Github(token).get_repo(repo_name)
-
-
-def load_json(path: str, default: dict = {}):
-    try:
-        contents = get_repo().get_contents(path)
-        return json.loads(contents.decoded_content.decode("utf-8"))
-    except Exception:
-        return default
+page_rerun("Profile")
 
 
 # ────────────────────────────────
 # Auth check
 # ────────────────────────────────
 
-if "user" not in st.session_state:
-    st.switch_page("Login.py")
+user = require_user()  # token validado en local, sin leer users.json
 
 # ────────────────────────────────
-# Load user data
+# UI
 # ────────────────────────────────
 
-user = st.session_state.user
-users = load_json(USERS_FILE, {})
-user_data = users.get(user, {})
+st.title("📊 Tus estadísticas")
 
-if not user_data:
-    st.error("Tu usuario no está en la base de datos.")
-    st.stop()
+st.markdown(f"**Nombre:** `{user}`")
+st.markdown(f"**Puntos disponibles:** `{cached_balance(user)}`")
+st.markdown("---")
 
 # ────────────────────────────────
-# UI
+# Resumen (registro precalculado)
 # ────────────────────────────────
 
-st.title("📊 Tus estadísticas")
+stats = load_stats(user)
 
-st.markdown(f"**Nombre:** `{user}`")
-st.markdown(f"**Puntos disponibles:** `{user_data.get('points', 0)}`")
-st.markdown("---")
+if stats["bets"]:
+    c1, c2, c3, c4 = st.columns(4)
+    c1.metric("Apuestas resueltas", stats["bets"])
+    c2.metric("% acierto", f"{stats['win_rate']:.0%}")
+    c3.metric("Balance", f"{stats['returned'] - stats['staked']:+}")
+    c4.metric("ROI", f"{stats['roi']:+.1%}")
+
+    st.dataframe(
+        pd.DataFrame.from_dict(stats["sports"], orient="index")[
+            ["bets", "won", "staked", "returned", "win_rate", "roi"]
+        ].rename(columns={"bets": "Apuestas", "won": "Ganadas", "staked": "Apostado",
+                          "returned": "Cobrado", "win_rate": "% acierto", "roi": "ROI"}),
+        use_container_width=True,
+    )
+
+    pnl = stats["pnl"]
+    st.line_chart(pd.Series(pnl["v"], index=pd.to_datetime(pnl["t"], unit="s"), name="Beneficio"))
+    st.markdown("---")
 
 # ────────────────────────────────
 # Historial de apuestas
 # ────────────────────────────────
 
-history_data = load_json(HISTORY_FILE, {})
-user_bets = history_data.get(user, [])
+user_bets = load_user_bets(user)  # solo el shard de este usuario
 
 if not user_bets:
     st.info("Todavía no has hecho ninguna apuesta.")
 else:
     st.subheader("📄 Historial de apuestas")
 
-    rows = []
-    for bet in reversed(user_bets):  # Mostrar los más nuevos primero
-        estado = "En progreso"
-        color = "gray"
-        if bet.get("resolved"):
-            if bet.get("won"):
-                estado = "Ganado"
-                color = "green"
-            else:
-                estado = "Perdido"
-                color = "red"
-
-        reward = bet.get("reward", 0)
-        resultado = (
-            int(f"-{bet.get('amount')}") if reward == 0 else int(reward)
-        )
-
-        try:
-            dt = datetime.fromisoformat(bet.get("timestamp", ""))
-            fecha = dt.strftime("%d %b %Y")
-        except:
-            fecha = bet.get("timestamp", "-")
-
-        rows.append({
-            "Fecha": fecha,
-            "Deporte": bet.get("sport", "-"),
-            "Apuesta": bet.get("description", "-"),
-            "Cantidad": bet.get("amount", 0),
-            "Cuota": bet.get("odds", 0),
-            "Estado": f"<span style='color:{color}; font-weight:bold'>{estado}</span>",
-            "Resultado": f"<span style='color:{'green' if resultado > 0 else ('red' if bet.get('resolved') and not bet.get('won') else 'gray')}'>{'+' + str(resultado) if resultado > 0 else ('-' + str(bet.get('amount', 0)) if bet.get('resolved') and not bet.get('won') else '0')}</span>"
-        })
-
-    df = pd.DataFrame(rows)
-
-    st.write("", unsafe_allow_html=True)
-    st.markdown(df.to_html(escape=False, index=False), unsafe_allow_html=True)
+    df = build_history(user_bets)
+
+    # Filtros: se aplican antes de generar el HTML
+    f1, f2 = st.columns(2)
+    deportes = f1.multiselect("Deporte", sorted(df["Deporte"].unique()))
+    estados = f2.multiselect("Estado", ESTADOS)
+    fechas = df["fecha"].dropna()
+    rango = st.date_input("Fechas", (fechas.min().date(), fechas.max().date())) if not fechas.empty else ()
+
+    mask = pd.Series(True, index=df.index)
+    if deportes:
+        mask &= df["Deporte"].isin(deportes)
+    if estados:
+        mask &= df["Estado"].isin(estados)
+    if len(rango) == 2:
+        desde, hasta = pd.Timestamp(rango[0]), pd.Timestamp(rango[1]) + pd.Timedelta(days=1)
+        mask &= df["fecha"].between(desde, hasta, inclusive="left") | df["fecha"].isna()
+    filtrado = df[mask]
+
+    if filtrado.empty:
+        st.info("Ninguna apuesta coincide con los filtros.")
+    else:
+        paginas = -(-len(filtrado) // PAGE_SIZE)
+        pagina = st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, value=1)
+        inicio = (pagina - 1) * PAGE_SIZE
+        st.caption(f"{inicio + 1}–{min(inicio + PAGE_SIZE, len(filtrado))} de {len(filtrado)} apuestas")
+        st.markdown(to_html_page(filtrado.iloc[inicio:inicio + PAGE_SIZE]), unsafe_allow_html=True)
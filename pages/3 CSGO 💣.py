@@ -2,7 +2,7 @@
 Streamlit Sports Betting Template 🏆
 ----------------------------------
 Este archivo define una app multipágina "fake" (controlada por un selector en la barra lateral)
-que lee dos archivos JSON situados en el mismo directorio:
+que lee dos documentos JSON a través de la capa `storage`:
 
 - **events.json** → calendario de próximos eventos por deporte
 - **bets.json**   → apuestas disponibles por deporte (cuota, recompensa…)
@@ -38,15 +38,15 @@ Las apuestas se ajustan en saltos de 10 puntos con los botones ➖/➕.
 La lógica de negocio es ultra‑simple y sirve solo como demo.
 """
 
-import json
-from pathlib import Path
 from datetime import datetime
 
-import pandas as pd
 import streamlit as st
+from auth import require_user
+from helpers import lazy_import
+from storage import load_many, append_bets, adjust_points, cached_balance, EVENTS_PATH
+from storage.metrics import page_rerun
 
-if "user" not in st.session_state:
-    st.switch_page("Login.py")  # manda al login si no hay sesión
+pd = lazy_import("pandas")  # solo se carga si hay eventos que listar
 
 # ────────────────────────────────────────────
 # Configuración básica de la app
@@ -57,41 +57,14 @@ st.set_page_config(
     layout="centered",
     initial_sidebar_state="expanded",
 )
+page_rerun("CSGO")
 
-DATA_DIR = Path(__file__).parent
-EVENTS_FILE = DATA_DIR / "events.json"
-BETS_FILE = DATA_DIR / "bets.json"
-USERS_FILE = DATA_DIR / "../users.json"
-
-STEP = 10  # puntos que suma / resta cada clic
-
-HISTORY_FILE = DATA_DIR / "bets_history.json"
+require_user()  # manda al login si no hay sesión válida
 
+EVENTS_FILE = EVENTS_PATH
+BETS_FILE = "pages/bets.json"
 
-def append_bet_to_history(user: str, bets: list):
-    history = load_json(HISTORY_FILE, {})
-    history.setdefault(user, [])
-    history[user].extend(bets)
-    save_json(HISTORY_FILE, history)
-
-
-# ────────────────────────────────────────────
-# Utils
-# ────────────────────────────────────────────
-
-def load_json(path: Path, default: dict) -> dict:
-    """Devuelve el JSON del disco o un default si no existe."""
-    try:
-        with path.open("r", encoding="utf-8") as fp:
-            return json.load(fp)
-    except FileNotFoundError:
-        return default
-
-
-def save_json(path: Path, data: dict) -> None:
-    """Helper opcional si decides persistir cambios en bets/events."""
-    with path.open("w", encoding="utf-8") as fp:
-        json.dump(data, fp, ensure_ascii=False, indent=2)
+STEP = 10  # puntos que suma / resta cada clic
 
 
 # ────────────────────────────────────────────
@@ -99,8 +72,8 @@ def save_json(path: Path, data: dict) -> None:
 # ────────────────────────────────────────────
 
 def main():
-    events_data = load_json(EVENTS_FILE, {})
-    bets_data = load_json(BETS_FILE, {})
+    docs = load_many([EVENTS_FILE, BETS_FILE])  # en paralelo
+    events_data, bets_data = docs[EVENTS_FILE], docs[BETS_FILE]
 
     sports = sorted(set(events_data.keys()) | set(bets_data.keys()))
     if not sports:
@@ -109,7 +82,7 @@ def main():
 
     # Estado global por sesión
     if "points" not in st.session_state:
-        st.session_state.points = 1000
+        st.session_state.points = cached_balance(st.session_state.user)
     if "stakes" not in st.session_state:
         st.session_state.stakes = {}  # key → cantidad apostada
 
@@ -180,10 +153,8 @@ def main():
             new_points = st.session_state.points - total_stake
             st.session_state.points = new_points  # ← ya están en memoria
 
-            # 2️⃣ Persiste el cambio en users.json
-            users = load_json(USERS_FILE, {})
-            users.setdefault(st.session_state.user, {})["points"] = new_points
-            save_json(USERS_FILE, users)  # ← se escribe en disco
+            # 2️⃣ Registra la apuesta en el libro de puntos
+            adjust_points({st.session_state.user: -total_stake}, "stake")
 
             timestamp = datetime.now().isoformat()
             bet_records = []
@@ -202,7 +173,7 @@ def main():
                     })
 
             # 4️⃣ Guardar en historial
-            append_bet_to_history(st.session_state.user, bet_records)
+            append_bets(st.session_state.user, bet_records)
 
             # 3️⃣ Mensaje de éxito y reseteo de stakes
             st.success(f"Apuesta registrada. ¡Mucha suerte! Te quedan {new_points} puntos.")
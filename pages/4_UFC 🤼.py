@@ -1,74 +1,50 @@
-# UFC – Combinadas 2.0  (versión B con persistencia en GitHub)  💊
+# UFC – Combinadas 2.0  (versión B con la capa de almacenamiento compartida)  💊
 # Coloca este archivo en la raíz del proyecto y ejecuta:  streamlit run UFC 🤼old.py
 
-import json, pandas as pd
+import hashlib
+import json
+import uuid
 from datetime import datetime
-from collections import defaultdict
-from pathlib import Path  # sigue importado por si lo necesitas en otro sitio
 
 import streamlit as st
-from github import Github
-from bots.event_creator import sendMessage
-
-
-# ───────────────────────────── GitHub helpers ────────────────────────────── #
-
-@st.cache_resource
-def get_repo():
-    token = st.secrets["GITHUB_TOKEN"]
-    repo_name = st.secrets["REPO_NAME"]
-    return Github(token).get_repo(repo_name)
-
-
-def load_json(path: str, default: dict = {}):
-    """Lee un JSON desde el repo de GitHub; si no existe, devuelve default."""
-    repo = get_repo()
-    try:
-        contents = repo.get_contents(path)
-        return json.loads(contents.decoded_content.decode())
-    except Exception:
-        return default
-
+from auth import require_user
+from helpers import lazy_import, sendMessage
+from leaderboard import top_streaks
+from settlement import SPORT, ROUND_BONUS, METHOD_BONUS
+from storage import (
+    load_json, load_many, cached_balance, submit_changes, EVENTS_PATH, BETTING_PATH,
+)
+from storage.metrics import page_rerun
 
-def save_json(path: str, data: dict):
-    """Guarda (o crea) un JSON en el repo de GitHub."""
-    repo = get_repo()
-    payload = json.dumps(data, indent=4, ensure_ascii=False)
-    try:
-        contents = repo.get_contents(path)
-        repo.update_file(path, f"Update {path}", payload, contents.sha)
-    except Exception:
-        repo.create_file(path, f"Create {path}", payload)
+pd = lazy_import("pandas")  # solo se carga si hay tabla que pintar
 
 
 # ───────────────────────────── Config básica ────────────────────────────── #
 
 st.set_page_config(page_title="👊🏼 UFC", page_icon="💊", layout="centered")
+page_rerun("UFC")
 
 # Los nombres de archivo son *paths* dentro del repo remoto
-EVENTS_FILE = "pages/events.json"
+EVENTS_FILE = EVENTS_PATH
 BETS_FILE = "pages/betsb.json"
-HISTORY_FILE = "pages/bets_history.json"
-USERS_FILE = "users.json"
 
-SPORT = "ufc"
-START_POINTS = 1000
 STAKE_UNIT = 10
-ROUND_BONUS = 1.20  # +20 %
-METHOD_BONUS = 1.10  # +10 %
+WRITE_TIMEOUT = 30  # segundos máximos esperando el acuse de la cola de escrituras
 
 # ───────────────────────────── Login mínimo ─────────────────────────────── #
 
-if "user" not in st.session_state:
-    st.switch_page("Login.py")
+require_user()
 if "points" not in st.session_state:
-    st.session_state.points = START_POINTS
+    st.session_state.points = cached_balance(st.session_state.user)
 if "picks" not in st.session_state:
     st.session_state.picks = {}
 
 # ───────────────────────────── Datos de eventos ─────────────────────────── #
 
-events_data = load_json(EVENTS_FILE, {})
+# Lo que lee la página, en una sola tanda paralela (la clasificación la pide
+# top_streaks por el carril `background`)
+page_docs = load_many([EVENTS_FILE, BETS_FILE, BETTING_PATH])
+events_data = page_docs[EVENTS_FILE]
 ufc_events = events_data.get(SPORT, [])
 
 today = datetime.now().date()
@@ -108,22 +84,9 @@ if ufc_events:
 else:
     st.info("No hay eventos UFC disponibles.")
 
-# 2) Ranking “Jugador más en racha”
-bets_history = load_json(HISTORY_FILE, {})
-user_streaks, max_streaks = defaultdict(int), defaultdict(int)
-
-for user, ub in bets_history.items():
-    cur = 0
-    for bet in sorted(ub, key=lambda x: x["timestamp"]):
-        if bet.get("sport") != SPORT:
-            continue
-        if bet.get("resolved") and bet.get("won"):
-            cur += 1
-            max_streaks[user] = max(max_streaks[user], cur)
-        elif bet.get("resolved"):
-            cur = 0
-
-nombre_top, racha_top = max(max_streaks.items(), key=lambda x: x[1], default=("Nadie", 0))
+# 2) Ranking “Jugador más en racha” (precalculado al liquidar, ver leaderboard.py)
+lideres = top_streaks(SPORT, 1)
+nombre_top, racha_top = lideres[0] if lideres else ("Nadie", 0)
 
 # Sidebar
 st.sidebar.header("💰 Saldo")
@@ -136,7 +99,7 @@ st.sidebar.markdown("---")
 events_all = events_data.get(SPORT, [])
 prox_event = next_event
 next_event_name = prox_event["event"] if prox_event else None
-bets_full = load_json(BETS_FILE, {}).get(SPORT, {})
+bets_full = page_docs[BETS_FILE].get(SPORT, {})
 bets_data = bets_full.get(next_event_name, bets_data)  # prioriza betsb.json si existe
 
 if prox_event:
@@ -236,32 +199,50 @@ if st.button("🚀 Enviar combinada"):
     if total_stake > st.session_state.points:
         st.error("No tienes saldo suficiente.")
         st.stop()
+    # el planificador (bots/scheduler) cierra las apuestas al empezar el evento
+    if load_json(BETTING_PATH, {}).get(SPORT, {}).get(next_event_name) == "locked":
+        st.error("Las apuestas para este evento ya están cerradas.")
+        st.stop()
 
-    # 1) Descontar saldo y persistir
-    st.session_state.points -= total_stake
-    users = load_json(USERS_FILE, {})
-    users.setdefault(st.session_state.user, {})["points"] = st.session_state.points
-    save_json(USERS_FILE, users)
-
-    # 2) Registrar en historial
-    history = load_json(HISTORY_FILE, {})
-    history.setdefault(st.session_state.user, [])
+    # 1) Descontar saldo + registrar en historial: se encola junto a las apuestas
+    #    de las demás sesiones y se guarda en una sola escritura agrupada
     ts = datetime.now().isoformat()
-
-    for f, p in st.session_state.picks.items():
-        history[st.session_state.user].append({
+    new_bets = [
+        {
             "timestamp": ts, "sport": SPORT, "fight": f,
             "corner": p["corner"], "fighter": p["fighter"],
             "amount": p["stake"], "odds": p["odds"],
             "round": p["round"], "method": p["method"],
             "resolved": False, "won": None,
-        })
-    save_json(HISTORY_FILE, history)
+        }
+        for f, p in st.session_state.picks.items()
+    ]
+    # misma combinada reenviada en esta sesión → misma clave → se guarda una sola vez
+    nonce = st.session_state.setdefault("submit_nonce", uuid.uuid4().hex)
+    picks_json = json.dumps(st.session_state.picks, sort_keys=True)
+    submit_key = hashlib.sha1(f"{nonce}{picks_json}".encode()).hexdigest()[:16]
+    ack = submit_changes(bets={st.session_state.user: new_bets},
+                         points={st.session_state.user: -total_stake}, kind="stake", key=submit_key)
+    with st.spinner("Registrando combinada…"):
+        try:
+            ack.result(timeout=WRITE_TIMEOUT)
+        except TimeoutError:
+            if ack.cancel():  # seguía en la cola: no se guardará
+                st.error("No se pudo registrar la combinada a tiempo, inténtalo de nuevo.")
+            else:
+                st.warning("⏳ La combinada se está guardando todavía. Revisa tu perfil en unos "
+                           "segundos; si la reenvías no se duplicará.")
+            st.stop()
+        except Exception as e:
+            st.error(f"No se pudo registrar la combinada, inténtalo de nuevo ({e}).")
+            st.stop()
+    st.session_state.points -= total_stake
+    st.session_state.pop("submit_nonce", None)
 
     # 3) Feedback + Discord
     st.success("💥 Combinada enviada. ¡Mucha suerte!")
-    discord_user = load_json(users, {})
-    discord_tag = discord_user.get(st.session_state.user, {}).get("discord", st.session_state.user)
-    sendMessage(f"🎰 @{discord_tag} ha apostado {total_stake} puntos a UFC")
+    discord_tag = st.session_state.profile.get("discord") or st.session_state.user
+    sendMessage(f"🎰 @{discord_tag} ha apostado {total_stake} puntos a UFC",
+                kind="bet", amount=total_stake, topic=next_event_name or "UFC")
     st.session_state.picks.clear()
     st.rerun()
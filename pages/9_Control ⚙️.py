@@ -1,67 +1,48 @@
 """
-🛠️ Editor de JSONs – Versión B (persistencia en GitHub)
--------------------------------------------------------
-• Todos los archivos (`users.json`, `events.json`, `betsb.json`, `results.json`,
-  `eventsPast.json`) se leen y guardan directamente en el repositorio remoto.
-• Necesitas definir en los *Secrets* de Streamlit:
+🛠️ Editor de JSONs – Versión B (capa de almacenamiento compartida)
+------------------------------------------------------------------
+• Todos los documentos (`users.json`, `events.json`, `betsb.json`, `results.json`,
+  `eventsPast.json`) se leen y guardan a través de `storage`.
+• Con `STORAGE_BACKEND = "github"` se usan los ficheros del repositorio remoto;
+  en ese caso define en los *Secrets* de Streamlit:
     GITHUB_TOKEN = "TU_TOKEN"
     REPO_NAME    = "usuario/repositorio"
+  y, con cualquier backend, la clave que firma las sesiones (ver `auth.py`):
+    SESSION_SECRET = "cadena larga al azar"
+• La sección 📈 Métricas muestra lo que registra `storage.metrics` en este proceso:
+  llamadas por rerun de cada página, latencias, bytes y rate limit restante.
 """
 
 import streamlit as st
-import json
 import random
-from github import Github
+from auth import restore_session
+from passwords import hash_password
 from resolver import evaluar_apuestas
-
-
-# ─────────────────── GITHUB HELPERS ───────────────────
-
-@st.cache_resource
-def get_repo():
-    token = st.secrets["GITHUB_TOKEN"]
-    repo_name = st.secrets["REPO_NAME"]
-    return Github(token).get_repo(repo_name)
-
-
-def cargar_json(path: str) -> dict:
-    """Lee un JSON del repo. Devuelve {} si no existe o está vacío."""
-    try:
-        contents = get_repo().get_contents(path)
-        return json.loads(contents.decoded_content.decode("utf-8"))
-    except Exception:
-        return {}
-
-
-def guardar_json(path: str, data: dict):
-    """Crea o actualiza un JSON en el repo."""
-    repo = get_repo()
-    payload = json.dumps(data, indent=4, ensure_ascii=False)
-    try:
-        contents = repo.get_contents(path)
-        repo.update_file(path, f"Update {path}", payload, contents.sha)
-    except Exception:
-        repo.create_file(path, f"Create {path}", payload)
+from storage import (
+    load_json as cargar_json, load_many as cargar_varios, save_json as guardar_json, save_many,
+    adjust_points, balance,
+    USERS_PATH, EVENTS_PATH, RESULTS_PATH,
+)
+from storage.config import setting
+from storage.metrics import REGISTRY, page_rerun
 
 
 # ─────────────────── RUTAS (relativas a la raíz del repo) ───────────────────
-USERS_PATH = "users.json"
-EVENTS_PATH = "pages/events.json"
 BETS_FILE = "pages/betsb.json"
-RESULTS_PATH = "pages/results.json"
 EVENTS_PAST_PATH = "pages/eventsPast.json"
 
 # ─────────────────── INTERFAZ ───────────────────
 
 st.set_page_config("Editor de Datos")
+page_rerun("Control")
 st.title("🛠️ Editor de JSONs")
 
 # Solo Thony y Artesuave pueden pasar
-if st.session_state.get("user") not in ["Thony", "Artesuave"]:
+if restore_session() not in ["Thony", "Artesuave"]:
     st.warning("⚠️ Acceso denegado. Redirigiendo a tu perfil...")
     st.switch_page("/Users/thonyshub/PycharmProjects/lonch/pages/1 Profile 👤.py")
 
-seccion = st.sidebar.radio("Selecciona sección", ["👤 Usuarios", "🥊 Eventos"])
+seccion = st.sidebar.radio("Selecciona sección", ["👤 Usuarios", "🥊 Eventos", "📈 Métricas"])
 
 # ══════════════════════ USUARIOS ══════════════════════
 if seccion == "👤 Usuarios":
@@ -74,19 +55,22 @@ if seccion == "👤 Usuarios":
         if usuario_seleccionado:
             with st.form(f"editar_usuario_{usuario_seleccionado}"):
                 st.subheader(f"Editar usuario: {usuario_seleccionado}")
-                password = st.text_input("Contraseña", users[usuario_seleccionado]["password"])
-                points = st.number_input("Puntos", value=users[usuario_seleccionado]["points"], step=1)
+                password = st.text_input("Nueva contraseña (vacío = no cambiar)", type="password")
+                saldo = balance(usuario_seleccionado)
+                points = st.number_input("Puntos", value=saldo, step=1)
                 color = st.color_picker("Color", users[usuario_seleccionado]["color"])
                 discord = st.text_input("Discord", users[usuario_seleccionado].get("discord", ""))
 
                 if st.form_submit_button("💾 Guardar cambios"):
                     users[usuario_seleccionado] = {
-                        "password": password,
-                        "points": points,
+                        "password": hash_password(password) if password
+                        else users[usuario_seleccionado]["password"],
                         "color": color,
                         "discord": discord
                     }
                     guardar_json(USERS_PATH, users)
+                    if points != saldo:  # el saldo se corrige con un movimiento, no se pisa
+                        adjust_points({usuario_seleccionado: points - saldo}, "admin_adjust")
                     st.success("Usuario actualizado.")
     else:
         st.warning("No hay usuarios disponibles para editar.")
@@ -110,19 +94,60 @@ if seccion == "👤 Usuarios":
                 st.error("Ese usuario ya existe.")
             else:
                 users[nuevo_usuario] = {
-                    "password": nueva_contraseña,
-                    "points": nuevos_puntos,
+                    "password": hash_password(nueva_contraseña),
                     "color": nuevo_color,
                     "discord": nuevo_discord
                 }
                 guardar_json(USERS_PATH, users)
+                adjust_points({nuevo_usuario: nuevos_puntos}, "admin_adjust")
                 st.success("Usuario añadido.")
                 st.rerun()
 
+# ══════════════════════ MÉTRICAS ══════════════════════
+elif seccion == "📈 Métricas":
+    from datetime import datetime as dt
+
+    st.header("📈 Métricas del proceso")
+    st.caption(f"Desde {dt.fromtimestamp(REGISTRY.started_at):%d/%m %H:%M:%S}, todas las sesiones.")
+
+    cuotas = REGISTRY.rate_limits
+    if cuotas:
+        columnas = st.columns(len(cuotas))
+        for col, (servicio, (restantes, limite, reinicio)) in zip(columnas, sorted(cuotas.items())):
+            col.metric(f"Rate limit {servicio}", f"{restantes}" + (f" / {limite}" if limite else ""))
+            if reinicio:
+                col.caption(f"Se renueva a las {dt.fromtimestamp(reinicio):%H:%M:%S}")
+
+    st.subheader("📄 Por página")
+    paginas = REGISTRY.pages()
+    if paginas:
+        st.dataframe(sorted(paginas, key=lambda p: p["ms en llamadas/rerun"], reverse=True),
+                     hide_index=True, use_container_width=True)
+    else:
+        st.info("Todavía no hay reruns registrados.")
+
+    st.subheader("⏱️ Por operación")
+    operaciones = REGISTRY.operations()
+    if operaciones:
+        st.dataframe(operaciones, hide_index=True, use_container_width=True)
+    else:
+        st.info("Todavía no hay llamadas registradas.")
+
+    col_exportar, col_reiniciar = st.columns(2)
+    col_exportar.download_button("⬇️ Exportar (Prometheus)", REGISTRY.prometheus(),
+                                 file_name="lalonch.prom", mime="text/plain")
+    if col_reiniciar.button("🧹 Reiniciar contadores"):
+        REGISTRY.reset()
+        st.rerun()
+    if setting("METRICS_FILE"):
+        st.caption(f"También se vuelcan a `{setting('METRICS_FILE')}`.")
+
 # ══════════════════════ EVENTOS ══════════════════════
 elif seccion == "🥊 Eventos":
     st.header("🥊 Editar `events.json`")
-    eventos = cargar_json(EVENTS_PATH)
+    # los cuatro documentos de la sección en una sola tanda paralela
+    datos = cargar_varios([EVENTS_PATH, EVENTS_PAST_PATH, BETS_FILE, RESULTS_PATH])
+    eventos = datos[EVENTS_PATH]
 
     if not eventos:
         st.error("No hay eventos en el archivo.")
@@ -237,10 +262,10 @@ elif seccion == "🥊 Eventos":
     st.markdown("---")
     st.header("✅ Añadir resultados del evento más reciente")
 
-    eventos = cargar_json(EVENTS_PATH)
-    eventos_pasados_db = cargar_json(EVENTS_PAST_PATH)
-    bets_data = cargar_json(BETS_FILE)
-    results_data = cargar_json(RESULTS_PATH)
+    eventos = cargar_json(EVENTS_PATH)  # copia sin los cambios de los formularios de arriba
+    eventos_pasados_db = datos[EVENTS_PAST_PATH]
+    bets_data = datos[BETS_FILE]
+    results_data = datos[RESULTS_PATH]
 
     from datetime import datetime as dt
 
@@ -314,10 +339,9 @@ elif seccion == "🥊 Eventos":
     if not combates_restantes:
         st.info("✅ Todos los combates resueltos. Archivando evento…")
         eventos["ufc"] = [e for e in eventos["ufc"] if e["event"] != evento["event"]]
-        guardar_json(EVENTS_PATH, eventos)
-
         eventos_pasados_db.setdefault("ufc", []).append(evento)
-        guardar_json(EVENTS_PAST_PATH, eventos_pasados_db)
+        save_many({EVENTS_PATH: eventos, EVENTS_PAST_PATH: eventos_pasados_db},
+                  f"Archive {evento['event']}")
 
         st.success("🎉 Evento archivado.")
         evaluar_apuestas()
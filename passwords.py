@@ -0,0 +1,74 @@
+"""
+Contraseñas con bcrypt 🔑
+------------------------
+• `users.json` guarda hashes bcrypt (`$2b$<coste>$...`) en vez de texto plano.
+• El coste se configura con `BCRYPT_COST`; si un hash tiene otro coste se
+  rehace en el siguiente login correcto (`needs_rehash`).
+• Los registros antiguos en texto plano se siguen aceptando y se convierten al
+  entrar, o todos de golpe con `python passwords.py migrate`.
+• La verificación corre en un pool pequeño (`BCRYPT_WORKERS`): bcrypt suelta el
+  GIL, así varios logins a la vez no bloquean el servidor de Streamlit.
+"""
+
+import hmac
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+import bcrypt
+
+from storage.config import setting_int
+
+COST = setting_int("BCRYPT_COST", 12)
+WORKERS = setting_int("BCRYPT_WORKERS", 2)
+_pool = ThreadPoolExecutor(max_workers=WORKERS, thread_name_prefix="bcrypt")
+
+
+def is_hashed(stored: str) -> bool:
+    return stored.startswith(("$2a$", "$2b$", "$2y$"))
+
+
+def hash_password(password: str, cost: int = None) -> str:
+    return bcrypt.hashpw(password.encode("utf-8"), bcrypt.gensalt(cost or COST)).decode("ascii")
+
+
+def needs_rehash(stored: str) -> bool:
+    return not is_hashed(stored) or int(stored.split("$")[2]) != COST
+
+
+def verify(password: str, stored: str) -> bool:
+    if not stored:
+        return False
+    if is_hashed(stored):
+        return bcrypt.checkpw(password.encode("utf-8"), stored.encode("ascii"))
+    return hmac.compare_digest(password.encode("utf-8"), stored.encode("utf-8"))  # registro antiguo
+
+
+def verify_async(password: str, stored: str):
+    """`Future` con el resultado de `verify`, calculado en el pool de bcrypt."""
+    return _pool.submit(verify, password, stored)
+
+
+def migrate_users(users: dict) -> int:
+    """Convierte a hash las contraseñas en texto plano de `users`; devuelve cuántas."""
+    plain = [u for u, data in users.items() if data.get("password") and not is_hashed(data["password"])]
+    hashes = _pool.map(hash_password, [users[u]["password"] for u in plain])
+    for user, hashed in zip(plain, hashes):
+        users[user]["password"] = hashed
+    return len(plain)
+
+
+def migrate():
+    from storage import get_backend, USERS_PATH
+    backend = get_backend()
+    users = backend.load_fresh(USERS_PATH, {})
+    changed = migrate_users(users)
+    if changed:
+        backend.save(USERS_PATH, users, f"Migrar {changed} contraseñas a bcrypt")
+    print(f"🔑 {changed} contraseñas convertidas a bcrypt (coste {COST}).")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["migrate"]:
+        migrate()
+    else:
+        print("Uso: python passwords.py migrate")
@@ -0,0 +1,64 @@
+"""
+Banco de preguntas compartido ❔
+-------------------------------
+• `quiz/ufcQ.json` se lee una vez por proceso y se guarda como una tupla de
+  `Question` inmutables (texto, opciones en tupla, índice de la correcta).
+• Todas las sesiones comparten el mismo banco; cada una solo guarda su orden de
+  preguntas como `array('H')` (2 bytes por pregunta) y la versión del banco.
+• Si cambia la fecha de modificación del fichero se vuelve a cargar; las
+  sesiones con una versión antigua empiezan un quiz nuevo.
+"""
+
+import json
+import os
+import random
+import threading
+from array import array
+from collections import namedtuple
+
+QUESTIONS_FILE = "quiz/ufcQ.json"
+
+Question = namedtuple("Question", "text options answer")  # answer = índice en options
+
+
+class QuizBank:
+    __slots__ = ("questions", "version")
+
+    def __init__(self, questions: tuple, version: int):
+        self.questions = questions
+        self.version = version
+
+    @classmethod
+    def from_file(cls, path: str, version: int) -> "QuizBank":
+        with open(path, "r", encoding="utf-8") as f:
+            raw = json.load(f)
+        questions = []
+        for q in raw:
+            options = tuple(q["opciones"])
+            questions.append(Question(q["pregunta"], options, options.index(q["respuesta_correcta"])))
+        return cls(tuple(questions), version)
+
+    def __len__(self):
+        return len(self.questions)
+
+    def permutation(self) -> array:
+        """Orden aleatorio de preguntas para una sesión."""
+        order = array("H", range(len(self.questions)))
+        random.shuffle(order)
+        return order
+
+
+_banks = {}
+_lock = threading.Lock()
+
+
+def get_bank(path: str = QUESTIONS_FILE) -> QuizBank:
+    """Banco del proceso; se recarga solo si el fichero cambió (un `stat` por llamada)."""
+    mtime = os.stat(path).st_mtime_ns
+    bank = _banks.get(path)
+    if bank is None or bank.version != mtime:
+        with _lock:
+            bank = _banks.get(path)
+            if bank is None or bank.version != mtime:
+                bank = _banks[path] = QuizBank.from_file(path, mtime)
+    return bank
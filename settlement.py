@@ -0,0 +1,113 @@
+"""
+Motor de liquidación incremental ⚖️
+----------------------------------
+• Solo mira los resultados nuevos de `pages/results.json`: los que aún no tienen
+  `settled`, aunque el evento ya se liquidara antes (`checked`) y se hayan
+  añadido después. Un evento `checked` sin ningún `settled` lo cerró el
+  evaluador antiguo, que no marcaba cada combate: se da por liquidado.
+• Pide al backend únicamente las apuestas abiertas de esos combates, a través del
+  índice `(deporte, combate normalizado)`, en vez de recorrer todo el historial.
+• Guarda en una sola operación las apuestas resueltas, los premios de los
+  usuarios afectados, los resultados marcados y la clasificación de rachas
+  (`leaderboard.py`) y las estadísticas de cada usuario (`user_stats.py`)
+  actualizadas con esas apuestas.
+
+Coste: O(resultados nuevos + apuestas que casan), no O(historial completo).
+"""
+
+from collections import namedtuple
+
+from leaderboard import load_board
+from storage import get_backend, StorageBackend, RESULTS_PATH, STREAKS_PATH
+from storage.base import fight_key
+from user_stats import load_stats, record_bet, stats_path
+
+SPORT = "ufc"
+ROUND_BONUS = 1.20  # +20 %
+METHOD_BONUS = 1.10  # +10 %
+
+# resultados liquidados, apuestas resueltas, usuarios afectados, puntos pagados
+SettlementReport = namedtuple("SettlementReport", "results bets users points")
+
+
+def open_events(results: dict) -> list:
+    """Eventos de `results` que pueden tener resultados sin liquidar."""
+    events = []
+    for event_data in results.values():
+        fights = [r for r in event_data.values() if isinstance(r, dict)]
+        if event_data.get("checked") and not any(r.get("settled") for r in fights):
+            continue  # liquidado por el evaluador antiguo
+        events.append(event_data)
+    return events
+
+
+def pending_results(results: dict) -> dict:
+    """`{combate_normalizado: resultado}` de los resultados aún sin liquidar."""
+    pending = {}
+    for event_data in open_events(results):
+        for fight, resultado in event_data.items():
+            if isinstance(resultado, dict) and not resultado.get("settled"):
+                pending[fight_key(fight)] = resultado
+    return pending
+
+
+def evaluate_bet(apuesta: dict, resultado: dict) -> dict:
+    """Campos que hay que fijar en la apuesta según el resultado del combate."""
+    win = (
+            apuesta["corner"] == resultado["winner_corner"] and
+            apuesta["fighter"].strip().lower() ==
+            resultado["winner_name"].strip().lower()
+    )
+    if not win:
+        return {"resolved": True, "won": False, "reward": 0}
+
+    reward = apuesta["amount"] * apuesta["odds"]
+
+    # Bonus round
+    if apuesta.get("round") and apuesta["round"] == resultado.get("round"):
+        reward *= ROUND_BONUS
+
+    # Bonus método
+    if apuesta.get("method") and apuesta["method"] == resultado.get("method"):
+        reward *= METHOD_BONUS
+
+    return {"resolved": True, "won": True, "reward": round(reward)}
+
+
+class SettlementEngine:
+    def __init__(self, backend: StorageBackend = None):
+        self.backend = backend or get_backend()
+
+    def run(self) -> SettlementReport:
+        results = self.backend.load_fresh(RESULTS_PATH, {})
+        pending = pending_results(results)
+        if not pending:
+            return SettlementReport(0, 0, 0, 0)
+
+        board = load_board(self.backend, fresh=True)
+        updates, points, users, resolved = {}, {}, set(), []
+        for ref, username, apuesta in self.backend.open_bets(SPORT, pending):
+            fields = evaluate_bet(apuesta, pending[fight_key(apuesta["fight"])])
+            updates[ref] = fields
+            users.add(username)
+            resolved.append((apuesta.get("timestamp", ""), username, apuesta, fields))
+            if fields["reward"]:
+                points[username] = points.get(username, 0) + fields["reward"]
+
+        stats = {u: load_stats(u, self.backend, fresh=True) for u in users}
+        for _, username, apuesta, fields in sorted(resolved, key=lambda r: r[0]):
+            board.record(username, SPORT, fields["won"])
+            record_bet(stats[username], apuesta, fields)
+
+        # marcar resultados y eventos evaluados
+        for event_data in open_events(results):
+            for resultado in event_data.values():
+                if isinstance(resultado, dict):
+                    resultado["settled"] = True
+            event_data["checked"] = True
+
+        docs = {RESULTS_PATH: results, STREAKS_PATH: board.refresh().data}
+        docs.update((stats_path(u), record) for u, record in stats.items())
+        self.backend.settle(updates, points, docs,
+                            f"Liquidar {len(pending)} combates ({len(updates)} apuestas)")
+        return SettlementReport(len(pending), len(updates), len(users), sum(points.values()))
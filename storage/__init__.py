@@ -0,0 +1,265 @@
+"""
+Capa de almacenamiento compartida 🗄️
+-----------------------------------
+Sustituye a las copias de `get_repo` / `load_json` / `save_json` que tenía cada página.
+
+• `STORAGE_BACKEND = "sqlite"` (por defecto) → base local en `SQLITE_PATH`.
+• `STORAGE_BACKEND = "github"` → ficheros del repo remoto (GITHUB_TOKEN + REPO_NAME),
+  con caché de lecturas configurable (`GITHUB_CACHE_TTL` segundos, `GITHUB_CACHE_SIZE` rutas).
+  Con `GITHUB_FAKE = "1"` el repo es un doble en memoria (`storage.fake_github`).
+  Si GitHub no responde o se agota la cuota se lanza `StorageUnavailable`
+  (ver `storage.github_client`) en vez de devolver un documento vacío.
+  Cada `GITHUB_SYNC_INTERVAL_S` s (`0` lo desactiva) se comprueba si la rama se
+  movió y se refrescan solo las rutas cambiadas (`storage.sync`); `on_change`
+  registra avisos para invalidar cachés de las páginas.
+• `STORAGE_BACKEND = "git"` → clon local del repo de datos (`storage.git_backend`):
+  lecturas desde disco; apuestas y movimientos en commits locales que se suben por
+  lotes, documentos y liquidaciones en el momento.
+• `STORAGE_BACKEND = "memory"` → todo en memoria (pruebas y benchmarks).
+• `export_to_github()` vuelca los documentos locales al repo remoto.
+• `submit_changes()` agrupa apuestas y puntos de todas las sesiones en una
+  sola escritura cada `WRITE_QUEUE_INTERVAL_MS` ms o `WRITE_QUEUE_MAX_BATCH` cambios.
+• Cada llamada de esta API queda medida en `storage.metrics` (llamadas, latencia).
+
+Uso desde una página:
+
+    from storage import load_json, load_many, save_json
+    users = load_json("users.json", {})
+    docs = load_many([EVENTS_PATH, RESULTS_PATH])  # en paralelo
+"""
+
+import threading
+import time
+
+from storage.base import (  # noqa: F401  (se reexportan para las páginas y los bots)
+    StorageBackend, StorageConflict, StorageUnavailable,
+    USERS_PATH, HISTORY_PATH, EVENTS_PATH, RESULTS_PATH,
+)
+from storage.paths import BETTING_PATH, STREAKS_PATH  # noqa: F401
+from storage.config import setting, setting_float, setting_int
+from storage.metrics import timed
+
+DEFAULT_SQLITE_PATH = "data/lalonch.db"
+DEFAULT_CLONE_PATH = "data/clone"
+
+_backend = None
+_backend_lock = threading.Lock()
+_write_queue = None
+_sync = None
+_change_listeners = []
+_balance_cache = {}  # usuario → (time.monotonic(), saldo)
+
+
+def create_backend(kind: str) -> StorageBackend:
+    if kind == "sqlite":
+        from storage.sqlite_backend import SQLiteBackend
+        return SQLiteBackend(setting("SQLITE_PATH", DEFAULT_SQLITE_PATH))
+    if kind == "github":
+        from storage.cache import ContentCache
+        from storage.github_backend import GitHubBackend
+        cache = ContentCache(ttl=setting_float("GITHUB_CACHE_TTL", 30.0),
+                             max_entries=setting_int("GITHUB_CACHE_SIZE", 64))
+        repo = None
+        if str(setting("GITHUB_FAKE", "")).lower() in ("1", "true"):
+            from storage.fake_github import from_settings
+            repo = from_settings()
+        return GitHubBackend(setting("GITHUB_TOKEN"), setting("REPO_NAME"), cache, repo=repo)
+    if kind == "git":
+        from storage.git_backend import GitCloneBackend, github_url
+        backend = GitCloneBackend(
+            setting("GIT_REMOTE_URL") or github_url(setting("GITHUB_TOKEN"), setting("REPO_NAME")),
+            setting("GIT_CLONE_PATH", DEFAULT_CLONE_PATH),
+            branch=setting("GIT_BRANCH", "main"),
+            push_interval=setting_float("GIT_PUSH_INTERVAL_S", 5.0),
+            push_threshold=setting_int("GIT_PUSH_THRESHOLD", 20),
+        )
+        backend.listeners.append(_notify_change)
+        return backend
+    if kind == "memory":
+        from storage.memory_backend import MemoryBackend
+        return MemoryBackend()
+    raise ValueError(f"Backend de almacenamiento desconocido: {kind!r}")
+
+
+def get_backend() -> StorageBackend:
+    """Backend compartido por todo el proceso (se crea en el primer uso)."""
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                backend = create_backend(setting("STORAGE_BACKEND", "sqlite"))
+                _start_sync(backend)
+                _backend = backend
+    return _backend
+
+
+def _start_sync(backend: StorageBackend):
+    global _sync
+    interval = setting_float("GITHUB_SYNC_INTERVAL_S", 15)
+    if backend.name != "github" or interval <= 0:
+        return
+    from storage.sync import DeltaSync
+    _sync = DeltaSync(backend, interval, cache_ttl=setting_float("GITHUB_SYNC_CACHE_TTL", 600))
+    _sync.add_listener(_notify_change)
+    _sync.start()
+
+
+def on_change(callback):
+    """Registra `callback(rutas)` para cuando la sincronización vea cambios hechos por
+    otro proceso (`rutas = None` si pudo cambiar todo). Sirve como decorador."""
+    _change_listeners.append(callback)
+    return callback
+
+
+def _notify_change(paths):
+    for callback in list(_change_listeners):
+        try:
+            callback(paths)
+        except Exception as e:  # un oyente roto no deja sin aviso a los demás
+            print(f"⚠️ Error al invalidar tras sincronizar: {e}")
+
+
+def set_backend(backend: StorageBackend):
+    """Fuerza un backend concreto (scripts, pruebas, benchmarks)."""
+    global _backend
+    with _backend_lock:
+        _backend = backend
+
+
+# ─────────────────── API para las páginas ───────────────────
+
+@timed("storage.load_json")
+def load_json(path: str, default=None):
+    """Lee un documento; si no existe, devuelve `default` ({} si no se indica)."""
+    return get_backend().load(path, {} if default is None else default)
+
+
+@timed("storage.load_many")
+def load_many(paths) -> dict:
+    """Lee de una vez los documentos que necesita una página: `{ruta: documento}`.
+    En GitHub se descargan en paralelo; los que no existen vienen como `{}`."""
+    docs = get_backend().load_many(paths)
+    return {path: {} if doc is None else doc for path, doc in docs.items()}
+
+
+@timed("storage.save_json")
+def save_json(path: str, data, message: str = None):
+    """Crea o reemplaza un documento."""
+    backend = get_backend()
+    if path == USERS_PATH:  # los `points` que quedan en users.json pasan antes al libro
+        backend.bootstrap_ledger()
+    backend.save(path, data, message)
+
+
+@timed("storage.save_many")
+def save_many(docs: dict, message: str = None):
+    """Guarda varios documentos juntos (una transacción / un commit si el backend lo permite)."""
+    backend = get_backend()
+    if USERS_PATH in docs:  # los `points` que quedan en users.json pasan antes al libro
+        backend.bootstrap_ledger()
+    backend.save_many(docs, message)
+
+
+@timed("storage.apply_changes")
+def apply_changes(bets: dict = None, entries: list = None, message: str = None):
+    """Apuestas nuevas + movimientos del libro de puntos en una sola escritura."""
+    get_backend().apply_changes(bets=bets, entries=entries, message=message)
+
+
+def get_write_queue():
+    """Cola de escrituras agrupadas compartida por todas las sesiones del proceso."""
+    global _write_queue
+    if _write_queue is None:
+        with _backend_lock:
+            if _write_queue is None:
+                import atexit
+                from storage.write_queue import WriteQueue
+                _write_queue = WriteQueue(
+                    get_backend,
+                    interval=setting_int("WRITE_QUEUE_INTERVAL_MS", 500) / 1000,
+                    max_batch=setting_int("WRITE_QUEUE_MAX_BATCH", 50),
+                )
+                atexit.register(_write_queue.flush, 10)
+    return _write_queue
+
+
+def submit_changes(bets: dict = None, points: dict = None, kind: str = "stake", key: str = None):
+    """Encola apuestas y deltas de puntos (`{usuario: delta}` de tipo `kind`) en la
+    cola compartida; devuelve un `Future` de acuse.
+
+    Con `key` (único por envío del formulario) reenviar lo mismo es inofensivo:
+    las apuestas y sus movimientos solo se guardan la primera vez."""
+    from storage.ledger import make_entries
+    if key:
+        bets = {user: [{**bet, "key": key} for bet in new_bets] for user, new_bets in (bets or {}).items()}
+    ack = get_write_queue().submit(bets=bets, entries=make_entries(points or {}, kind, key))
+    ack.add_done_callback(lambda _: _forget_balances(points or {}))
+    return ack
+
+
+@timed("storage.user_bets")
+def user_bets(user: str) -> list:
+    """Historial de un solo usuario (sin descargar el de todos)."""
+    return get_backend().user_bets(user)
+
+
+def iter_bets():
+    """Genera `(usuario, apuestas)` usuario a usuario."""
+    return get_backend().iter_bets()
+
+
+@timed("storage.append_bets")
+def append_bets(user: str, bets: list):
+    get_backend().append_bets(user, bets)
+
+
+@timed("storage.adjust_points")
+def adjust_points(deltas: dict, kind: str):
+    """Movimientos del libro de puntos: `stake`, `payout`, `quiz_reward` o `admin_adjust`."""
+    get_backend().adjust_points(deltas, kind)
+    _forget_balances(deltas)
+
+
+@timed("storage.balance")
+def balance(user: str) -> int:
+    """Saldo actual (snapshot + movimientos posteriores)."""
+    return get_backend().balance(user)
+
+
+def cached_balance(user: str) -> int:
+    """Como `balance`, pero reutiliza el valor leído hace menos de `BALANCE_CACHE_TTL` s.
+    Los movimientos hechos desde este proceso lo invalidan al momento."""
+    now = time.monotonic()
+    hit = _balance_cache.get(user)
+    if hit and now - hit[0] < setting_float("BALANCE_CACHE_TTL", 30):
+        return hit[1]
+    value = balance(user)
+    _balance_cache[user] = (now, value)
+    return value
+
+
+def _forget_balances(users):
+    for user in users:
+        _balance_cache.pop(user, None)
+
+
+@on_change
+def _forget_changed_balances(paths):
+    from storage.ledger import LEDGER_DIR
+    if paths is None or any(p.startswith(LEDGER_DIR) or p == USERS_PATH for p in paths):
+        _balance_cache.clear()
+
+
+@timed("storage.balances")
+def balances() -> dict:
+    return get_backend().balances()
+
+
+def export_to_github(paths=None):
+    """Copia los documentos del backend actual al repo de GitHub."""
+    from storage.sqlite_backend import SEED_PATHS
+    source = get_backend()
+    target = create_backend("github")
+    docs = {p: source.load_history() if p == HISTORY_PATH else source.load(p)
+            for p in (paths or SEED_PATHS)}
+    target.save_many({p: d for p, d in docs.items() if d is not None}, "Export storage")
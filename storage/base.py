@@ -0,0 +1,240 @@
+"""
+Interfaz común de almacenamiento 🗄️
+----------------------------------
+Todas las páginas trabajan con "documentos" JSON identificados por su ruta
+(`users.json`, `pages/bets_history.json`…). Cada backend decide cómo guardarlos:
+
+• `SQLiteBackend`  → tablas locales con índices (por defecto).
+• `GitHubBackend`  → ficheros en el repositorio remoto (exportación / sincronía).
+
+Además del acceso por documento hay operaciones por fila (`append_bets`,
+`adjust_points`, `open_bets`, `settle`) que los backends pueden implementar
+sin reescribir el documento entero. Los saldos salen del libro de puntos
+(`balance`), no del campo `points` de `users.json`.
+"""
+
+from abc import ABC, abstractmethod
+
+from storage.paths import (  # noqa: F401  (se reexportan para los backends)
+    USERS_PATH, HISTORY_PATH, EVENTS_PATH, RESULTS_PATH, OPEN_BETS_PATH,
+)
+from storage.bet_log import BetLog, MANIFEST_PATH
+from storage.ledger import Ledger, make_entries
+
+
+def fight_key(fight: str) -> str:
+    """Nombre de combate normalizado (minúsculas, espacios colapsados)."""
+    return " ".join(fight.lower().split())
+
+
+def drop_repeated(bets: dict, entries: list, claim):
+    """Quita las apuestas y los movimientos de envíos (`key`) ya registrados.
+
+    `claim(usuario, key)` anota el envío y devuelve `False` si ya existía."""
+    repeated = set()
+    for user, new_bets in bets.items():
+        for key in dict.fromkeys(bet["key"] for bet in new_bets if bet.get("key")):
+            if not claim(user, key):
+                repeated.add((user, key))
+    if not repeated:
+        return bets, entries
+    bets = {user: [b for b in new_bets if (user, b.get("key")) not in repeated]
+            for user, new_bets in bets.items()}
+    entries = [e for e in entries or [] if (e["user"], e.get("key")) not in repeated]
+    return {user: b for user, b in bets.items() if b}, entries
+
+
+class StorageConflict(Exception):
+    """Otro proceso escribió antes; hay que recargar y volver a aplicar los cambios."""
+
+
+class StorageUnavailable(Exception):
+    """El almacenamiento no respondió (rate limit, caída, red) tras los reintentos.
+    Nunca se confunde con "no existe": mejor fallar que devolver datos vacíos."""
+
+
+class StorageBackend(ABC):
+    """Contrato mínimo que cumplen todos los backends."""
+
+    name = "base"
+
+    # ─────────── documentos ───────────
+
+    @abstractmethod
+    def load(self, path: str, default=None):
+        """Devuelve el documento en `path` o `default` si no existe."""
+
+    @abstractmethod
+    def save(self, path: str, data, message: str = None):
+        """Crea o reemplaza el documento en `path`."""
+
+    def load_fresh(self, path: str, default=None):
+        """Como `load`, pero sin servir copias en caché que puedan estar obsoletas."""
+        return self.load(path, default)
+
+    def load_many(self, paths, default=None) -> dict:
+        """`{ruta: documento}` de todas las rutas. Los backends remotos las piden en
+        paralelo; en local basta con leerlas una tras otra."""
+        return {path: self.load(path, default) for path in dict.fromkeys(paths)}
+
+    def save_many(self, docs: dict, message: str = None):
+        """Guarda varios documentos. Los backends transaccionales lo hacen de una vez
+        (todo o nada); si otro proceso se adelantó lanzan `StorageConflict`."""
+        for path, data in docs.items():
+            self.save(path, data, message)
+
+    # ─────────── ficheros de texto (log de apuestas) ───────────
+
+    def read_lines(self, path: str) -> list:
+        """Líneas de un fichero `.jsonl` (lista vacía si no existe)."""
+        text = self.load_fresh(path)
+        return text.splitlines() if text else []
+
+    def write_batch(self, docs: dict, appends: dict, message: str = None):
+        """Guarda `docs` y añade `appends[ruta] = [líneas]` al final de cada fichero,
+        todo junto. Sin append nativo se reescribe solo el fichero afectado."""
+        docs = dict(docs)
+        for path, lines in appends.items():
+            current = self.load_fresh(path) or ""
+            docs[path] = current + "".join(line + "\n" for line in lines)
+        self.save_many(docs, message)
+
+    # ─────────── operaciones por fila ───────────
+
+    def apply_changes(self, bets: dict = None, entries: list = None, message: str = None):
+        """Aplica de una vez apuestas nuevas (`{usuario: [apuestas]}`) y movimientos
+        del libro de puntos (`storage.ledger.make_entries`), releyendo justo antes.
+        Un envío (`key`) que ya estaba guardado se descarta con sus movimientos."""
+        docs, appends = {}, {}
+        if bets:
+            log = BetLog(self)
+            manifest = log.migrate()
+            bets, entries = drop_repeated(bets, entries, lambda user, key: log.claim(manifest, user, key))
+        if bets:
+            index = self._open_index(log, manifest)
+            for user, new_bets in bets.items():
+                shard, lines, first = log.append(manifest, user, new_bets)
+                appends.setdefault(shard, []).extend(lines)
+                for seq, bet in enumerate(new_bets, first):
+                    self._index_bet(index, user, seq, bet)
+            docs[MANIFEST_PATH] = manifest
+            docs[OPEN_BETS_PATH] = index
+        if entries:
+            self._add_ledger_writes(entries, docs, appends)
+        if docs or appends:
+            self.write_batch(docs, appends, message)
+
+    def append_bets(self, user: str, bets: list):
+        """Añade apuestas al historial de `user`."""
+        self.apply_changes(bets={user: bets})
+
+    def adjust_points(self, deltas: dict, kind: str):
+        """Registra `deltas[usuario]` en el libro de puntos como movimientos `kind`."""
+        self.apply_changes(entries=make_entries(deltas, kind))
+
+    # ─────────── saldos ───────────
+
+    def _add_ledger_writes(self, entries: list, docs: dict, appends: dict):
+        ledger_docs, ledger_appends = self.ledger().prepare(entries)
+        docs.update(ledger_docs)
+        for path, lines in ledger_appends.items():
+            appends.setdefault(path, []).extend(lines)
+
+    def bootstrap_ledger(self):
+        """Fija el saldo de partida del libro antes de que se reescriba `users.json`."""
+        self.ledger().bootstrap()
+
+    def ledger(self) -> Ledger:
+        if getattr(self, "_ledger", None) is None:
+            self._ledger = Ledger(self)
+        return self._ledger
+
+    def balance(self, user: str) -> int:
+        return self.ledger().balance(user)
+
+    def balances(self) -> dict:
+        return self.ledger().balances()
+
+    # ─────────── lectura del historial ───────────
+
+    def user_bets(self, user: str) -> list:
+        """Apuestas de un solo usuario, en orden de alta."""
+        return BetLog(self).read(user)
+
+    def iter_bets(self):
+        """Genera `(usuario, apuestas)` sin cargar el historial de todos a la vez."""
+        return BetLog(self).iter_users()
+
+    def load_history(self) -> dict:
+        """Historial completo con la forma del antiguo `bets_history.json`."""
+        return dict(self.iter_bets())
+
+    # ─────────── liquidación ───────────
+    #
+    # En los backends de ficheros el índice `{deporte: {combate: [[usuario, seq]]}}`
+    # vive en OPEN_BETS_PATH y se mantiene en cada alta y en cada liquidación; solo
+    # se reconstruye recorriendo el log si todavía no existe.
+
+    @staticmethod
+    def _index_bet(index: dict, user: str, seq: int, bet: dict):
+        if not bet.get("resolved") and bet.get("fight"):
+            fights = index.setdefault(bet.get("sport"), {})
+            fights.setdefault(fight_key(bet["fight"]), []).append([user, seq])
+
+    def _open_index(self, log: BetLog, manifest: dict) -> dict:
+        index = self.load_fresh(OPEN_BETS_PATH)
+        if index is None:
+            index = {}
+            for user, bets in log.iter_users(manifest):
+                for seq, bet in enumerate(bets):
+                    self._index_bet(index, user, seq, bet)
+        return index
+
+    def open_bets(self, sport: str, keys) -> list:
+        """Apuestas sin resolver de `sport` en los combates `keys` (ya normalizados),
+        como lista de `(ref, usuario, apuesta)`. `ref` es opaco para el llamador."""
+        log = BetLog(self)
+        manifest = log.manifest()
+        fights = self._open_index(log, manifest).get(sport, {})
+        found, user_bets = [], {}
+        for key in keys:
+            for user, seq in fights.get(key, []):
+                if user not in user_bets:  # solo se abren los shards implicados
+                    user_bets[user] = log.read(user, manifest)
+                found.append(((user, seq, sport, key), user, user_bets[user][seq]))
+        return found
+
+    def settle(self, updates: dict, points: dict, docs: dict = None, message: str = None):
+        """Guarda de forma atómica la liquidación: `updates[ref]` son los campos nuevos
+        de cada apuesta, `points` los premios por usuario y `docs` otros documentos
+        (p. ej. los resultados marcados como procesados). Si alguna apuesta ya no
+        está en el índice de abiertas, otra liquidación llegó antes: `StorageConflict`
+        y no se escribe nada."""
+        docs, appends = dict(docs or {}), {}
+        entries = make_entries(points, "payout")
+        if updates:
+            log = BetLog(self)
+            manifest = log.migrate()
+            index = self._open_index(log, manifest)
+            appends = log.settle_lines(manifest, {(user, seq): fields
+                                                  for (user, seq, _, _), fields in updates.items()})
+            settled = {}
+            for user, seq, sport, key in updates:
+                if [user, seq] not in index.get(sport, {}).get(key, []):
+                    raise StorageConflict(f"La apuesta {seq} de {user} ya estaba liquidada")
+                settled.setdefault((sport, key), set()).add((user, seq))
+            for (sport, key), refs in settled.items():
+                fights = index.get(sport, {})
+                left = [ref for ref in fights.get(key, []) if tuple(ref) not in refs]
+                if left:
+                    fights[key] = left
+                else:
+                    fights.pop(key, None)
+            docs[OPEN_BETS_PATH] = index
+        if entries:
+            self._add_ledger_writes(entries, docs, appends)
+        self.write_batch(docs, appends, message)
+
+    def close(self):
+        pass
+
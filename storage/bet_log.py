@@ -0,0 +1,157 @@
+"""
+Historial de apuestas en log append-only 📜
+------------------------------------------
+Sustituye al monolítico `pages/bets_history.json` en los backends de ficheros:
+
+• Un fichero JSON-lines por usuario (`pages/bets/<usuario>-<hash>.jsonl`).
+• Cada línea es una operación: `{"op": "bet", "seq": n, "bet": {...}}` al apostar y
+  `{"op": "settle", "seq": n, "fields": {...}}` al liquidar; nunca se reescriben.
+• `pages/bets/manifest.json` guarda qué shard tiene cada usuario y cuántas apuestas
+  lleva, así apostar solo añade líneas y leer solo abre los shards necesarios.
+  También recuerda los últimos `RECENT_KEYS` envíos (`key`) de cada usuario, para
+  no registrar dos veces el mismo.
+• El historial antiguo se migra una vez con `python -m storage.bet_log migrate`
+  (el fichero viejo no se toca). Hasta entonces las lecturas salen de él, sin
+  escribir nada; la primera escritura de apuestas migra antes de añadir líneas.
+"""
+
+import hashlib
+import json
+import sys
+from urllib.parse import quote
+
+from storage.paths import HISTORY_PATH
+
+LOG_DIR = "pages/bets"
+MANIFEST_PATH = f"{LOG_DIR}/manifest.json"
+RECENT_KEYS = 20
+
+
+def user_slug(user: str) -> str:
+    """Nombre de fichero seguro para `user`."""
+    # el hash evita choques entre "thony" y "Thony" en sistemas de ficheros sin mayúsculas
+    digest = hashlib.sha1(user.encode("utf-8")).hexdigest()[:8]
+    return f"{quote(user, safe='')}-{digest}"
+
+
+def shard_path(user: str) -> str:
+    return f"{LOG_DIR}/{user_slug(user)}.jsonl"
+
+
+def _line(entry: dict) -> str:
+    return json.dumps(entry, ensure_ascii=False, separators=(",", ":"))
+
+
+def fold(lines) -> list:
+    """Reconstruye la lista de apuestas de un usuario a partir de sus líneas."""
+    bets = []
+    for line in lines:
+        if not line.strip():
+            continue
+        entry = json.loads(line)
+        if entry["op"] == "bet":
+            bets.append(entry["bet"])
+        elif entry["op"] == "settle":
+            bets[entry["seq"]].update(entry["fields"])
+    return bets
+
+
+class BetLog:
+    """Lee y prepara escrituras del log; el backend decide cómo aplicarlas."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._legacy = None
+
+    # ─────────── manifest ───────────
+
+    def manifest(self):
+        """Manifest actual, o `None` si el historial aún no se ha migrado. Solo lee."""
+        return self.backend.load_fresh(MANIFEST_PATH)
+
+    def migrate(self) -> dict:
+        """Pasa el historial antiguo al log (si no estaba ya) y devuelve el manifest."""
+        manifest = self.manifest()
+        if manifest is not None:
+            return manifest
+        history = self.backend.load_fresh(HISTORY_PATH, {})
+        manifest, appends = {"users": {}}, {}
+        for user, bets in history.items():
+            entry = manifest["users"].setdefault(user, {"shard": shard_path(user), "bets": 0})
+            appends[entry["shard"]] = self._bet_lines(entry, bets)
+        self.backend.write_batch({MANIFEST_PATH: manifest}, appends, "Migrar historial a log por usuario")
+        self._legacy = None
+        return manifest
+
+    # ─────────── lectura ───────────
+
+    def legacy(self) -> dict:
+        """Historial antiguo (solo mientras no haya manifest), leído una vez."""
+        if self._legacy is None:
+            self._legacy = self.backend.load_fresh(HISTORY_PATH, {})
+        return self._legacy
+
+    def read(self, user: str, manifest: dict = None) -> list:
+        manifest = manifest or self.manifest()
+        if manifest is None:
+            return list(self.legacy().get(user, []))
+        entry = manifest["users"].get(user)
+        return fold(self.backend.read_lines(entry["shard"])) if entry else []
+
+    def iter_users(self, manifest: dict = None):
+        """Genera `(usuario, apuestas)` abriendo un shard cada vez."""
+        manifest = manifest or self.manifest()
+        if manifest is None:
+            yield from self.legacy().items()
+            return
+        for user in manifest["users"]:
+            yield user, self.read(user, manifest)
+
+    # ─────────── escritura (devuelve las líneas a añadir) ───────────
+
+    @staticmethod
+    def _bet_lines(entry: dict, bets: list) -> list:
+        lines = []
+        for bet in bets:
+            lines.append(_line({"op": "bet", "seq": entry["bets"], "bet": bet}))
+            entry["bets"] += 1
+        return lines
+
+    @staticmethod
+    def claim(manifest: dict, user: str, key: str) -> bool:
+        """Anota el envío `key` de `user`; `False` si ya estaba registrado."""
+        entry = manifest["users"].setdefault(user, {"shard": shard_path(user), "bets": 0})
+        keys = entry.setdefault("keys", [])
+        if key in keys:
+            return False
+        keys.append(key)
+        del keys[:-RECENT_KEYS]
+        return True
+
+    def append(self, manifest: dict, user: str, bets: list):
+        """Registra `bets` en el manifest; devuelve `(shard, líneas, primer_seq)`."""
+        entry = manifest["users"].setdefault(user, {"shard": shard_path(user), "bets": 0})
+        first = entry["bets"]
+        return entry["shard"], self._bet_lines(entry, bets), first
+
+    @staticmethod
+    def settle_lines(manifest: dict, updates: dict) -> dict:
+        """`{shard: [líneas]}` para liquidar `updates[(usuario, seq)] = campos`."""
+        appends = {}
+        for (user, seq), fields in updates.items():
+            shard = manifest["users"][user]["shard"]
+            appends.setdefault(shard, []).append(_line({"op": "settle", "seq": seq, "fields": fields}))
+        return appends
+
+
+def migrate():
+    from storage import get_backend
+    manifest = BetLog(get_backend()).migrate()
+    print(f"📜 Historial en log por usuario: {len(manifest['users'])} usuarios.")
+
+
+if __name__ == "__main__":
+    if sys.argv[1:] == ["migrate"]:
+        migrate()
+    else:
+        print("Uso: python -m storage.bet_log migrate")
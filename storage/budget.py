@@ -0,0 +1,117 @@
+"""
+Presupuesto de peticiones por carriles 🚦
+----------------------------------------
+• Un único presupuesto por proceso para la API de GitHub: `per_hour` peticiones
+  en una ventana de una hora (por defecto por debajo de las 5.000 de GitHub, para
+  dejar margen a otros procesos con el mismo token).
+• Cada petición entra por un carril con prioridad:
+    - `write`      → apuestas y movimientos de puntos (nunca se quedan sin cupo),
+    - `read`       → lecturas de las páginas,
+    - `background` → refrescos de clasificación, estadísticas, planificador.
+  Los carriles bajos no pueden gastar la reserva de los altos (`RESERVES`) ni
+  adelantarse si un carril más alto está esperando.
+• Sin cupo, la petición espera a que se renueve la ventana (como mucho
+  `max_wait` segundos) en vez de fallar: una ráfaga se convierte en retraso.
+• `observe()` ajusta el presupuesto con lo que responde GitHub
+  (`X-RateLimit-Remaining` / `X-RateLimit-Reset`).
+"""
+
+import threading
+import time
+from contextlib import contextmanager
+
+LANES = ("write", "read", "background")  # de más a menos prioritario
+RESERVES = {"write": 0.0, "read": 0.1, "background": 0.3}  # fracción del total que no pueden tocar
+WINDOW = 3600.0
+
+_local = threading.local()
+
+
+class BudgetExhausted(Exception):
+    """No quedó cupo en el carril antes de `max_wait`."""
+
+    def __init__(self, lane: str, wait: float):
+        super().__init__(f"Sin cupo de peticiones en el carril {lane!r} durante {wait:g} s")
+        self.lane = lane
+        self.wait = wait
+
+
+@contextmanager
+def request_lane(lane: str):
+    """Fija el carril de las peticiones hechas dentro del bloque (en este hilo)."""
+    if lane not in RESERVES:
+        raise ValueError(f"Carril desconocido: {lane!r}")
+    previous = getattr(_local, "lane", None)
+    _local.lane = lane
+    try:
+        yield
+    finally:
+        _local.lane = previous
+
+
+def current_lane(default: str) -> str:
+    return getattr(_local, "lane", None) or default
+
+
+class RequestBudget:
+    def __init__(self, per_hour: int, max_wait: float = 30.0, clock=time.monotonic):
+        self.limit = per_hour
+        self.max_wait = max_wait
+        self._clock = clock
+        self._cond = threading.Condition()
+        self._remaining = per_hour
+        self._window_end = clock() + WINDOW
+        self._waiting = dict.fromkeys(LANES, 0)
+        self.waits = dict.fromkeys(LANES, 0)  # veces que cada carril tuvo que esperar
+
+    @property
+    def remaining(self) -> int:
+        with self._cond:
+            self._roll()
+            return self._remaining
+
+    @property
+    def reset_in(self) -> float:
+        return max(0.0, self._window_end - self._clock())
+
+    def _roll(self):
+        if self._clock() >= self._window_end:
+            self._remaining = self.limit
+            self._window_end = self._clock() + WINDOW
+            self._cond.notify_all()
+
+    def _can_take(self, lane: str) -> bool:
+        rank = LANES.index(lane)
+        if any(self._waiting[higher] for higher in LANES[:rank]):
+            return False
+        return self._remaining > RESERVES[lane] * self.limit
+
+    def acquire(self, lane: str):
+        """Consume una petición del carril; espera si hace falta o lanza `BudgetExhausted`."""
+        deadline = self._clock() + self.max_wait
+        with self._cond:
+            self._roll()
+            if not self._can_take(lane):
+                self.waits[lane] += 1
+                self._waiting[lane] += 1
+                try:
+                    while not self._can_take(lane):
+                        left = deadline - self._clock()
+                        if left <= 0:
+                            raise BudgetExhausted(lane, self.max_wait)
+                        self._cond.wait(min(left, self.reset_in or left))
+                        self._roll()
+                finally:
+                    self._waiting[lane] -= 1
+                    self._cond.notify_all()
+            self._remaining -= 1
+
+    def observe(self, remaining: int, reset_epoch: float = None):
+        """Alinea el presupuesto con el último `X-RateLimit-*` que devolvió GitHub."""
+        with self._cond:
+            if reset_epoch:
+                reset_at = self._clock() + max(0.0, reset_epoch - time.time())
+                if reset_at < self._window_end or remaining < self._remaining:
+                    self._window_end = reset_at
+            self._remaining = min(self._remaining, remaining)
+            self._cond.notify_all()
@@ -0,0 +1,106 @@
+"""
+Caché de contenidos del repo 🧊
+------------------------------
+• Guarda por ruta el último `ContentFile` (con su SHA/ETag), el SHA del blob y el
+  JSON ya parseado.
+• Dentro del TTL se devuelve directamente; pasado el TTL se revalida con una
+  petición condicional (`If-None-Match`), que si responde 304 no gasta cuota.
+• Tamaño acotado: al superar `max_entries` se expulsa la ruta menos usada.
+• El JSON se guarda serializado con `marshal`, así cada lectura devuelve una
+  copia nueva (las páginas mutan lo que cargan) sin volver a parsear texto.
+• `mark_changed` apunta cuándo se supo que una ruta cambió (la sincronización por
+  deltas). Una descarga empezada antes que termine después entra ya caducada: no
+  puede pasar por fresca una versión vieja, esté o no la ruta en caché.
+"""
+
+import marshal
+import threading
+import time
+from collections import OrderedDict
+
+
+class CacheEntry:
+    __slots__ = ("content", "sha", "snapshot", "checked_at")
+
+    def __init__(self, content, data, sha: str = None):
+        self.content = content
+        self.sha = sha or getattr(content, "sha", None)
+        self.snapshot = marshal.dumps(data)
+        self.checked_at = time.monotonic()
+
+    def value(self):
+        return marshal.loads(self.snapshot)
+
+    def age(self) -> float:
+        return time.monotonic() - self.checked_at
+
+
+STALE_FETCH_S = 300.0  # ninguna descarga dura tanto: marcas más viejas sobran
+
+
+class ContentCache:
+    """LRU con TTL, compartida por todo el proceso."""
+
+    def __init__(self, ttl: float = 30.0, max_entries: int = 64):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._changed = {}  # ruta → momento en que se supo que cambió
+        self._changed_all = float("-inf")
+        self._lock = threading.Lock()
+        self.hits = self.revalidated = self.misses = 0
+
+    def get(self, path: str):
+        with self._lock:
+            entry = self._entries.get(path)
+            if entry is not None:
+                self._entries.move_to_end(path)
+            return entry
+
+    def is_fresh(self, entry: CacheEntry) -> bool:
+        return entry.age() < self.ttl
+
+    def _outdated(self, path: str, started) -> bool:
+        """¿La petición empezada en `started` puede traer una versión ya cambiada?"""
+        return started is not None and started < max(self._changed.get(path, float("-inf")), self._changed_all)
+
+    def put(self, path: str, content, data, sha: str = None, started: float = None) -> CacheEntry:
+        """Guarda lo descargado; `started` es cuándo empezó la petición (`time.monotonic()`)."""
+        entry = CacheEntry(content, data, sha)
+        with self._lock:
+            if self._outdated(path, started):
+                entry.checked_at = float("-inf")  # se revalidará en la próxima lectura
+            self._entries[path] = entry
+            self._entries.move_to_end(path)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return entry
+
+    def paths(self) -> list:
+        with self._lock:
+            return list(self._entries)
+
+    def touch(self, entry: CacheEntry, path: str = None, started: float = None):
+        """Marca una entrada como recién validada (tras un 304)."""
+        with self._lock:
+            if not self._outdated(path, started):
+                entry.checked_at = time.monotonic()
+
+    def mark_changed(self, paths=None):
+        """`paths` (o todo, con `None`) cambiaron en el remoto a partir de ahora."""
+        now = time.monotonic()
+        with self._lock:
+            if paths is None:
+                self._changed_all = now
+            else:
+                self._changed.update(dict.fromkeys(paths, now))
+            for path, at in list(self._changed.items()):
+                if now - at > STALE_FETCH_S:
+                    del self._changed[path]
+
+    def invalidate(self, path: str = None):
+        with self._lock:
+            if path is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(path, None)
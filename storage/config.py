@@ -0,0 +1,26 @@
+"""
+Configuración compartida ⚙️
+--------------------------
+• Lee primero los *Secrets* de Streamlit y, si no existen, las variables de entorno.
+• Permite usar los mismos módulos desde las páginas y desde scripts sueltos
+  (`python resolver.py`) sin cambiar nada.
+"""
+
+import os
+
+
+def setting(name: str, default=None):
+    """Devuelve `st.secrets[name]`, `os.environ[name]` o `default`, en ese orden."""
+    try:
+        import streamlit as st
+        return st.secrets[name]
+    except Exception:  # sin streamlit, sin secrets.toml o sin esa clave
+        return os.environ.get(name, default)
+
+
+def setting_int(name: str, default: int) -> int:
+    return int(setting(name, default))
+
+
+def setting_float(name: str, default: float) -> float:
+    return float(setting(name, default))
@@ -0,0 +1,286 @@
+"""
+Repositorio GitHub falso 🎭
+--------------------------
+Sustituto en memoria del `Repository` de PyGithub con solo lo que usa
+`GitHubBackend`: API de contenidos (`get_contents`, `create_file`, `update_file`,
+`ContentFile.update`), API de datos de Git (ref → commit → árbol → commit → ref,
+`get_git_tree`) y `compare` para la sincronización por deltas.
+
+• Los SHA son los de Git (blob SHA-1), así los conflictos se comportan igual:
+  `update_file` con un SHA viejo → 409; mover el ref sin fast-forward → 422.
+• Inyección de fallos configurable: latencia por llamada, 409 aleatorios y
+  límite de peticiones por hora (403 `RateLimitExceededException`).
+• `calls` cuenta cada llamada por método; `rate_limiting` imita a `Github`.
+• Se activa con `GITHUB_FAKE = "1"` (ver `storage.create_backend`), sin token ni red.
+"""
+
+import hashlib
+import random
+import threading
+import time
+from collections import Counter
+
+
+def blob_sha(data: bytes) -> str:
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class FakeContentFile:
+    def __init__(self, repo: "FakeRepository", path: str, data: bytes):
+        self._repo = repo
+        self.path = path
+        self._set(data)
+
+    def _set(self, data: bytes):
+        self.decoded_content = data
+        self.sha = blob_sha(data)
+        self.size = len(data)
+
+    def update(self) -> bool:
+        """Como PyGithub: petición condicional; `False` si no cambió (304)."""
+        self._repo._call("get_contents")
+        with self._repo._lock:
+            data = self._repo._files.get(self.path)
+        if data is None:
+            self._repo._raise(404, f"{self.path} no existe")
+        if blob_sha(data) == self.sha:
+            return False
+        self._set(data)
+        return True
+
+
+class FakeCommit:
+    def __init__(self, sha: str, tree: "FakeTree", parents: list, message: str):
+        self.sha = sha
+        self.tree = tree
+        self.parents = parents
+        self.message = message
+
+
+class FakeTreeElement:
+    def __init__(self, path: str, sha: str):
+        self.path = path
+        self.sha = sha
+        self.type = "blob"
+
+
+class FakeTree:
+    def __init__(self, sha: str, files: dict):
+        self.sha = sha
+        self.files = files  # {ruta: bytes}
+
+    @property
+    def tree(self) -> list:
+        """Entradas como `GitTree.tree` (siempre recursivo: no hay subárboles)."""
+        return [FakeTreeElement(path, blob_sha(data)) for path, data in sorted(self.files.items())]
+
+
+class FakeFile:
+    def __init__(self, filename: str, status: str):
+        self.filename = filename
+        self.status = status  # added | modified | removed
+        self.previous_filename = None
+
+
+class FakeComparison:
+    def __init__(self, files: list, total_commits: int):
+        self.files = files
+        self.total_commits = total_commits
+
+
+class FakeRef:
+    def __init__(self, repo: "FakeRepository", name: str):
+        self._repo = repo
+        self.ref = name
+        self.object = type("GitObject", (), {"sha": repo._head})()
+
+    def edit(self, sha: str, force: bool = False):
+        repo = self._repo
+        repo._call("edit_ref", write=True)
+        with repo._lock:
+            commit = repo._commits[sha]
+            if not force and repo._head not in [p.sha for p in commit.parents]:
+                repo._raise(422, "Update is not a fast forward")
+            repo._head = sha
+            repo._files = dict(commit.tree.files)
+        self.object.sha = sha
+
+
+class FakeRepository:
+    default_branch = "main"
+
+    def __init__(self, files: dict = None, latency=(0.0, 0.0), conflict_rate: float = 0.0,
+                 requests_per_hour: int = None, seed: int = None):
+        self.latency = latency
+        self.conflict_rate = conflict_rate
+        self.requests_per_hour = requests_per_hour
+        self.calls = Counter()
+        self._rng = random.Random(seed)
+        self._lock = threading.RLock()
+        self._window_start, self._window_used = time.time(), 0
+        self._files = {path: self._bytes(data) for path, data in (files or {}).items()}
+        self._commits, self._trees, self._head = {}, {}, None
+        self._head = self._commit(self._files, [], "Estado inicial").sha
+
+    # ─────────── inyección de fallos ───────────
+
+    @property
+    def rate_limiting(self):
+        """`(restantes, límite)` como `Github.rate_limiting`."""
+        limit = self.requests_per_hour or 5000
+        return max(0, limit - self._window_used), limit
+
+    @property
+    def rate_limiting_resettime(self) -> int:
+        return int(self._window_start + 3600)
+
+    def _call(self, method: str, write: bool = False):
+        self.calls[method] += 1
+        low, high = self.latency
+        if high:
+            time.sleep(self._rng.uniform(low, high))
+        with self._lock:
+            if time.time() - self._window_start >= 3600:
+                self._window_start, self._window_used = time.time(), 0
+            self._window_used += 1
+            if self.requests_per_hour and self._window_used > self.requests_per_hour:
+                from github import RateLimitExceededException
+                self.calls["rate_limited"] += 1
+                raise RateLimitExceededException(
+                    403, {"message": "API rate limit exceeded"},
+                    {"X-RateLimit-Remaining": "0", "X-RateLimit-Reset": str(self.rate_limiting_resettime)},
+                )
+        if write and self.conflict_rate and self._rng.random() < self.conflict_rate:
+            self.calls["conflicts_injected"] += 1
+            self._raise(409 if method == "update_file" else 422, "Conflicto inyectado")
+
+    def _raise(self, status: int, message: str):
+        from github import GithubException, UnknownObjectException
+        cls = UnknownObjectException if status == 404 else GithubException
+        raise cls(status, {"message": message}, {})
+
+    # ─────────── API de contenidos ───────────
+
+    @staticmethod
+    def _bytes(data) -> bytes:
+        return data if isinstance(data, bytes) else data.encode("utf-8")
+
+    def _commit(self, files: dict, parents: list, message: str) -> FakeCommit:
+        tree = FakeTree(hashlib.sha1(repr(sorted((p, blob_sha(d)) for p, d in files.items())).encode()).hexdigest(),
+                        dict(files))
+        self._trees[tree.sha] = tree
+        sha = hashlib.sha1(f"{tree.sha}{[p.sha for p in parents]}{message}{len(self._commits)}".encode()).hexdigest()
+        commit = self._commits[sha] = FakeCommit(sha, tree, parents, message)
+        return commit
+
+    def _write(self, path: str, data: bytes, message: str) -> dict:
+        files = dict(self._files)
+        files[path] = data
+        commit = self._commit(files, [self._commits[self._head]], message)
+        self._head, self._files = commit.sha, files
+        return {"content": FakeContentFile(self, path, data), "commit": commit}
+
+    def get_contents(self, path: str):
+        self._call("get_contents")
+        with self._lock:
+            data = self._files.get(path)
+        if data is None:
+            self._raise(404, f"{path} no existe")
+        return FakeContentFile(self, path, data)
+
+    def create_file(self, path: str, message: str, content):
+        self._call("create_file", write=True)
+        with self._lock:
+            if path in self._files:
+                self._raise(422, f"{path} ya existe")
+            return self._write(path, self._bytes(content), message)
+
+    def update_file(self, path: str, message: str, content, sha: str):
+        self._call("update_file", write=True)
+        with self._lock:
+            current = self._files.get(path)
+            if current is None:
+                self._raise(404, f"{path} no existe")
+            if blob_sha(current) != sha:
+                self._raise(409, f"{path} does not match {sha}")
+            return self._write(path, self._bytes(content), message)
+
+    # ─────────── API de datos de Git ───────────
+
+    def get_git_ref(self, ref: str) -> FakeRef:
+        self._call("get_git_ref")
+        with self._lock:
+            return FakeRef(self, ref)
+
+    def get_git_commit(self, sha: str) -> FakeCommit:
+        self._call("get_git_commit")
+        return self._commits[sha]
+
+    def create_git_tree(self, elements: list, base_tree: FakeTree = None) -> FakeTree:
+        self._call("create_git_tree")
+        files = dict(base_tree.files) if base_tree else {}
+        for element in elements:
+            identity = element._identity  # InputGitTreeElement
+            files[identity["path"]] = self._bytes(identity["content"])
+        with self._lock:
+            tree = FakeTree(hashlib.sha1(repr(sorted(files)).encode() + str(len(self._commits)).encode())
+                            .hexdigest(), files)
+            self._trees[tree.sha] = tree
+            return tree
+
+    def get_git_tree(self, sha: str, recursive: bool = False) -> FakeTree:
+        self._call("get_git_tree")
+        with self._lock:
+            return self._trees[sha]
+
+    def create_git_commit(self, message: str, tree: FakeTree, parents: list) -> FakeCommit:
+        self._call("create_git_commit")
+        with self._lock:
+            return self._commit(tree.files, parents, message)
+
+    def compare(self, base: str, head: str) -> FakeComparison:
+        self._call("compare")
+        with self._lock:
+            if base not in self._commits or head not in self._commits:
+                self._raise(404, "No common ancestor between commits")
+            old, new = self._commits[base].tree.files, self._commits[head].tree.files
+            commits, commit = 0, self._commits[head]
+            while commit.sha != base and commit.parents:
+                commits, commit = commits + 1, commit.parents[0]
+        files = [FakeFile(path, "added" if path not in old else "removed" if path not in new else "modified")
+                 for path in sorted(old.keys() | new.keys()) if old.get(path) != new.get(path)]
+        return FakeComparison(files, commits)
+
+    # ─────────── inspección ───────────
+
+    def read(self, path: str):
+        """Contenido actual sin contar llamada (para pruebas)."""
+        data = self._files.get(path)
+        return None if data is None else data.decode("utf-8")
+
+    def reset_calls(self):
+        self.calls.clear()
+
+
+def from_settings() -> FakeRepository:
+    """Repositorio falso sembrado con los JSON del repo local, según la configuración:
+
+    GITHUB_FAKE_LATENCY_MS      "50" o "20-80" (uniforme entre ambos)
+    GITHUB_FAKE_CONFLICT_RATE   probabilidad de 409/422 en cada escritura
+    GITHUB_FAKE_RATE_LIMIT      peticiones por hora antes de devolver 403
+    """
+    from storage.config import setting, setting_float
+    from storage.sqlite_backend import REPO_ROOT, SEED_PATHS
+
+    low, _, high = str(setting("GITHUB_FAKE_LATENCY_MS", "0")).partition("-")
+    latency = (float(low) / 1000, float(high or low) / 1000)
+    rate_limit = setting("GITHUB_FAKE_RATE_LIMIT")
+    files = {}
+    for path in SEED_PATHS:
+        try:
+            files[path] = (REPO_ROOT / path).read_bytes()
+        except FileNotFoundError:
+            continue
+    return FakeRepository(files, latency=latency,
+                          conflict_rate=setting_float("GITHUB_FAKE_CONFLICT_RATE", 0.0),
+                          requests_per_hour=int(rate_limit) if rate_limit else None)
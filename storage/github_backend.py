@@ -0,0 +1,244 @@
+"""
+Backend GitHub 🐙
+----------------
+• Cada documento es un fichero JSON del repositorio remoto (API de contenidos).
+• Ya no es el almacenamiento principal: se usa como destino de exportación o
+  cuando se configura `STORAGE_BACKEND = "github"`.
+• Las lecturas pasan por una caché de proceso (`storage.cache`) que revalida
+  con peticiones condicionales en vez de descargar el fichero en cada rerun.
+• `save_many` escribe varios ficheros en un único commit (API de datos de Git).
+• Con `storage.sync` activo, un hilo detecta los commits nuevos y refresca
+  solo las rutas cambiadas (`refresh`).
+• `load_many` descarga varios ficheros a la vez en un pool de hilos
+  (`GITHUB_FETCH_WORKERS`), así una página tarda lo que su fichero más lento.
+• Los `.jsonl` (log de apuestas) se guardan como texto; el resto como JSON.
+• Necesita los *Secrets* o variables de entorno GITHUB_TOKEN y REPO_NAME, salvo
+  con `GITHUB_FAKE = "1"`, que usa el repositorio en memoria de `storage.fake_github`.
+• Todas las llamadas pasan por `storage.github_client.GitHubClient` (reintentos,
+  presupuesto por carriles, métricas). Aquí solo se traducen los errores que
+  tienen significado: 404 → no existe, 409/422 → `StorageConflict`. Un rate
+  limit o una caída llegan como `StorageUnavailable`, no como documento vacío.
+• Cada hilo recuerda el SHA del blob de lo último que leyó de cada ruta. Al
+  escribir se exige que en la rama siga ese mismo blob: si otro proceso lo cambió
+  después de la lectura (aunque fuera antes de empezar a escribir), se lanza
+  `StorageConflict` en vez de pisar su cambio con una copia de la caché.
+"""
+
+import hashlib
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from storage.base import StorageBackend, StorageConflict
+from storage.budget import current_lane, request_lane
+from storage.cache import ContentCache
+from storage.config import setting_int
+from storage.github_client import CONFLICT, NOT_FOUND, GitHubClient, classify
+
+_ABSENT = object()  # ruta leída que no existía (escribirla solo vale si sigue sin existir)
+
+
+def blob_sha(text: str) -> str:
+    """SHA del blob que tendrá `text` en Git."""
+    data = text.encode("utf-8")
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+class GitHubBackend(StorageBackend):
+    name = "github"
+
+    def __init__(self, token: str, repo_name: str, cache: ContentCache = None, repo=None):
+        if repo is None:
+            from github import Github  # import diferido: PyGithub solo hace falta aquí
+            # sin los reintentos propios de PyGithub: de eso se encarga GitHubClient
+            repo = Github(token, retry=None).get_repo(repo_name)
+        self.repo = repo if isinstance(repo, GitHubClient) else GitHubClient(repo)
+        self.cache = cache or ContentCache()
+        self._fetch_pool = ThreadPoolExecutor(max_workers=setting_int("GITHUB_FETCH_WORKERS", 8),
+                                              thread_name_prefix="github-fetch")
+        self._local = threading.local()
+
+    # ─────────── lectura con caché ───────────
+
+    @staticmethod
+    def _parse(content):
+        text = content.decoded_content.decode("utf-8")
+        return text if content.path.endswith(".jsonl") else json.loads(text)
+
+    @staticmethod
+    def _dump(data) -> str:
+        return data if isinstance(data, str) else json.dumps(data, indent=4, ensure_ascii=False)
+
+    def _entry(self, path: str, revalidate: bool = False):
+        """Entrada de caché vigente para `path` (descarga o revalida si hace falta)."""
+        started = time.monotonic()  # ver `ContentCache.mark_changed`
+        entry = self.cache.get(path)
+        if entry is not None and entry.content is None and (revalidate or not self.cache.is_fresh(entry)):
+            entry = None  # escrito por commit_files: no hay ETag con el que revalidar
+        if entry is not None:
+            if not revalidate and self.cache.is_fresh(entry):
+                self.cache.hits += 1
+                return entry
+            if not self.repo.call("revalidate", entry.content.update):  # 304 → no cambió y no gasta cuota
+                self.cache.revalidated += 1
+                self.cache.touch(entry, path, started)
+                return entry
+            return self.cache.put(path, entry.content, self._parse(entry.content), started=started)
+        self.cache.misses += 1
+        content = self.repo.get_contents(path)
+        return self.cache.put(path, content, self._parse(content), started=started)
+
+    def _read(self, path: str, default, revalidate: bool):
+        """`(documento, sha leído)`; el sha es `_ABSENT` si no existe y `None` si no vale."""
+        try:
+            entry = self._entry(path, revalidate)
+            return entry.value(), entry.sha
+        except ValueError:  # archivo vacío o JSON roto
+            self.cache.invalidate(path)
+            return default, None
+        except Exception as e:
+            self.cache.invalidate(path)
+            if classify(e) == NOT_FOUND:
+                return default, _ABSENT
+            raise  # rate limit / caída: StorageUnavailable, nunca "no hay datos"
+
+    # ─────────── versiones leídas (por hilo) ───────────
+
+    def _reads(self) -> dict:
+        reads = getattr(self._local, "reads", None)
+        if reads is None:
+            reads = self._local.reads = {}
+        return reads
+
+    def _remember(self, path: str, sha):
+        if sha is None:
+            self._reads().pop(path, None)  # no se sabe qué versión hay: no se comprueba
+        else:
+            self._reads()[path] = sha
+
+    def _load(self, path: str, default, revalidate: bool):
+        value, sha = self._read(path, default, revalidate)
+        self._remember(path, sha)
+        return value
+
+    def load(self, path: str, default=None):
+        return self._load(path, default, revalidate=False)
+
+    def load_many(self, paths, default=None) -> dict:
+        paths = list(dict.fromkeys(paths))
+        if len(paths) < 2:
+            return super().load_many(paths, default)
+        lane = current_lane("read")  # los hilos del pool no heredan el carril
+
+        def fetch(path):
+            with request_lane(lane):
+                return self._read(path, default, revalidate=False)
+
+        docs = {}
+        for path, (value, sha) in zip(paths, self._fetch_pool.map(fetch, paths)):
+            self._remember(path, sha)  # en el hilo que va a escribir, no en el del pool
+            docs[path] = value
+        return docs
+
+    def refresh(self, paths):
+        """Vuelve a traer a la caché `paths` (en paralelo); lo usa `storage.sync`."""
+        lane = current_lane("read")
+
+        def fetch(path):
+            with request_lane(lane):
+                self._read(path, None, revalidate=True)
+
+        list(self._fetch_pool.map(fetch, paths))
+
+    # ─────────── escritura ───────────
+
+    def load_fresh(self, path: str, default=None):
+        return self._load(path, default, revalidate=True)
+
+    def save(self, path: str, data, message: str = None):
+        with request_lane(current_lane("write")):  # la lectura del SHA también es parte de la escritura
+            self._save(path, data, message)
+
+    def _save(self, path: str, data, message: str):
+        payload = self._dump(data)
+        sha = self._reads().get(path)  # la versión sobre la que se hicieron los cambios
+        if sha is None:  # escritura sin lectura previa: se sobrescribe lo que haya
+            try:
+                try:
+                    sha = self._entry(path, revalidate=True).sha
+                except ValueError:  # existe pero no es JSON válido: se sobrescribe
+                    sha = self.repo.get_contents(path).sha
+            except Exception as e:
+                if classify(e) != NOT_FOUND:
+                    raise
+                sha = _ABSENT
+        try:
+            if sha is _ABSENT:  # si no existe, se crea
+                result = self.repo.create_file(path, message or f"Create {path}", payload)
+            else:
+                result = self.repo.update_file(path, message or f"Update {path}", payload, sha)
+        except Exception as e:
+            self.cache.invalidate(path)
+            if classify(e) == CONFLICT:  # SHA obsoleto o creado entre medias por otro
+                raise StorageConflict(f"{path} cambió mientras se escribía") from e
+            raise
+        self.cache.put(path, result["content"], data)
+        self._remember(path, result["content"].sha)
+
+    def save_many(self, docs: dict, message: str = None):
+        if len(docs) == 1:
+            (path, data), = docs.items()
+            return self.save(path, data, message)
+        self.commit_files(docs, message or f"Update {', '.join(docs)}")
+
+    def commit_files(self, docs: dict, message: str):
+        """Escribe todos los documentos en un único commit con la API de datos de Git.
+
+        ref → commit padre (+ su árbol) → árbol nuevo (los blobs van en línea) →
+        commit → mover ref. Son 6 llamadas y un solo commit sea cual sea el número de
+        ficheros. Si en el padre alguno de los ficheros ya no es el que leyó este hilo,
+        o la rama se movió entretanto (el ref no es fast-forward), no se escribe nada.
+        """
+        with request_lane(current_lane("write")):
+            return self._commit_files(docs, message)
+
+    def _commit_files(self, docs: dict, message: str):
+        from github import InputGitTreeElement
+
+        ref = self.repo.get_git_ref(f"heads/{self.repo.default_branch}")
+        parent = self.repo.get_git_commit(ref.object.sha)
+        self._check_base(parent, docs)
+        elements = [
+            InputGitTreeElement(path, "100644", "blob", content=self._dump(data))
+            for path, data in docs.items()
+        ]
+        tree = self.repo.create_git_tree(elements, parent.tree)
+        commit = self.repo.create_git_commit(message, tree, [parent])
+        try:
+            self.repo.call("edit_ref", ref.edit, commit.sha, force=False)
+        except Exception as e:
+            for path in docs:
+                self.cache.invalidate(path)
+            if classify(e) == CONFLICT:
+                raise StorageConflict(f"La rama avanzó mientras se escribía {list(docs)}") from e
+            raise
+        for path, data in docs.items():
+            sha = blob_sha(self._dump(data))
+            self.cache.put(path, None, data, sha)
+            self._remember(path, sha)
+        return commit.sha
+
+    def _check_base(self, parent, docs: dict):
+        """`StorageConflict` si en `parent` cambió algún fichero leído antes de escribirlo."""
+        reads = self._reads()
+        expected = {path: reads[path] for path in docs if path in reads}
+        if not expected:
+            return
+        tree = self.repo.get_git_tree(parent.tree.sha, recursive=True)
+        current = {item.path: item.sha for item in tree.tree if item.type == "blob"}
+        changed = [path for path, sha in expected.items() if current.get(path, _ABSENT) != sha]
+        if changed:
+            for path in changed:
+                self.cache.invalidate(path)
+            raise StorageConflict(f"{changed} cambió desde que se leyó")
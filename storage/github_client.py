@@ -0,0 +1,186 @@
+"""
+Cliente de GitHub con reintentos y presupuesto 🛡️
+------------------------------------------------
+Envuelve el `Repository` de PyGithub (o el falso de `storage.fake_github`) y es
+lo único que habla con la API. Antes cada helper hacía `except Exception:` y un
+rate limit acababa en `users.json` vacío o en un `create_file` imposible.
+
+• Cada error se clasifica (`classify`): 404 no existe, 403/429 rate limit,
+  409/422 conflicto, 5xx servidor, red. El backend traduce 404 y conflictos;
+  el resto se reintenta o termina en `StorageUnavailable`, nunca en datos vacíos.
+• Reintentos con `tenacity`: backoff exponencial con jitter y, si es un rate
+  limit, se espera hasta `Retry-After` / `X-RateLimit-Reset` (con jitter para
+  que no vuelvan todos los hilos a la vez).
+• Las escrituras solo se reintentan si GitHub las rechazó sin aplicarlas (rate
+  limit); tras un 5xx no se sabe si entraron, así que las resuelve el llamador
+  (la cola de escrituras relee y rebasa).
+• Toda petición pasa antes por el presupuesto compartido (`storage.budget`):
+  las escrituras van por el carril `write`, el resto por `read` salvo que el
+  llamador indique otro con `request_lane("background")`.
+• Cada intento queda medido en `storage.metrics` (`github.<método>`).
+
+Configuración: GITHUB_BUDGET_PER_HOUR (4500), GITHUB_MAX_WAIT_S (30),
+GITHUB_MAX_ATTEMPTS (5).
+"""
+
+import random
+import threading
+import time
+
+from tenacity import (
+    Retrying, retry_if_exception, stop_after_attempt, stop_before_delay, wait_random_exponential,
+)
+
+from storage.base import StorageUnavailable
+from storage.budget import BudgetExhausted, RequestBudget, current_lane
+from storage.config import setting_float, setting_int
+from storage.metrics import REGISTRY
+
+NOT_FOUND, RATE_LIMITED, CONFLICT, SERVER, NETWORK, CLIENT = (
+    "not_found", "rate_limited", "conflict", "server", "network", "client",
+)
+TRANSIENT = (RATE_LIMITED, SERVER, NETWORK)
+WRITE_METHODS = frozenset({
+    "create_file", "update_file", "delete_file", "create_git_blob", "create_git_tree",
+    "create_git_commit", "edit_ref",
+})
+
+
+def _header(exc, name: str):
+    """Cabecera de la respuesta de error (PyGithub las guarda en minúsculas)."""
+    headers = getattr(exc, "headers", None) or {}
+    wanted = name.lower()
+    return next((v for k, v in headers.items() if k.lower() == wanted), None)
+
+
+def classify(exc) -> str:
+    status = getattr(exc, "status", None)
+    if status is None:
+        # `requests.ConnectionError` / `Timeout` heredan de OSError
+        return NETWORK if isinstance(exc, OSError) else CLIENT
+    if status == 404:
+        return NOT_FOUND
+    if status in (409, 422):
+        return CONFLICT
+    if status == 429 or (status == 403 and (
+            _header(exc, "X-RateLimit-Remaining") == "0" or _header(exc, "Retry-After") is not None
+            or "rate limit" in str(getattr(exc, "data", "")).lower())):
+        return RATE_LIMITED
+    if status >= 500:
+        return SERVER
+    return CLIENT
+
+
+def retry_after(exc):
+    """Segundos que pide GitHub esperar antes de repetir, o `None` si no lo dice."""
+    if classify(exc) != RATE_LIMITED:
+        return None
+    if _header(exc, "Retry-After") is not None:  # límite secundario
+        return float(_header(exc, "Retry-After"))
+    reset = _header(exc, "X-RateLimit-Reset")
+    if reset is not None:
+        return max(0.0, float(reset) - time.time())
+    return None
+
+
+def _payload_size(method: str, args, kwargs, result) -> int:
+    if method in ("get_contents", "revalidate"):
+        return getattr(result, "size", 0) or 0
+    if method in ("create_file", "update_file"):
+        content = kwargs.get("content", args[2] if len(args) > 2 else "")
+        return len(content.encode("utf-8") if isinstance(content, str) else content)
+    return 0
+
+
+_budget = None
+_budget_lock = threading.Lock()
+
+
+def shared_budget() -> RequestBudget:
+    """Presupuesto único del proceso, aunque haya varios backends GitHub."""
+    global _budget
+    if _budget is None:
+        with _budget_lock:
+            if _budget is None:
+                _budget = RequestBudget(setting_int("GITHUB_BUDGET_PER_HOUR", 4500),
+                                        max_wait=setting_float("GITHUB_MAX_WAIT_S", 30))
+    return _budget
+
+
+class GitHubClient:
+    """`client.get_contents(...)` funciona como `repo.get_contents(...)`, con
+    presupuesto, reintentos y métricas. Para métodos de otros objetos (p. ej.
+    `ContentFile.update`, `GitRef.edit`) se usa `client.call(op, fn, ...)`."""
+
+    def __init__(self, repo, budget: RequestBudget = None, attempts: int = None, max_wait: float = None):
+        self._repo = repo
+        self.budget = budget or shared_budget()
+        self.attempts = attempts or setting_int("GITHUB_MAX_ATTEMPTS", 5)
+        self.max_wait = max_wait if max_wait is not None else setting_float("GITHUB_MAX_WAIT_S", 30)
+        self._backoff = wait_random_exponential(multiplier=0.5, max=8)
+
+    def __getattr__(self, name):
+        attr = getattr(self._repo, name)
+        if not callable(attr):
+            return attr
+        return lambda *args, **kwargs: self.call(name, attr, *args, **kwargs)
+
+    # ─────────── API ───────────
+
+    def call(self, op: str, fn, *args, **kwargs):
+        write = op in WRITE_METHODS
+        lane = current_lane("write" if write else "read")
+        retrying = Retrying(
+            retry=retry_if_exception(lambda e: self._retryable(e, write)),
+            wait=self._wait,
+            stop=stop_after_attempt(self.attempts) | stop_before_delay(self.max_wait),
+            reraise=True,
+        )
+        try:
+            return retrying(self._attempt, op, lane, fn, args, kwargs)
+        except BudgetExhausted as e:
+            raise StorageUnavailable(str(e)) from e
+        except Exception as e:
+            if classify(e) in TRANSIENT:
+                raise StorageUnavailable(f"GitHub no disponible ({op}): {e}") from e
+            raise
+
+    def sync_budget(self):
+        """Vuelca en las métricas y en el presupuesto lo último que dijo GitHub."""
+        # PyGithub lo guarda en el requester tras cada respuesta; el repo falso, en sí mismo
+        source = getattr(self._repo, "_requester", self._repo)
+        remaining, limit = getattr(source, "rate_limiting", (-1, -1))
+        if remaining is None or remaining < 0:
+            return
+        reset = getattr(source, "rate_limiting_resettime", None) or None
+        REGISTRY.rate_limit("github", remaining, limit, reset)
+        self.budget.observe(remaining, reset)
+        REGISTRY.rate_limit("github-budget", self.budget.remaining, self.budget.limit)
+
+    # ─────────── intentos ───────────
+
+    def _attempt(self, op: str, lane: str, fn, args, kwargs):
+        self.budget.acquire(lane)
+        try:
+            with REGISTRY.timer(f"github.{op}") as info:
+                result = fn(*args, **kwargs)
+                info["bytes"] = _payload_size(op, args, kwargs, result)
+                return result
+        except Exception as e:
+            if classify(e) == RATE_LIMITED:  # que el resto de hilos esperen también
+                reset = _header(e, "X-RateLimit-Reset")
+                self.budget.observe(0, float(reset) if reset else time.time() + (retry_after(e) or 60))
+            raise
+        finally:
+            self.sync_budget()
+
+    @staticmethod
+    def _retryable(exc, write: bool) -> bool:
+        kind = classify(exc)
+        return kind == RATE_LIMITED or (not write and kind in (SERVER, NETWORK))
+
+    def _wait(self, retry_state) -> float:
+        delay = retry_after(retry_state.outcome.exception())
+        if delay is None:
+            return self._backoff(retry_state)
+        return delay + random.uniform(0, 1)
@@ -0,0 +1,111 @@
+"""
+Libro de puntos 💰
+-----------------
+Los saldos ya no se sobrescriben en `users.json`: cada movimiento es una entrada
+tipada que se añade al final de un log, y el saldo es snapshot + cola.
+
+• Tipos: `stake` (apuesta), `payout` (premio), `quiz_reward`, `admin_adjust`.
+• `pages/ledger/snapshot.json` → `{"segment": n, "balances": {...}}`.
+• `pages/ledger/<n>.jsonl`     → entradas posteriores al snapshot (la cola).
+• Cada `SNAPSHOT_EVERY` entradas se consolida un snapshot nuevo y se empieza otro
+  segmento; los segmentos viejos se quedan como auditoría.
+• Los saldos calculados se guardan en memoria y solo se pliegan las líneas nuevas.
+• La primera vez se parte de los `points` que hubiera en `users.json`; ese
+  snapshot inicial se guarda (`bootstrap`) antes de reescribir `users.json`, que
+  ya no lleva `points`.
+"""
+
+import json
+import threading
+from datetime import datetime
+
+from storage.paths import USERS_PATH
+
+LEDGER_DIR = "pages/ledger"
+SNAPSHOT_PATH = f"{LEDGER_DIR}/snapshot.json"
+SNAPSHOT_EVERY = 500
+
+ENTRY_TYPES = ("stake", "payout", "quiz_reward", "admin_adjust")
+
+
+def make_entries(deltas: dict, kind: str, key: str = None) -> list:
+    """Entradas del libro para `{usuario: delta}` (se omiten los deltas a 0).
+    `key` une las entradas al envío de apuestas que las causó (ver `apply_changes`)."""
+    if kind not in ENTRY_TYPES:
+        raise ValueError(f"Tipo de movimiento desconocido: {kind!r}")
+    ts = datetime.now().isoformat()
+    extra = {"key": key} if key else {}
+    return [{"user": user, "type": kind, "amount": int(amount), "ts": ts, **extra}
+            for user, amount in deltas.items() if amount]
+
+
+def segment_path(segment: int) -> str:
+    return f"{LEDGER_DIR}/{segment:05d}.jsonl"
+
+
+def _fold(balances: dict, lines) -> dict:
+    for line in lines:
+        if line.strip():
+            entry = json.loads(line)
+            balances[entry["user"]] = balances.get(entry["user"], 0) + entry["amount"]
+    return balances
+
+
+class Ledger:
+    """Libro sobre los ficheros de un backend, con saldos cacheados en memoria."""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._lock = threading.Lock()
+        self._cached = None  # (segmento, líneas plegadas, saldos)
+
+    def snapshot(self) -> dict:
+        return self._snapshot()[0]
+
+    def _snapshot(self):
+        """`(snapshot, ya_guardado)`; sin snapshot se parte de `users.json`."""
+        snapshot = self.backend.load_fresh(SNAPSHOT_PATH)
+        if snapshot is not None:
+            return snapshot, True
+        users = self.backend.load_fresh(USERS_PATH, {})
+        return {"segment": 1,
+                "balances": {u: d["points"] for u, d in users.items() if d.get("points")}}, False
+
+    def bootstrap(self):
+        """Guarda el snapshot inicial si aún no existe, mientras `users.json` conserva los `points`."""
+        from storage.base import StorageConflict
+        snapshot, stored = self._snapshot()
+        if stored:
+            return
+        try:
+            self.backend.save(SNAPSHOT_PATH, snapshot, "Saldo inicial del libro de puntos")
+        except StorageConflict:
+            pass  # otro proceso lo fijó a la vez, desde el mismo users.json
+
+    def balances(self) -> dict:
+        snapshot = self.snapshot()
+        lines = self.backend.read_lines(segment_path(snapshot["segment"]))
+        with self._lock:
+            cached = self._cached
+            if cached and cached[0] == snapshot["segment"] and cached[1] <= len(lines):
+                balances = _fold(dict(cached[2]), lines[cached[1]:])
+            else:
+                balances = _fold(dict(snapshot["balances"]), lines)
+            self._cached = (snapshot["segment"], len(lines), balances)
+        return dict(balances)
+
+    def balance(self, user: str) -> int:
+        return self.balances().get(user, 0)
+
+    def prepare(self, entries: list):
+        """`(docs, appends)` para registrar `entries` con `write_batch`."""
+        snapshot, stored = self._snapshot()
+        current = segment_path(snapshot["segment"])
+        lines = [json.dumps(e, ensure_ascii=False, separators=(",", ":")) for e in entries]
+        docs = {}
+        if not stored:
+            docs[SNAPSHOT_PATH] = snapshot  # primera escritura: fija el saldo de partida
+        if len(self.backend.read_lines(current)) + len(lines) >= SNAPSHOT_EVERY:
+            docs[SNAPSHOT_PATH] = {"segment": snapshot["segment"] + 1,
+                                   "balances": _fold(self.balances(), lines)}
+        return docs, {current: lines}
@@ -0,0 +1,62 @@
+"""
+Backend en memoria 🧪
+--------------------
+• Guarda cada documento serializado (JSON o texto `.jsonl`), igual que haría un
+  fichero: leer devuelve siempre una copia nueva y el coste de (de)serializar se
+  parece al de los backends reales.
+• Sin red ni disco: para benchmarks, pruebas y `STORAGE_BACKEND = "memory"`.
+"""
+
+import json
+import threading
+
+from storage.base import StorageBackend
+
+
+class MemoryBackend(StorageBackend):
+    name = "memory"
+
+    def __init__(self, docs: dict = None):
+        self._docs = {}
+        self._lock = threading.RLock()
+        if docs:
+            self.save_many(docs)
+
+    @staticmethod
+    def _dump(path: str, data) -> str:
+        return data if path.endswith(".jsonl") else json.dumps(data, ensure_ascii=False)
+
+    def load(self, path: str, default=None):
+        text = self._docs.get(path)
+        if text is None:
+            return default
+        return text if path.endswith(".jsonl") else json.loads(text)
+
+    def save(self, path: str, data, message: str = None):
+        self.save_many({path: data}, message)
+
+    def save_many(self, docs: dict, message: str = None):
+        dumped = {path: self._dump(path, data) for path, data in docs.items()}
+        with self._lock:  # todo o nada, como una transacción
+            self._docs.update(dumped)
+
+    # releer + escribir bajo el mismo cerrojo, como una transacción: dos liquidaciones
+    # a la vez no pueden ver las mismas apuestas abiertas
+
+    def apply_changes(self, bets: dict = None, entries: list = None, message: str = None):
+        with self._lock:
+            super().apply_changes(bets=bets, entries=entries, message=message)
+
+    def settle(self, updates: dict, points: dict, docs: dict = None, message: str = None):
+        with self._lock:
+            super().settle(updates, points, docs, message)
+
+    def paths(self) -> list:
+        return sorted(self._docs)
+
+    def clone(self) -> "MemoryBackend":
+        """Copia independiente (los textos son inmutables: no se duplican)."""
+        copy = MemoryBackend()
+        with self._lock:
+            copy._docs = dict(self._docs)
+        return copy
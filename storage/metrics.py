@@ -0,0 +1,210 @@
+"""
+Métricas de proceso 📈
+---------------------
+• Registro compartido por todas las sesiones con, por operación
+  (`storage.load_json`, `github.get_contents`, `discord.send_message`…):
+  llamadas, errores, bytes y un histograma de latencias.
+• Cada página llama a `page_rerun("UFC")` al empezar; las operaciones que hace
+  ese hilo se le atribuyen, así se ven las llamadas y el tiempo por rerun.
+  Solo cuenta la más externa (un `load_json` que acaba en `github.get_contents`
+  es una llamada de la página, no dos).
+• Guarda el último presupuesto de rate limit conocido de GitHub y de Discord.
+• `REGISTRY.prometheus()` devuelve el formato de texto de Prometheus; con
+  `METRICS_FILE` se vuelca además a ese fichero cada `METRICS_FILE_INTERVAL_S` s
+  (p. ej. para el *textfile collector* de node_exporter).
+"""
+
+import functools
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from pathlib import Path
+
+from storage.config import setting, setting_float
+
+BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, float("inf"))
+
+
+class Histogram:
+    __slots__ = ("counts", "total_ms", "count")
+
+    def __init__(self):
+        self.counts = [0] * len(BUCKETS_MS)
+        self.total_ms = 0.0
+        self.count = 0
+
+    def observe(self, ms: float):
+        self.count += 1
+        self.total_ms += ms
+        for i, bound in enumerate(BUCKETS_MS):
+            if ms <= bound:
+                self.counts[i] += 1
+                break
+
+    def quantile(self, q: float) -> float:
+        """Cota superior del cubo donde cae el cuantil `q` (ms)."""
+        if not self.count:
+            return 0.0
+        rank, seen = q * self.count, 0
+        for bound, n in zip(BUCKETS_MS, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return BUCKETS_MS[-1]
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.calls, self.errors, self.bytes = Counter(), Counter(), Counter()
+            self.latency = {}
+            self.reruns, self.page_calls, self.page_ms = Counter(), Counter(), Counter()
+            self.rate_limits = {}  # servicio → (restantes, límite, hora de reinicio)
+            self.started_at = time.time()
+
+    # ─────────── registro ───────────
+
+    def page_rerun(self, page: str):
+        self._local.page = page
+        with self._lock:
+            self.reruns[page] += 1
+
+    def record(self, op: str, ms: float, nbytes: int = 0, error: bool = False, nested: bool = False):
+        page = None if nested else getattr(self._local, "page", None)
+        with self._lock:
+            self.calls[op] += 1
+            self.bytes[op] += nbytes
+            if error:
+                self.errors[op] += 1
+            self.latency.setdefault(op, Histogram()).observe(ms)
+            if page:
+                self.page_calls[page] += 1
+                self.page_ms[page] += ms
+        _start_file_export()
+
+    def add_bytes(self, op: str, nbytes: int):
+        with self._lock:
+            self.bytes[op] += nbytes
+
+    def rate_limit(self, service: str, remaining, limit=None, reset_at=None):
+        with self._lock:
+            self.rate_limits[service] = (remaining, limit, reset_at)
+
+    @contextmanager
+    def timer(self, op: str):
+        """Mide el bloque; `yield` un dict donde apuntar `bytes` si se conocen."""
+        info, start, error = {"bytes": 0}, time.perf_counter(), False
+        depth = getattr(self._local, "depth", 0)
+        self._local.depth = depth + 1
+        try:
+            yield info
+        except Exception:
+            error = True
+            raise
+        finally:
+            self._local.depth = depth
+            self.record(op, (time.perf_counter() - start) * 1000, info["bytes"], error, nested=depth > 0)
+
+    def timed(self, op: str):
+        """Decorador equivalente a `timer(op)`."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.timer(op):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    # ─────────── lectura ───────────
+
+    def operations(self) -> list:
+        """Una fila por operación, para mostrar en tabla."""
+        with self._lock:
+            return [{
+                "operación": op, "llamadas": n, "errores": self.errors[op], "KB": round(self.bytes[op] / 1024, 1),
+                "media ms": round(self.latency[op].total_ms / n, 1),
+                "p50 ms": self.latency[op].quantile(0.5), "p95 ms": self.latency[op].quantile(0.95),
+            } for op, n in sorted(self.calls.items())]
+
+    def pages(self) -> list:
+        with self._lock:
+            return [{
+                "página": page, "reruns": n, "llamadas/rerun": round(self.page_calls[page] / n, 1),
+                "ms en llamadas/rerun": round(self.page_ms[page] / n, 1),
+            } for page, n in sorted(self.reruns.items())]
+
+    def prometheus(self) -> str:
+        lines = []
+        with self._lock:
+            def family(name, kind, help_text):
+                lines.extend([f"# HELP lalonch_{name} {help_text}", f"# TYPE lalonch_{name} {kind}"])
+
+            family("calls_total", "counter", "Llamadas por operación")
+            lines += [f'lalonch_calls_total{{op="{op}"}} {n}' for op, n in sorted(self.calls.items())]
+            family("errors_total", "counter", "Llamadas fallidas por operación")
+            lines += [f'lalonch_errors_total{{op="{op}"}} {self.errors[op]}' for op in sorted(self.calls)]
+            family("bytes_total", "counter", "Bytes transferidos por operación")
+            lines += [f'lalonch_bytes_total{{op="{op}"}} {self.bytes[op]}' for op in sorted(self.calls)]
+            family("latency_seconds", "histogram", "Latencia por operación")
+            for op, hist in sorted(self.latency.items()):
+                cumulative = 0
+                for bound, n in zip(BUCKETS_MS, hist.counts):
+                    cumulative += n
+                    le = "+Inf" if bound == float("inf") else f"{bound / 1000:g}"
+                    lines.append(f'lalonch_latency_seconds_bucket{{op="{op}",le="{le}"}} {cumulative}')
+                lines.append(f'lalonch_latency_seconds_sum{{op="{op}"}} {hist.total_ms / 1000:.6f}')
+                lines.append(f'lalonch_latency_seconds_count{{op="{op}"}} {hist.count}')
+            family("page_reruns_total", "counter", "Reruns por página")
+            lines += [f'lalonch_page_reruns_total{{page="{p}"}} {n}' for p, n in sorted(self.reruns.items())]
+            family("page_calls_total", "counter", "Llamadas instrumentadas hechas desde cada página")
+            lines += [f'lalonch_page_calls_total{{page="{p}"}} {n}' for p, n in sorted(self.page_calls.items())]
+            family("ratelimit_remaining", "gauge", "Peticiones restantes en la ventana de rate limit")
+            lines += [f'lalonch_ratelimit_remaining{{service="{s}"}} {r}'
+                      for s, (r, _, _) in sorted(self.rate_limits.items()) if r is not None]
+        return "\n".join(lines) + "\n"
+
+    def write_prometheus(self, path: str):
+        target = Path(path)
+        tmp = target.with_suffix(target.suffix + ".tmp")
+        tmp.write_text(self.prometheus(), encoding="utf-8")
+        tmp.replace(target)  # atómico: el collector nunca lee un fichero a medias
+
+
+REGISTRY = Registry()
+page_rerun = REGISTRY.page_rerun
+timer = REGISTRY.timer
+timed = REGISTRY.timed
+
+_exporter = None
+_exporter_lock = threading.Lock()
+
+
+def _start_file_export():
+    global _exporter
+    if _exporter is not None:
+        return
+    with _exporter_lock:
+        if _exporter is not None:
+            return
+        path = setting("METRICS_FILE")
+        if not path:
+            _exporter = False
+            return
+        interval = setting_float("METRICS_FILE_INTERVAL_S", 15)
+
+        def run():
+            while True:
+                time.sleep(interval)
+                try:
+                    REGISTRY.write_prometheus(path)
+                except OSError as e:
+                    print(f"⚠️ No se pudieron escribir las métricas en {path}: {e}")
+
+        _exporter = threading.Thread(target=run, name="metrics-export", daemon=True)
+        _exporter.start()
@@ -0,0 +1,9 @@
+"""Rutas de los documentos compartidos (relativas a la raíz del repo de datos)."""
+
+USERS_PATH = "users.json"
+HISTORY_PATH = "pages/bets_history.json"  # formato antiguo; ver `storage.bet_log`
+EVENTS_PATH = "pages/events.json"
+RESULTS_PATH = "pages/results.json"
+OPEN_BETS_PATH = "pages/open_bets.json"  # índice de apuestas sin resolver
+STREAKS_PATH = "pages/streaks.json"  # clasificación de rachas (ver `leaderboard.py`)
+BETTING_PATH = "pages/betting.json"  # apuestas abiertas/cerradas por evento (ver bots/scheduler)
@@ -0,0 +1,399 @@
+"""
+Backend SQLite 🪶
+----------------
+• Usuarios, apuestas, eventos y resultados viven en tablas con índices.
+• El resto de documentos (`pages/betsb.json`, `pages/eventsPast.json`…) se guardan
+  tal cual en la tabla `documents`.
+• Cada hilo tiene su propia conexión (Streamlit ejecuta cada sesión en un hilo)
+  y la base usa WAL para que las lecturas no bloqueen a las escrituras.
+• Si la base no existe, se crea y se siembra con los JSON del repo local.
+• Los puntos viven en `ledger` (un movimiento por fila) + `ledger_snapshots`;
+  la columna `users.points` solo se usa para el saldo inicial al migrar.
+• `submissions` guarda las claves de envío ya aplicadas (reenvíos idempotentes).
+"""
+
+import json
+import sqlite3
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+
+from storage.base import (
+    StorageBackend, StorageConflict, USERS_PATH, HISTORY_PATH, EVENTS_PATH, RESULTS_PATH,
+    drop_repeated, fight_key,
+)
+from storage.ledger import make_entries
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Documentos que se importan al crear la base por primera vez
+SEED_PATHS = [
+    USERS_PATH, HISTORY_PATH, EVENTS_PATH, RESULTS_PATH,
+    "pages/betsb.json", "pages/bets.json", "pages/eventsPast.json",
+]
+
+USER_COLUMNS = ("password", "points", "color", "discord")
+
+SNAPSHOT_EVERY = 500  # movimientos entre consolidaciones de saldo
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS users (
+    username TEXT PRIMARY KEY,
+    password TEXT,
+    points   INTEGER NOT NULL DEFAULT 0,
+    color    TEXT,
+    discord  TEXT,
+    extra    TEXT NOT NULL DEFAULT '{}'
+);
+
+CREATE TABLE IF NOT EXISTS bets (
+    id        INTEGER PRIMARY KEY AUTOINCREMENT,
+    username  TEXT NOT NULL,
+    timestamp TEXT,
+    sport     TEXT,
+    fight     TEXT,
+    fight_key TEXT,
+    resolved  INTEGER NOT NULL DEFAULT 0,
+    data      TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS bets_by_user ON bets (username, id);
+CREATE INDEX IF NOT EXISTS bets_open_by_fight ON bets (sport, fight_key) WHERE resolved = 0;
+
+CREATE TABLE IF NOT EXISTS events (
+    id    INTEGER PRIMARY KEY AUTOINCREMENT,
+    sport TEXT NOT NULL,
+    name  TEXT,
+    date  TEXT,
+    data  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS events_by_date ON events (sport, date);
+
+CREATE TABLE IF NOT EXISTS results (
+    event TEXT NOT NULL,
+    fight TEXT NOT NULL,
+    data  TEXT NOT NULL,
+    PRIMARY KEY (event, fight)
+);
+
+CREATE TABLE IF NOT EXISTS documents (
+    path TEXT PRIMARY KEY,
+    data TEXT NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS ledger (
+    id       INTEGER PRIMARY KEY AUTOINCREMENT,
+    username TEXT NOT NULL,
+    type     TEXT NOT NULL,
+    amount   INTEGER NOT NULL,
+    ts       TEXT
+);
+CREATE INDEX IF NOT EXISTS ledger_by_user ON ledger (username, id);
+
+CREATE TABLE IF NOT EXISTS ledger_snapshots (
+    username TEXT PRIMARY KEY,
+    balance  INTEGER NOT NULL,
+    upto_id  INTEGER NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS submissions (
+    username TEXT NOT NULL,
+    key      TEXT NOT NULL,
+    PRIMARY KEY (username, key)
+);
+"""
+
+
+def _dumps(data) -> str:
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":"))
+
+
+class SQLiteBackend(StorageBackend):
+    name = "sqlite"
+
+    def __init__(self, db_path: str, seed_dir: Path = REPO_ROOT):
+        self.db_path = str(db_path)
+        self._local = threading.local()
+        fresh = not Path(self.db_path).exists()
+        Path(self.db_path).parent.mkdir(parents=True, exist_ok=True)
+        self._migrate(self._conn())
+        self._conn().executescript(SCHEMA)
+        if fresh and seed_dir:
+            self._seed(Path(seed_dir))
+        self._init_ledger()
+
+    # ─────────── conexión ───────────
+
+    def _conn(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.db_path, isolation_level=None, timeout=30)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _transaction(self):
+        conn = self._conn()
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            yield conn
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        conn.execute("COMMIT")
+
+    @staticmethod
+    def _migrate(conn):
+        """Pone al día bases creadas con un esquema anterior."""
+        columns = {row[1] for row in conn.execute("PRAGMA table_info(bets)")}
+        if columns and "fight_key" not in columns:
+            conn.execute("ALTER TABLE bets ADD COLUMN fight_key TEXT")
+            rows = conn.execute("SELECT id, fight FROM bets WHERE fight IS NOT NULL").fetchall()
+            conn.executemany("UPDATE bets SET fight_key = ? WHERE id = ?",
+                             [(fight_key(fight), bet_id) for bet_id, fight in rows])
+            conn.execute("DROP INDEX IF EXISTS bets_open")
+
+    def _seed(self, seed_dir: Path):
+        docs = {}
+        for path in SEED_PATHS:
+            try:
+                with open(seed_dir / path, encoding="utf-8") as fp:
+                    docs[path] = json.load(fp)
+            except (FileNotFoundError, json.JSONDecodeError):
+                continue
+        self.save_many(docs)
+
+    # ─────────── documentos ───────────
+
+    def load(self, path: str, default=None):
+        conn = self._conn()
+        if path == USERS_PATH:
+            data = self._load_users(conn)
+        elif path == HISTORY_PATH:
+            data = self._load_history(conn)
+        elif path == EVENTS_PATH:
+            data = self._load_events(conn)
+        elif path == RESULTS_PATH:
+            data = self._load_results(conn)
+        else:
+            row = conn.execute("SELECT data FROM documents WHERE path = ?", (path,)).fetchone()
+            return json.loads(row[0]) if row else default
+        return data if data else default  # tabla vacía = documento inexistente
+
+    def save(self, path: str, data, message: str = None):
+        self.save_many({path: data}, message)
+
+    def save_many(self, docs: dict, message: str = None):
+        with self._transaction() as conn:
+            for path, data in docs.items():
+                self._write(conn, path, data)
+
+    def _write(self, conn, path: str, data):
+        if path == USERS_PATH:
+            conn.execute("DELETE FROM users")
+            for username, user in data.items():
+                self._insert_user(conn, username, user)
+        elif path == HISTORY_PATH:
+            conn.execute("DELETE FROM bets")
+            for username, bets in data.items():
+                self._insert_bets(conn, username, bets)
+        elif path == EVENTS_PATH:
+            conn.execute("DELETE FROM events")
+            conn.executemany(
+                "INSERT INTO events (sport, name, date, data) VALUES (?, ?, ?, ?)",
+                [(sport, e.get("event") or e.get("match"), e.get("date"), _dumps(e))
+                 for sport, events in data.items() for e in events],
+            )
+        elif path == RESULTS_PATH:
+            conn.execute("DELETE FROM results")
+            conn.executemany(
+                "INSERT INTO results (event, fight, data) VALUES (?, ?, ?)",
+                [(event, fight, _dumps(value))
+                 for event, fights in data.items() for fight, value in fights.items()],
+            )
+        else:
+            conn.execute(
+                "INSERT INTO documents (path, data) VALUES (?, ?) "
+                "ON CONFLICT(path) DO UPDATE SET data = excluded.data",
+                (path, _dumps(data)),
+            )
+
+    # ─────────── users ───────────
+
+    @staticmethod
+    def _insert_user(conn, username: str, user: dict):
+        extra = {k: v for k, v in user.items() if k not in USER_COLUMNS}
+        conn.execute(
+            "INSERT INTO users (username, password, points, color, discord, extra) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            (username, user.get("password"), user.get("points", 0),
+             user.get("color"), user.get("discord"), _dumps(extra)),
+        )
+
+    @staticmethod
+    def _load_users(conn) -> dict:
+        users = {}
+        rows = conn.execute(
+            "SELECT username, password, color, discord, extra FROM users ORDER BY rowid"
+        )
+        for username, password, color, discord, extra in rows:
+            users[username] = {
+                "password": password, "color": color, "discord": discord,
+                **json.loads(extra),
+            }
+        return users
+
+    # ─────────── bets ───────────
+
+    @staticmethod
+    def _insert_bets(conn, username: str, bets: list):
+        conn.executemany(
+            "INSERT INTO bets (username, timestamp, sport, fight, fight_key, resolved, data) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(username, b.get("timestamp"), b.get("sport"), b.get("fight"),
+              fight_key(b["fight"]) if b.get("fight") else None,
+              int(bool(b.get("resolved"))), _dumps(b)) for b in bets],
+        )
+
+    def user_bets(self, user: str) -> list:
+        rows = self._conn().execute("SELECT data FROM bets WHERE username = ? ORDER BY id", (user,))
+        return [json.loads(data) for (data,) in rows]
+
+    def iter_bets(self):
+        user, bets = None, []
+        for username, data in self._conn().execute("SELECT username, data FROM bets ORDER BY username, id"):
+            if username != user and bets:
+                yield user, bets
+                bets = []
+            user = username
+            bets.append(json.loads(data))
+        if bets:
+            yield user, bets
+
+    def load_history(self) -> dict:
+        return self._load_history(self._conn())
+
+    @staticmethod
+    def _load_history(conn) -> dict:
+        history = {}
+        for username, data in conn.execute("SELECT username, data FROM bets ORDER BY id"):
+            history.setdefault(username, []).append(json.loads(data))
+        return history
+
+    # ─────────── events / results ───────────
+
+    @staticmethod
+    def _load_events(conn) -> dict:
+        events = {}
+        for sport, data in conn.execute("SELECT sport, data FROM events ORDER BY id"):
+            events.setdefault(sport, []).append(json.loads(data))
+        return events
+
+    @staticmethod
+    def _load_results(conn) -> dict:
+        results = {}
+        for event, fight, data in conn.execute("SELECT event, fight, data FROM results ORDER BY rowid"):
+            results.setdefault(event, {})[fight] = json.loads(data)
+        return results
+
+    # ─────────── operaciones por fila ───────────
+
+    def apply_changes(self, bets: dict = None, entries: list = None, message: str = None):
+        with self._transaction() as conn:
+            bets, entries = drop_repeated(bets or {}, entries, lambda user, key: conn.execute(
+                "INSERT OR IGNORE INTO submissions (username, key) VALUES (?, ?)", (user, key)).rowcount == 1)
+            for user, new_bets in bets.items():
+                self._insert_bets(conn, user, new_bets)
+            self._insert_entries(conn, entries)
+
+    # ─────────── libro de puntos ───────────
+
+    def _init_ledger(self):
+        """Saldo de partida desde `users.points` la primera vez que se usa el libro."""
+        with self._transaction() as conn:
+            empty = not conn.execute("SELECT 1 FROM ledger_snapshots LIMIT 1").fetchone() and \
+                not conn.execute("SELECT 1 FROM ledger LIMIT 1").fetchone()
+            if empty:
+                conn.execute("INSERT INTO ledger_snapshots (username, balance, upto_id) "
+                             "SELECT username, points, 0 FROM users WHERE points != 0")
+
+    def bootstrap_ledger(self):
+        pass  # ya lo hace `_init_ledger` al abrir la base
+
+    @staticmethod
+    def _insert_entries(conn, entries: list):
+        if not entries:
+            return
+        conn.executemany(
+            "INSERT INTO ledger (username, type, amount, ts) VALUES (?, ?, ?, ?)",
+            [(e["user"], e["type"], e["amount"], e["ts"]) for e in entries],
+        )
+        (pending,) = conn.execute(
+            "SELECT COUNT(*) FROM ledger WHERE id > (SELECT COALESCE(MIN(upto_id), 0) FROM ledger_snapshots)"
+        ).fetchone()
+        if pending >= SNAPSHOT_EVERY:
+            (last_id,) = conn.execute("SELECT MAX(id) FROM ledger").fetchone()
+            conn.executemany(
+                "INSERT INTO ledger_snapshots (username, balance, upto_id) VALUES (?, ?, ?) "
+                "ON CONFLICT(username) DO UPDATE SET balance = excluded.balance, upto_id = excluded.upto_id",
+                [(user, balance, last_id) for user, balance in SQLiteBackend._balances(conn).items()],
+            )
+
+    @staticmethod
+    def _balances(conn) -> dict:
+        rows = conn.execute(
+            "SELECT username, SUM(amount) FROM ("
+            "  SELECT username, balance AS amount FROM ledger_snapshots"
+            "  UNION ALL"
+            "  SELECT l.username, l.amount FROM ledger l"
+            "  LEFT JOIN ledger_snapshots s ON s.username = l.username"
+            "  WHERE l.id > COALESCE(s.upto_id, 0)"
+            ") GROUP BY username"
+        )
+        return dict(rows.fetchall())
+
+    def balance(self, user: str) -> int:
+        (balance,) = self._conn().execute(
+            "SELECT COALESCE((SELECT balance FROM ledger_snapshots WHERE username = :u), 0)"
+            "     + COALESCE((SELECT SUM(amount) FROM ledger WHERE username = :u AND id >"
+            "                 COALESCE((SELECT upto_id FROM ledger_snapshots WHERE username = :u), 0)), 0)",
+            {"u": user},
+        ).fetchone()
+        return balance
+
+    def balances(self) -> dict:
+        return self._balances(self._conn())
+
+    # ─────────── liquidación ───────────
+
+    def open_bets(self, sport: str, keys) -> list:
+        keys = list(keys)
+        if not keys:
+            return []
+        marks = ", ".join("?" * len(keys))
+        rows = self._conn().execute(
+            f"SELECT id, username, data FROM bets "
+            f"WHERE resolved = 0 AND sport = ? AND fight_key IN ({marks}) ORDER BY id",
+            [sport, *keys],
+        )
+        return [(bet_id, username, json.loads(data)) for bet_id, username, data in rows]
+
+    def settle(self, updates: dict, points: dict, docs: dict = None, message: str = None):
+        with self._transaction() as conn:
+            for bet_id, fields in updates.items():
+                (data,) = conn.execute("SELECT data FROM bets WHERE id = ?", (bet_id,)).fetchone()
+                bet = {**json.loads(data), **fields}
+                updated = conn.execute("UPDATE bets SET resolved = ?, data = ? WHERE id = ? AND resolved = 0",
+                                       (int(bool(bet.get("resolved"))), _dumps(bet), bet_id)).rowcount
+                if updated != 1:  # otra liquidación llegó antes: se deshace todo, premios incluidos
+                    raise StorageConflict(f"La apuesta {bet_id} ya estaba liquidada")
+            self._insert_entries(conn, make_entries(points, "payout"))
+            for path, data in (docs or {}).items():
+                self._write(conn, path, data)
+
+    def close(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
@@ -0,0 +1,123 @@
+"""
+Sincronización por deltas 🔁
+---------------------------
+Con varias réplicas de Streamlit escribiendo en el mismo repo de datos, cada
+proceso revalidaba fichero a fichero en cada rerun. Ahora un hilo por proceso
+pregunta cada `GITHUB_SYNC_INTERVAL_S` segundos "¿se movió la rama?":
+
+• 1 llamada (`get_git_ref`) si nada cambió.
+• Si cambió, `compare(último, actual)` da la lista de rutas tocadas y solo se
+  vuelven a descargar las que están en la caché compartida (en paralelo, con
+  ETag: lo que escribió este mismo proceso responde 304 y no gasta cuota).
+  Antes se marcan como cambiadas en la caché, así una lectura que ya estaba en
+  vuelo con la versión vieja no la deja como fresca al terminar.
+• Después se avisa a los oyentes (`storage.on_change`) para que invaliden lo
+  que tengan derivado (p. ej. los saldos cacheados de las páginas).
+• Mientras la sincronización funciona, la caché puede dar por buenas sus
+  copias mucho más tiempo (`GITHUB_SYNC_CACHE_TTL`): el cambio llega igualmente
+  en un intervalo; si la sincronización falla, vuelve el TTL normal hasta que
+  se recupere. Si la comparación no es posible (force-push, más de
+  `MAX_COMPARE_FILES` ficheros) se vacía la caché entera.
+"""
+
+import threading
+
+from storage.budget import request_lane
+
+MAX_COMPARE_FILES = 300  # GitHub no lista más ficheros en una comparación
+
+
+class DeltaSync:
+    def __init__(self, backend, interval: float = 15.0, cache_ttl: float = 600.0):
+        self.backend = backend
+        self.interval = interval
+        self.cache_ttl = cache_ttl
+        self.head = None
+        self._base_ttl = backend.cache.ttl
+        self.checks = self.syncs = self.refreshed = self.resets = 0
+        self._listeners = []
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_listener(self, callback):
+        """`callback(rutas)` tras cada cambio detectado (`None` = todo pudo cambiar)."""
+        self._listeners.append(callback)
+
+    # ─────────── una vuelta ───────────
+
+    def head_sha(self) -> str:
+        repo = self.backend.repo
+        return repo.get_git_ref(f"heads/{repo.default_branch}").object.sha
+
+    def changed_paths(self, base: str, head: str):
+        """Rutas que cambian entre dos commits, o `None` si no se puede saber."""
+        try:
+            files = self.backend.repo.compare(base, head).files
+        except Exception as e:
+            print(f"⚠️ No se pudo comparar {base[:7]}…{head[:7]}: {e}")
+            return None
+        if len(files) >= MAX_COMPARE_FILES:
+            return None
+        paths = set()
+        for f in files:
+            paths.add(f.filename)
+            if getattr(f, "previous_filename", None):  # renombrados
+                paths.add(f.previous_filename)
+        return sorted(paths)
+
+    def check(self):
+        """`[]` si nada cambió; si no, las rutas cambiadas (ya refrescadas) o `None`."""
+        with request_lane("background"):
+            self.checks += 1
+            head = self.head_sha()
+            if head == self.head:
+                return []
+            if self.head is None:  # primera vuelta: solo se fija el punto de partida
+                self.head = head
+                return []
+            changed = self.changed_paths(self.head, head)
+            cache = self.backend.cache
+            cache.mark_changed(changed)
+            if changed is None:
+                self.resets += 1
+                cache.invalidate()
+            else:
+                cached = set(cache.paths())
+                stale = [p for p in changed if p in cached]
+                self.backend.refresh(stale)
+                self.refreshed += len(stale)
+            self.head = head
+            self.syncs += 1
+        for callback in self._listeners:
+            try:
+                callback(changed)
+            except Exception as e:
+                print(f"⚠️ Error en un oyente de sincronización: {e}")
+        return changed
+
+    # ─────────── hilo de fondo ───────────
+
+    def start(self):
+        try:
+            self.check()  # antes de servir lecturas, para no perder cambios intermedios
+        except Exception as e:
+            print(f"⚠️ Sincronización sin punto de partida todavía: {e}")
+        self._trust_cache(self.head is not None)
+        self._thread = threading.Thread(target=self._run, name="storage-delta-sync", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _trust_cache(self, trusted: bool):
+        self.backend.cache.ttl = max(self._base_ttl, self.cache_ttl) if trusted else self._base_ttl
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            try:
+                self.check()
+            except Exception as e:  # sin red o sin cuota: se reintenta en la siguiente vuelta
+                self._trust_cache(False)
+                print(f"⚠️ Sincronización fallida: {e}")
+            else:
+                self._trust_cache(True)
@@ -0,0 +1,128 @@
+"""
+Cola de escrituras agrupadas 📮
+------------------------------
+• Las sesiones no escriben directamente: encolan apuestas nuevas y movimientos del
+  libro de puntos y reciben un `Future` que se completa cuando el cambio está guardado.
+• Un hilo de fondo vacía la cola cada `interval` segundos o al llegar a
+  `max_batch` cambios, y aplica todo lo acumulado en una sola operación
+  (`apply_changes` → un commit en GitHub, una transacción en SQLite).
+• Si otro proceso escribió antes (`StorageConflict`), se relee y se reaplica el
+  lote completo sobre la versión nueva (rebase) antes de rendirse.
+• Un cambio cuyo acuse se cancela (`future.cancel()`) antes de que el hilo lo
+  recoja no se escribe; una vez recogido ya no se puede cancelar.
+• Las apuestas con el mismo `key` (reenvíos del mismo formulario) solo se
+  aplican una vez, dentro del lote y frente a lo ya guardado (ver `apply_changes`).
+"""
+
+import threading
+import time
+from concurrent.futures import Future, wait
+
+from storage.base import StorageConflict
+
+
+class PendingChange:
+    __slots__ = ("bets", "entries", "future")
+
+    def __init__(self, bets: dict, entries: list):
+        self.bets = bets or {}
+        self.entries = entries or []
+        self.future = Future()
+
+    def keys(self) -> set:
+        """`(usuario, key)` de los envíos con clave de este cambio."""
+        return {(user, bet["key"]) for user, bets in self.bets.items() for bet in bets if bet.get("key")}
+
+
+class WriteQueue:
+    def __init__(self, get_backend, interval: float = 0.5, max_batch: int = 50,
+                 max_retries: int = 5):
+        self._get_backend = get_backend
+        self.interval = interval
+        self.max_batch = max_batch
+        self.max_retries = max_retries
+        self._pending = []
+        self._flush_now = False
+        self._cond = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="storage-write-queue", daemon=True)
+        self._thread.start()
+        self.flushes = self.changes = self.conflicts = 0
+
+    # ─────────── API ───────────
+
+    def submit(self, bets: dict = None, entries: list = None) -> Future:
+        """Encola `{usuario: [apuestas]}` y/o movimientos del libro; devuelve el acuse."""
+        change = PendingChange(bets, entries)
+        with self._cond:
+            self._pending.append(change)
+            self._cond.notify()
+        return change.future
+
+    def flush(self, timeout: float = None):
+        """Fuerza el vaciado y espera a que termine (útil al cerrar el proceso)."""
+        with self._cond:
+            batch = list(self._pending)
+            if batch:  # sin nada encolado, el siguiente envío espera `interval` como siempre
+                self._flush_now = True
+                self._cond.notify()
+        wait([change.future for change in batch], timeout)
+
+    # ─────────── hilo de fondo ───────────
+
+    def _take_batch(self) -> list:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            deadline = time.monotonic() + self.interval
+            while len(self._pending) < self.max_batch and not self._flush_now:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            self._flush_now = False
+            batch = self._pending[:self.max_batch]
+            del self._pending[:self.max_batch]
+            # desde aquí `cancel()` ya no surte efecto; los cancelados se descartan
+            return [change for change in batch if change.future.set_running_or_notify_cancel()]
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                continue
+            try:
+                self._write(batch)
+            except Exception as e:
+                for change in batch:
+                    change.future.set_exception(e)
+            else:
+                for change in batch:
+                    change.future.set_result(True)
+
+    @staticmethod
+    def _merge(batch: list):
+        bets, entries, seen = {}, [], set()
+        for change in batch:
+            keys = change.keys()
+            if keys and keys <= seen:  # el mismo envío dos veces en el lote
+                continue
+            seen |= keys
+            for user, new_bets in change.bets.items():
+                bets.setdefault(user, []).extend(new_bets)
+            entries.extend(change.entries)
+        return bets, entries
+
+    def _write(self, batch: list):
+        bets, entries = self._merge(batch)
+        message = f"Write queue: {len(batch)} cambios ({sum(map(len, bets.values()))} apuestas)"
+        for attempt in range(self.max_retries):
+            try:
+                self._get_backend().apply_changes(bets=bets, entries=entries, message=message)
+                break
+            except StorageConflict:
+                self.conflicts += 1
+                if attempt == self.max_retries - 1:
+                    raise
+                time.sleep(0.1 * 2 ** attempt)  # se relee todo en el siguiente intento
+        self.flushes += 1
+        self.changes += len(batch)
@@ -0,0 +1,78 @@
+"""
+Backend GitHub contra el repositorio falso 🧪
+--------------------------------------------
+Carreras de escritura como las de una noche de combates, sin red: varias
+réplicas (`GitHubBackend`) sobre el mismo `FakeRepository` con 409/422
+inyectados, cada una con su cola de escrituras.
+
+    python -m pytest tests/test_fake_github.py
+"""
+
+import json
+import threading
+
+import pytest
+
+pytest.importorskip("github")
+
+from storage import StorageUnavailable, USERS_PATH  # noqa: E402
+from storage.budget import RequestBudget  # noqa: E402
+from storage.fake_github import FakeRepository  # noqa: E402
+from storage.github_backend import GitHubBackend  # noqa: E402
+from storage.github_client import GitHubClient  # noqa: E402
+from storage.ledger import make_entries  # noqa: E402
+from storage.write_queue import WriteQueue  # noqa: E402
+
+USERS = {f"user{i}": {"points": 1000} for i in range(5)}
+
+
+def backend(repo: FakeRepository, max_wait: float = 5.0) -> GitHubBackend:
+    # presupuesto propio: un rate limit de una prueba no frena a las demás
+    client = GitHubClient(repo, budget=RequestBudget(5000, max_wait=max_wait), max_wait=max_wait)
+    return GitHubBackend(None, None, repo=client)
+
+
+def bet(i: int) -> dict:
+    return {"timestamp": f"2024-11-16T20:00:{i:02d}", "sport": "ufc", "fight": "Jones vs Miocic",
+            "corner": "red", "fighter": "Jones", "amount": 10, "odds": 2.0, "resolved": False, "won": None}
+
+
+def test_queued_bets_survive_injected_conflicts():
+    repo = FakeRepository({USERS_PATH: json.dumps(USERS)}, conflict_rate=0.3, seed=7)
+    replicas = [backend(repo) for _ in range(3)]
+    queues = [WriteQueue(lambda b=b: b, interval=0.01, max_batch=5, max_retries=10) for b in replicas]
+
+    acks, lock = [], threading.Lock()
+
+    def session(n: int):
+        user, queue = f"user{n % 5}", queues[n % 3]
+        ack = queue.submit(bets={user: [bet(n)]}, entries=make_entries({user: -10}, "stake"))
+        with lock:
+            acks.append(ack)
+
+    threads = [threading.Thread(target=session, args=(n,)) for n in range(60)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    for ack in acks:
+        assert ack.result(timeout=60) is True
+
+    assert repo.calls["conflicts_injected"] > 0
+    check = backend(repo)
+    assert sum(check.balances().values()) == 5000 - 60 * 10
+    assert check.balances() == {user: 1000 - 12 * 10 for user in USERS}
+    assert sum(len(bets) for _, bets in check.iter_bets()) == 60
+    assert sum(len(refs) for refs in check.load_fresh("pages/open_bets.json")["ufc"].values()) == 60
+
+
+def test_rate_limit_is_unavailable_not_empty():
+    repo = FakeRepository({USERS_PATH: json.dumps(USERS)}, requests_per_hour=1)
+    github = backend(repo, max_wait=0.5)
+    assert github.load(USERS_PATH) == USERS  # gasta la única petición de la hora
+
+    with pytest.raises(StorageUnavailable):  # el presupuesto ya sabe que no queda cuota
+        github.load_fresh(USERS_PATH, {})
+    with pytest.raises(StorageUnavailable):  # otra réplica no lo sabe: GitHub responde 403
+        backend(repo, max_wait=0.5).load("pages/results.json", {})
+    assert repo.calls["rate_limited"] == 1
@@ -0,0 +1,133 @@
+"""
+Backend de clon local contra un repo bare 🧪
+-------------------------------------------
+Dos réplicas (`GitCloneBackend`) sobre el mismo repo *bare* local, sin hilo de
+fondo: cada prueba decide cuándo se sincroniza cada una.
+
+    python -m pytest tests/test_git_backend.py
+"""
+
+import subprocess
+
+import pytest
+
+pytest.importorskip("git")
+
+from settlement import SettlementEngine  # noqa: E402
+from storage import RESULTS_PATH, USERS_PATH, StorageConflict  # noqa: E402
+from storage.git_backend import GitCloneBackend  # noqa: E402
+from storage.ledger import make_entries  # noqa: E402
+
+FIGHT = "Jones vs Miocic"
+RESULTS = {"UFC 309": {FIGHT: {"winner_corner": "red", "winner_name": "Jones"}}}
+
+
+def bet(fighter: str, corner: str, amount: int, key: str = None) -> dict:
+    extra = {"key": key} if key else {}
+    return {"timestamp": "2024-11-16T20:00:00", "sport": "ufc", "fight": FIGHT, "corner": corner,
+            "fighter": fighter, "amount": amount, "odds": 2.0, "resolved": False, "won": None, **extra}
+
+
+@pytest.fixture
+def remote(tmp_path):
+    path = tmp_path / "datos.git"
+    subprocess.run(["git", "init", "-q", "--bare", "-b", "main", str(path)], check=True)
+    return str(path)
+
+
+@pytest.fixture
+def replica(remote, tmp_path):
+    def clone(name: str) -> GitCloneBackend:
+        return GitCloneBackend(remote, str(tmp_path / name), background=False)
+    return clone
+
+
+@pytest.fixture
+def seeded(replica):
+    """Remoto con dos usuarios con 100 puntos y una apuesta abierta de 10 cada uno."""
+    seed = replica("seed")
+    seed.save(USERS_PATH, {"ana": {"points": 100}, "bea": {"points": 100}})
+    seed.apply_changes(bets={"ana": [bet("Jones", "red", 10)], "bea": [bet("Miocic", "blue", 10)]},
+                       entries=make_entries({"ana": -10, "bea": -10}, "stake"))
+    seed.sync()
+    return replica
+
+
+def test_two_replicas_settle_the_same_results_once(seeded):
+    a, b = seeded("a"), seeded("b")
+    a.save(RESULTS_PATH, RESULTS)
+    b.sync()  # las dos ven los resultados nuevos antes de liquidar
+
+    assert SettlementEngine(a).run().points == 20
+    with pytest.raises(StorageConflict):  # b calculó sobre apuestas que a ya liquidó
+        SettlementEngine(b).run()
+    assert SettlementEngine(b).run().bets == 0  # al reintentar ya no queda nada
+
+    check = seeded("check")
+    assert check.balances() == {"ana": 110, "bea": 90}
+    assert [bet["won"] for bet in check.user_bets("ana")] == [True]
+
+
+def test_concurrent_bets_are_recomputed_on_top_of_the_remote(seeded):
+    a, b = seeded("a"), seeded("b")
+    a.apply_changes(bets={"ana": [bet("Miocic", "blue", 5)]}, entries=make_entries({"ana": -5}, "stake"))
+    b.apply_changes(bets={"bea": [bet("Jones", "red", 7)]}, entries=make_entries({"bea": -7}, "stake"))
+    a.sync()
+    b.sync()  # push rechazado: se rehace la operación encima de la de a
+
+    assert b.replays == 1
+    check = seeded("check")
+    assert check.balances() == {"ana": 85, "bea": 83}
+    assert [len(check.user_bets(user)) for user in ("ana", "bea")] == [2, 2]
+    assert len(check.open_bets("ufc", ["jones vs miocic"])) == 4
+
+
+def test_same_submission_from_two_replicas_is_kept_once(seeded):
+    a, b = seeded("a"), seeded("b")
+    for replica in (a, b):
+        replica.apply_changes(bets={"ana": [bet("Jones", "red", 5, key="k1")]},
+                              entries=make_entries({"ana": -5}, "stake", key="k1"))
+    a.sync()
+    b.sync()
+
+    check = seeded("check")
+    assert check.balance("ana") == 85
+    assert len(check.user_bets("ana")) == 2
+
+
+def test_stale_document_write_is_a_conflict(seeded):
+    a, b = seeded("a"), seeded("b")
+    users = a.load(USERS_PATH)
+    b.save(USERS_PATH, {**b.load(USERS_PATH), "carla": {}})
+
+    with pytest.raises(StorageConflict):
+        a.save(USERS_PATH, {**users, "dani": {}})
+    a.save(USERS_PATH, {**a.load(USERS_PATH), "dani": {}})  # releyendo sí se guarda
+
+    assert set(seeded("check").load(USERS_PATH)) == {"ana", "bea", "carla", "dani"}
+
+
+def test_pending_operations_survive_a_restart(seeded, tmp_path):
+    a, b = seeded("a"), seeded("b")
+    a.apply_changes(bets={"ana": [bet("Miocic", "blue", 5)]}, entries=make_entries({"ana": -5}, "stake"))
+    b.apply_changes(entries=make_entries({"bea": 3}, "quiz_reward"))
+    b.sync()
+
+    restarted = GitCloneBackend(a.root, str(tmp_path / "a"), background=False)  # a murió sin subir
+    restarted.sync()
+
+    assert seeded("check").balances() == {"ana": 85, "bea": 93}
+
+
+def test_operation_pushed_before_a_crash_is_not_applied_twice(seeded, tmp_path):
+    a = seeded("a")
+    a.apply_changes(entries=make_entries({"bea": 3}, "quiz_reward"))
+    journal = a._journal.read_text(encoding="utf-8")
+    a.sync()
+    a._journal.write_text(journal, encoding="utf-8")  # se cortó antes de vaciar el diario
+
+    restarted = GitCloneBackend(a.root, str(tmp_path / "a"), background=False)
+    restarted.sync()
+
+    assert restarted._pending == []
+    assert seeded("check").balance("bea") == 93
@@ -0,0 +1,52 @@
+"""
+Libro de puntos 🧪
+-----------------
+Saldos de `Ledger` sobre `MemoryBackend` al cruzar `SNAPSHOT_EVERY` (reducido a
+unas pocas entradas): la caché incremental, un `Ledger` nuevo y la suma a mano
+tienen que coincidir antes y después de cada snapshot.
+
+    python -m pytest tests/test_ledger.py
+"""
+
+import pytest
+
+from storage import ledger as ledger_module
+from storage import USERS_PATH
+from storage.ledger import SNAPSHOT_PATH, Ledger, make_entries, segment_path
+from storage.memory_backend import MemoryBackend
+
+POINTS = {"ana": 100, "bea": 50}
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setattr(ledger_module, "SNAPSHOT_EVERY", 5)
+    return MemoryBackend({USERS_PATH: {user: {"points": p} for user, p in POINTS.items()}})
+
+
+def test_balances_agree_across_snapshot_rollovers(backend):
+    expected = dict(POINTS)
+    cached = backend.ledger()
+    assert cached.balances() == expected  # sin snapshot: sale de los `points` de users.json
+
+    for i in range(1, 13):
+        deltas = {"ana": -i} if i % 3 else {"ana": i, "bea": -2 * i}  # a veces dos entradas juntas
+        backend.adjust_points(deltas, "stake" if i % 3 else "admin_adjust")
+        for user, delta in deltas.items():
+            expected[user] += delta
+        assert cached.balances() == expected
+        assert Ledger(backend).balances() == expected
+
+    snapshot = backend.load(SNAPSHOT_PATH)
+    assert snapshot["segment"] > 2  # se consolidó más de una vez
+    assert all(backend.read_lines(segment_path(segment)) for segment in range(1, snapshot["segment"]))
+
+
+def test_bootstrap_keeps_balances_when_users_json_drops_points(backend):
+    backend.bootstrap_ledger()
+    backend.save(USERS_PATH, {user: {} for user in POINTS})  # users.json ya sin `points`
+    assert Ledger(backend).balances() == POINTS
+
+    backend.apply_changes(entries=make_entries({"bea": 5}, "quiz_reward"))
+    assert Ledger(backend).balances() == {"ana": 100, "bea": 55}
+    assert backend.ledger().balances() == {"ana": 100, "bea": 55}
@@ -0,0 +1,34 @@
+"""
+Detección del usuario citado en un aviso 🧪
+------------------------------------------
+`UserMatcher`: palabra completa y coincidencia más larga, también solapada.
+
+    python -m pytest tests/test_notifier.py
+"""
+
+import pytest
+
+from bots.notifier import UserMatcher
+
+
+@pytest.fixture
+def matcher():
+    return UserMatcher(["Ana", "Ana Maria", "Maria Lopez", "thony", "Bea"])
+
+
+@pytest.mark.parametrize("message, user", [
+    ("ana ha apostado 50 pts", "Ana"),
+    ("ANA MARIA gana el quiz", "Ana Maria"),  # el más largo, no el prefijo
+    ("ana maria lopez apuesta", "Maria Lopez"),  # solapadas: gana la más larga
+    ("Anabel ha apostado", None),  # "ana" no es palabra completa
+    ("thonyx ha apostado", None),
+    ("el bot de thony, otra vez", "thony"),
+    ("bea y ana apuestan", "Bea"),  # mismo largo: la primera del mensaje
+    ("nadie conocido", None),
+])
+def test_longest_whole_word_match(matcher, message, user):
+    assert matcher.find(message) == user
+
+
+def test_without_users_nothing_matches():
+    assert UserMatcher([]).find("ana") is None
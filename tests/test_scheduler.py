@@ -0,0 +1,64 @@
+"""
+Planificador: resultados añadidos después de la fase `settle` 🧪
+--------------------------------------------------------------
+`Scheduler.settle_new_results` sobre `MemoryBackend` (como backend del proceso).
+
+    python -m pytest tests/test_scheduler.py
+"""
+
+import pytest
+
+import storage
+from bots.scheduler.scheduler import ACTIONS, JobStore, Scheduler
+from storage import RESULTS_PATH, USERS_PATH
+from storage.ledger import make_entries
+from storage.memory_backend import MemoryBackend
+
+EVENT = "UFC 309"
+
+
+def bet(fight: str, fighter: str) -> dict:
+    return {"timestamp": "2024-11-16T20:00:00", "sport": "ufc", "fight": fight, "corner": "red",
+            "fighter": fighter, "amount": 10, "odds": 2.0, "resolved": False, "won": None}
+
+
+def result(winner: str) -> dict:
+    return {"winner_corner": "red", "winner_name": winner}
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    backend = MemoryBackend({USERS_PATH: {"ana": {"points": 100}}})
+    backend.apply_changes(bets={"ana": [bet("Jones vs Miocic", "Jones"), bet("Oliveira vs Chandler", "Oliveira")]},
+                          entries=make_entries({"ana": -20}, "stake"))
+    monkeypatch.setattr(storage, "_backend", backend)
+    return backend
+
+
+@pytest.fixture
+def scheduler(tmp_path):
+    scheduler = Scheduler(JobStore(str(tmp_path / "scheduler.db")), actions=ACTIONS, workers=1)
+    yield scheduler
+    scheduler.close()
+
+
+def test_results_added_after_settle_are_paid(backend, scheduler):
+    backend.save(RESULTS_PATH, {EVENT: {"Jones vs Miocic": result("Jones")}})
+    assert scheduler.settle_new_results()
+    assert backend.balance("ana") == 100
+    assert backend.load(RESULTS_PATH)[EVENT]["checked"]
+
+    assert not scheduler.settle_new_results()  # nada nuevo: no se relanza
+
+    results = backend.load(RESULTS_PATH)
+    results[EVENT]["Oliveira vs Chandler"] = result("Oliveira")  # el resto de la cartelera, más tarde
+    backend.save(RESULTS_PATH, results)
+    assert scheduler.settle_new_results()
+    assert backend.balance("ana") == 120
+    assert all(b["resolved"] for b in backend.user_bets("ana"))
+
+
+def test_events_closed_by_the_old_resolver_stay_closed(backend, scheduler):
+    backend.save(RESULTS_PATH, {EVENT: {"Jones vs Miocic": result("Jones"), "checked": True}})
+    assert not scheduler.settle_new_results()
+    assert backend.balance("ana") == 80
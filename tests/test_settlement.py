@@ -0,0 +1,127 @@
+"""
+Liquidación incremental 🧪
+-------------------------
+`SettlementEngine` sobre `MemoryBackend`: se liquida media cartelera, se añaden
+los demás resultados y se vuelve a liquidar. Saldos y rachas tienen que ser los
+mismos que calculando todo desde cero con el historial completo.
+
+    python -m pytest tests/test_settlement.py
+"""
+
+import random
+
+import pytest
+
+import storage
+from leaderboard import StreakBoard, load_board, top_streaks
+from resolver import evaluar_apuestas
+from settlement import SettlementEngine, evaluate_bet
+from storage import RESULTS_PATH, USERS_PATH
+from storage.base import fight_key
+from storage.ledger import make_entries
+from storage.memory_backend import MemoryBackend
+
+USERS = [f"user{i}" for i in range(6)]
+CARDS = {  # evento → combates (rojo, azul)
+    "UFC 308": [("Topuria", "Holloway"), ("Whittaker", "Chimaev"), ("Ankalaev", "Rakic")],
+    "UFC 309": [("Jones", "Miocic"), ("Oliveira", "Chandler"), ("Nickal", "Craig")],
+}
+
+
+def fight(red: str, blue: str) -> str:
+    return f"{red} vs {blue}"
+
+
+def card_results(event: str, rng: random.Random) -> dict:
+    results = {}
+    for red, blue in CARDS[event]:
+        corner = rng.choice(["red", "blue"])
+        results[fight(red, blue)] = {"winner_corner": corner, "winner_name": red if corner == "red" else blue,
+                                     "round": rng.randint(1, 3), "method": rng.choice(["KO", "SUB", "DEC"])}
+    return results
+
+
+@pytest.fixture
+def backend(monkeypatch):
+    rng = random.Random(309)
+    backend = MemoryBackend({USERS_PATH: {user: {"points": 1000} for user in USERS}})
+    for day, event in enumerate(CARDS, 1):  # todas las apuestas de un evento, antes que las del siguiente
+        for user in USERS:
+            bets = []
+            for n, (red, blue) in enumerate(CARDS[event]):
+                corner = rng.choice(["red", "blue"])
+                bets.append({"timestamp": f"2024-11-{day:02d}T20:{n:02d}:{USERS.index(user):02d}",
+                             "sport": "ufc", "fight": fight(red, blue), "corner": corner,
+                             "fighter": red if corner == "red" else blue, "amount": rng.randint(5, 50),
+                             "odds": rng.choice([1.5, 2.0, 3.25]), "round": rng.randint(1, 3),
+                             "method": rng.choice(["KO", "SUB", "DEC"]), "resolved": False, "won": None})
+            backend.apply_changes(bets={user: bets},
+                                  entries=make_entries({user: -sum(b["amount"] for b in bets)}, "stake"))
+    backend.rng = rng
+    monkeypatch.setattr(storage, "_backend", backend)
+    return backend
+
+
+def recompute(backend) -> tuple:
+    """Saldos y clasificación desde cero: historial completo contra todos los resultados."""
+    results = {fight_key(f): r for event in backend.load(RESULTS_PATH).values()
+               for f, r in event.items() if isinstance(r, dict)}
+    balances, history = {}, []
+    for user, bets in backend.iter_bets():
+        original = []
+        for bet in bets:
+            bet = {k: v for k, v in bet.items() if k not in ("resolved", "won", "reward")}
+            balances[user] = balances.get(user, 1000) - bet["amount"]
+            resultado = results.get(fight_key(bet["fight"]))
+            if resultado:
+                fields = evaluate_bet(bet, resultado)
+                balances[user] += fields["reward"]
+                bet.update(fields)
+            original.append(bet)
+        history.append((user, original))
+    return balances, StreakBoard.from_history(history)
+
+
+def test_incremental_settlement_matches_a_full_recompute(backend):
+    backend.save(RESULTS_PATH, {"UFC 308": card_results("UFC 308", backend.rng)})
+    first = SettlementEngine(backend).run()
+    assert first.results == 3 and first.bets == 3 * len(USERS)
+    assert all(r["settled"] for r in backend.load(RESULTS_PATH)["UFC 308"].values() if isinstance(r, dict))
+
+    results = backend.load(RESULTS_PATH)
+    results["UFC 309"] = card_results("UFC 309", backend.rng)
+    backend.save(RESULTS_PATH, results)
+    second = SettlementEngine(backend).run()
+    assert second.results == 3 and second.bets == 3 * len(USERS)  # solo lo nuevo
+    assert SettlementEngine(backend).run().bets == 0
+
+    balances, board = recompute(backend)
+    assert backend.balances() == balances
+    assert load_board(backend).data == board.data
+    assert board.top("ufc", 3) and top_streaks("ufc", 3) == board.top("ufc", 3)
+
+
+class RacingBackend(MemoryBackend):
+    """En la primera liquidación, otro proceso liquida lo mismo justo antes."""
+
+    raced = False
+
+    def settle(self, updates: dict, points: dict, docs: dict = None, message: str = None):
+        if not self.raced:
+            self.raced = True
+            SettlementEngine(self).run()
+        super().settle(updates, points, docs, message)
+
+
+def test_retry_after_conflict_pays_once(backend, monkeypatch):
+    racing = RacingBackend()
+    racing._docs = dict(backend._docs)
+    monkeypatch.setattr(storage, "_backend", racing)
+    racing.save(RESULTS_PATH, {event: card_results(event, backend.rng) for event in CARDS})
+
+    report = evaluar_apuestas()  # el primer intento choca (`StorageConflict`) y se reintenta
+
+    assert racing.raced and report.bets == 0  # lo liquidó el otro; el reintento no paga nada
+    balances, board = recompute(racing)
+    assert racing.balances() == balances
+    assert load_board(racing).data == board.data
@@ -0,0 +1,93 @@
+"""
+Cola de escrituras agrupadas 🧪
+------------------------------
+`WriteQueue` sobre `MemoryBackend`: reintentos ante `StorageConflict`, acuses
+cancelados y envíos repetidos (`key`) dentro de un mismo lote.
+
+    python -m pytest tests/test_write_queue.py
+"""
+
+import time
+
+import pytest
+
+from storage import StorageConflict, USERS_PATH
+from storage.ledger import make_entries
+from storage.memory_backend import MemoryBackend
+from storage.write_queue import WriteQueue
+
+
+def bet(key: str = None) -> dict:
+    extra = {"key": key} if key else {}
+    return {"sport": "ufc", "fight": "Jones vs Miocic", "corner": "red", "fighter": "Jones",
+            "amount": 10, "odds": 2.0, "resolved": False, "won": None, **extra}
+
+
+def stake(user: str, key: str = None) -> dict:
+    return {"bets": {user: [bet(key)]}, "entries": make_entries({user: -10}, "stake", key)}
+
+
+class FlakyBackend(MemoryBackend):
+    """`StorageConflict` en los `failures` primeros `apply_changes`."""
+
+    def __init__(self, failures: int):
+        super().__init__({USERS_PATH: {"ana": {"points": 100}}})
+        self.failures = failures
+        self.attempts = 0
+
+    def apply_changes(self, bets: dict = None, entries: list = None, message: str = None):
+        self.attempts += 1
+        if self.attempts <= self.failures:
+            raise StorageConflict("otro proceso escribió antes")
+        super().apply_changes(bets=bets, entries=entries, message=message)
+
+
+@pytest.fixture
+def backend():
+    return MemoryBackend({USERS_PATH: {"ana": {"points": 100}, "bea": {"points": 100}}})
+
+
+def test_conflicts_are_retried_then_raised():
+    backend = FlakyBackend(failures=2)
+    queue = WriteQueue(lambda: backend, interval=0.01, max_retries=3)
+    assert queue.submit(**stake("ana")).result(timeout=5) is True
+    assert (backend.attempts, queue.conflicts, backend.balance("ana")) == (3, 2, 90)
+
+    backend = FlakyBackend(failures=10)
+    queue = WriteQueue(lambda: backend, interval=0.01, max_retries=3)
+    with pytest.raises(StorageConflict):
+        queue.submit(**stake("ana")).result(timeout=5)
+    assert (backend.attempts, backend.balance("ana")) == (3, 100)
+
+
+def test_cancelled_change_is_not_written(backend):
+    queue = WriteQueue(lambda: backend, interval=0.3)
+    cancelled = queue.submit(**stake("ana"))
+    kept = queue.submit(**stake("bea"))
+    assert cancelled.cancel()  # aún en la cola
+
+    queue.flush(timeout=5)
+    assert kept.result(timeout=5) is True
+    assert backend.balances() == {"ana": 100, "bea": 90}
+    assert backend.user_bets("ana") == []
+
+
+def test_same_key_in_one_batch_is_applied_once(backend):
+    queue = WriteQueue(lambda: backend, interval=0.3)
+    acks = [queue.submit(**stake("ana", key="k1")) for _ in range(3)]
+    acks.append(queue.submit(**stake("ana", key="k2")))
+
+    queue.flush(timeout=5)
+    assert all(ack.result(timeout=5) for ack in acks)
+    assert queue.flushes == 1
+    assert backend.balance("ana") == 80
+    assert [b["key"] for b in backend.user_bets("ana")] == ["k1", "k2"]
+
+
+def test_empty_flush_does_not_skip_the_next_interval(backend):
+    queue = WriteQueue(lambda: backend, interval=0.3)
+    queue.flush(timeout=5)
+    ack = queue.submit(**stake("ana"))
+    time.sleep(0.1)
+    assert not ack.done()  # sigue esperando a que se junten más cambios
+    assert ack.result(timeout=5) is True
@@ -0,0 +1,76 @@
+"""
+Estadísticas por usuario 📈
+--------------------------
+• `pages/stats/<usuario>-<hash>.json` guarda un registro pequeño por usuario:
+
+    {"bets": 12, "won": 7, "staked": 840, "returned": 1130, "win_rate": 0.583, "roi": 0.345,
+     "sports": {"ufc": {...mismos totales...}},
+     "pnl": {"t": [1719850000, ...], "v": [40, -10, ...]}}
+
+  `pnl` es el beneficio acumulado tras cada apuesta resuelta, en dos listas
+  paralelas (segundos epoch / puntos) para que ocupe poco.
+• El motor de liquidación actualiza solo los registros de los usuarios afectados,
+  en la misma escritura que las apuestas; la página de perfil lee un único registro.
+• Si un usuario aún no tiene registro se construye a partir de su historial.
+"""
+
+from datetime import datetime
+
+from storage import get_backend, StorageBackend
+from storage.bet_log import user_slug
+
+STATS_DIR = "pages/stats"
+
+
+def stats_path(user: str) -> str:
+    return f"{STATS_DIR}/{user_slug(user)}.json"
+
+
+def _totals() -> dict:
+    return {"bets": 0, "won": 0, "staked": 0, "returned": 0, "win_rate": 0.0, "roi": 0.0}
+
+
+def empty_stats() -> dict:
+    return dict(_totals(), sports={}, pnl={"t": [], "v": []})
+
+
+def _epoch(timestamp: str) -> int:
+    try:
+        return int(datetime.fromisoformat(timestamp).timestamp())
+    except (TypeError, ValueError):
+        return int(datetime.now().timestamp())
+
+
+def record_bet(stats: dict, bet: dict, fields: dict):
+    """Suma a `stats` una apuesta resuelta (`fields` = won/reward de la liquidación)."""
+    amount, reward = bet.get("amount", 0), fields.get("reward") or 0
+    sport_totals = stats["sports"].setdefault(bet.get("sport", "-"), _totals())
+    for totals in (stats, sport_totals):
+        totals["bets"] += 1
+        totals["won"] += bool(fields.get("won"))
+        totals["staked"] += amount
+        totals["returned"] += reward
+        totals["win_rate"] = round(totals["won"] / totals["bets"], 3)
+        totals["roi"] = round((totals["returned"] - totals["staked"]) / totals["staked"], 3) \
+            if totals["staked"] else 0.0
+    pnl = stats["pnl"]
+    pnl["t"].append(_epoch(bet.get("timestamp")))
+    pnl["v"].append((pnl["v"][-1] if pnl["v"] else 0) + reward - amount)
+
+
+def build_stats(bets: list) -> dict:
+    """Registro calculado desde cero a partir del historial de un usuario."""
+    stats = empty_stats()
+    for bet in sorted(bets, key=lambda b: b.get("timestamp", "")):
+        if bet.get("resolved"):
+            record_bet(stats, bet, bet)
+    return stats
+
+
+def load_stats(user: str, backend: StorageBackend = None, fresh: bool = False) -> dict:
+    backend = backend or get_backend()
+    path = stats_path(user)
+    stats = backend.load_fresh(path) if fresh else backend.load(path)
+    if stats is None:
+        stats = build_stats(backend.user_bets(user))
+    return stats